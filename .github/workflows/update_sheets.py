@@ -6,12 +6,15 @@ Runs on GitHub Actions
 
 import os
 import re
+import sys
 import json
-from bs4 import BeautifulSoup
+
+# Shared modules live in the repo root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 # Try to import playwright - for GitHub Actions
 try:
-    from playwright.sync_api import sync_playwright
+    import playwright  # noqa: F401
     HAS_PLAYWRIGHT = True
 except ImportError:
     HAS_PLAYWRIGHT = False
@@ -24,10 +27,22 @@ try:
 except ImportError:
     HAS_GOOGLE = False
 
+from page_tracker import PageTracker
+import span_index
+import models
+import html_backend
+from http_fetch import Fetcher
+
 # Configuration
 GAME_URL = os.environ.get('GAME_URL', '').strip()
 SPREADSHEET_ID = os.environ.get('SPREADSHEET_ID', '').strip()
 
+# ETag/Last-Modified and content hash of every page from the last run
+TRACKER = PageTracker(os.environ.get('PAGE_STATE_FILE', 'data/page_state.json'))
+
+# Plain HTTP over one keep-alive connection; the browser only for pages that need JS
+FETCHER = Fetcher(use_browser=HAS_PLAYWRIGHT)
+
 # Parse game ID from URL (e.g., https://fibalivestats.dcd.shared.geniussports.com/u/BBF/2799697)
 GAME_ID = ''
 BASE_URL = ''
@@ -43,52 +58,22 @@ if GAME_URL:
             BASE_URL = f"https://fibalivestats.dcd.shared.geniussports.com/u/BBF/{GAME_ID}"
 
 def fetch_page(url):
-    """Fetch a page - tries requests first, then playwright"""
+    """Fetch a page - plain HTTP first, then playwright. None means unchanged since last run"""
     print(f"Attempting to fetch: {url}")
-    
-    # Try with requests first (faster)
-    try:
-        import requests
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Connection': 'keep-alive',
-        }
-        print(f"Making requests call...")
-        response = requests.get(url, headers=headers, timeout=30)
-        print(f"Response status: {response.status_code}, length: {len(response.text)}")
-        if response.status_code == 200 and len(response.text) > 1000:
-            return response.text
-        elif response.status_code != 200:
-            print(f"HTTP error: {response.status_code}")
-    except Exception as e:
-        print(f"Requests error: {e}")
-    
-    # Fall back to playwright
-    if HAS_PLAYWRIGHT:
-        try:
-            print(f"Attempting playwright...")
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
-                page.goto(url, wait_until="networkidle", timeout=30000)
-                page.wait_for_timeout(3000)
-                content = page.content()
-                browser.close()
-                print(f"Playwright success, content length: {len(content)}")
-                return content
-        except Exception as e:
-            print(f"Playwright error: {e}")
-    
-    return ""
+    content = FETCHER.fetch(url, tracker=TRACKER, timeout=30000)
+    if content is None:
+        print("Not modified")
+    else:
+        print(f"Content length: {len(content)}")
+    print(f"Fetch: {FETCHER.report()}")
+    return content
 
 def parse_index(html):
     """Parse scoreboard from index page"""
     if not html:
         return {'home_team': '', 'away_team': '', 'home_score': 0, 'away_score': 0, 'period': '', 'clock': ''}
     
-    soup = BeautifulSoup(html, 'html.parser')
+    spans = span_index.of(html, span_index.box_regions)
     
     data = {
         'home_team': '',
@@ -99,39 +84,28 @@ def parse_index(html):
         'clock': ''
     }
     
-    # Team names - try multiple selectors
-    home_elem = soup.find('span', id='aj_1_shortName')
-    if not home_elem:
-        home_elem = soup.find('div', class_='team-0')
+    # Team names - fall back to the team-0 block if the span is missing
+    if 'aj_1_shortName' in spans.ids:
+        data['home_team'] = spans.text('aj_1_shortName')
+    else:
+        home_elem = html_backend.soup(html).find('div', class_='team-0')
         if home_elem:
-            name_elem = home_elem.find('span', class_='id_aj_1_code')
-            if name_elem:
-                data['home_team'] = name_elem.get_text(strip=True)
+            data['home_team'] = home_elem.get_text(strip=True)
     
-    if home_elem:
-        data['home_team'] = home_elem.get_text(strip=True)
-    
-    away_elem = soup.find('span', id='aj_2_shortName')
-    if away_elem:
-        data['away_team'] = away_elem.get_text(strip=True)
+    if 'aj_2_shortName' in spans.ids:
+        data['away_team'] = spans.text('aj_2_shortName')
     
     # Scores
-    home_score = soup.find('span', id='aj_1_score')
-    if home_score:
-        data['home_score'] = home_score.get_text(strip=True)
-    
-    away_score = soup.find('span', id='aj_2_score')
-    if away_score:
-        data['away_score'] = away_score.get_text(strip=True)
+    if 'aj_1_score' in spans.ids:
+        data['home_score'] = spans.text('aj_1_score')
+    if 'aj_2_score' in spans.ids:
+        data['away_score'] = spans.text('aj_2_score')
     
     # Period and Clock
-    period = soup.find('span', id='aj_period')
-    if period:
-        data['period'] = period.get_text(strip=True)
-    
-    clock = soup.find('span', id='aj_clock')
-    if clock:
-        data['clock'] = clock.get_text(strip=True)
+    if 'aj_period' in spans.ids:
+        data['period'] = spans.text('aj_period')
+    if 'aj_clock' in spans.ids:
+        data['clock'] = spans.text('aj_clock')
     
     return data
 
@@ -140,90 +114,14 @@ def parse_boxscore(html):
     if not html:
         return {'home_players': [], 'away_players': []}
     
-    soup = BeautifulSoup(html, 'html.parser')
-    data = {'home_players': [], 'away_players': []}
-    
-    for team_num, key in [(1, 'home_players'), (2, 'away_players')]:
-        rows = soup.find_all('tr', id=re.compile(f'^aj_{team_num}_\\d+_row$'))
-        
-        for row in rows:
-            classes = row.get('class', [])
-            if isinstance(classes, str):
-                classes = classes.split()
-            if 'row-not-used' in classes:
-                continue
-            
-            player = {}
-            
-            # Get player number - check text first, then class
-            num_span = row.find('span', id=re.compile(f'^aj_{team_num}_\\d+_shirtNumber$'))
-            if num_span:
-                txt = num_span.get_text(strip=True)
-                if txt:
-                    player['num'] = txt
-                else:
-                    for c in num_span.get('class', []):
-                        if c.startswith('aj_') and len(c) > 3:
-                            player['num'] = c[3:]
-                            break
-            
-            # Get player name
-            name_span = row.find('span', id=re.compile(f'^aj_{team_num}_\\d+_name$'))
-            if name_span:
-                txt = name_span.get_text(strip=True)
-                if txt:
-                    player['name'] = txt
-                else:
-                    for c in name_span.get('class', []):
-                        if c.startswith('aj_') and len(c) > 3:
-                            player['name'] = c[3:]
-                            break
-            
-            # Get position
-            pos_span = row.find('span', id=re.compile(f'^aj_{team_num}_\\d+_playingPosition$'))
-            if pos_span:
-                txt = pos_span.get_text(strip=True)
-                if txt:
-                    player['pos'] = txt
-                else:
-                    for c in pos_span.get('class', []):
-                        if c.startswith('aj_'):
-                            player['pos'] = c[3:]
-                            break
-            
-            # Get stats
-            stats = {}
-            stat_ids = {
-                'min': 'sMinutes', 'pts': 'sPoints', 'reb': 'sReboundsTotal',
-                'ast': 'sAssists', 'stl': 'sSteals', 'blk': 'sBlocks',
-                'to': 'sTurnovers', 'pf': 'sFoulsPersonal'
-            }
-            
-            for stat_key, stat_id in stat_ids.items():
-                span = row.find('span', id=re.compile(f'^aj_{team_num}_\\d+_{stat_id}$'))
-                if span:
-                    txt = span.get_text(strip=True)
-                    if txt:
-                        stats[stat_key] = txt
-                    else:
-                        for c in span.get('class', []):
-                            if c.startswith('aj_') and c[3:].isdigit():
-                                stats[stat_key] = c[3:]
-                                break
-            
-            player.update(stats)
-            
-            if player.get('name'):
-                data[key].append(player)
-    
-    return data
+    return models.boxscore(span_index.of(html, span_index.box_regions))
 
 def parse_leaders(html):
     """Parse leaders from lds page"""
     if not html:
         return {'Points': [], 'Assists': [], 'Total Rebounds': [], 'Steals': []}
     
-    soup = BeautifulSoup(html, 'html.parser')
+    spans = span_index.of(html)
     
     leaders = {
         'Points': [],
@@ -242,12 +140,12 @@ def parse_leaders(html):
     for team_num in [1, 2]:
         for stat_id, stat_name in stat_map.items():
             for rank in range(1, 6):
-                name_elem = soup.find('span', id=f'aj_{team_num}_{stat_id}_{rank}_name')
-                tot_elem = soup.find('span', id=f'aj_{team_num}_{stat_id}_{rank}_tot')
+                name_id = f'aj_{team_num}_{stat_id}_{rank}_name'
+                tot_id = f'aj_{team_num}_{stat_id}_{rank}_tot'
                 
-                if name_elem and tot_elem:
-                    name = name_elem.get_text(strip=True)
-                    value = tot_elem.get_text(strip=True)
+                if name_id in spans.ids and tot_id in spans.ids:
+                    name = spans.text(name_id)
+                    value = spans.text(tot_id)
                     
                     if name and value and not name.isdigit():
                         leaders[stat_name].append({
@@ -280,17 +178,17 @@ def write_to_sheets(credentials, data):
     home_values = [['#', 'Name', 'POS', 'MIN', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TO', 'PF']]
     for p in home_players:
         home_values.append([
-            p.get('num', ''),
-            p.get('name', ''),
-            p.get('pos', ''),
-            p.get('min', ''),
-            p.get('pts', ''),
-            p.get('reb', ''),
-            p.get('ast', ''),
-            p.get('stl', ''),
-            p.get('blk', ''),
-            p.get('to', ''),
-            p.get('pf', '')
+            p.text('num', ''),
+            p.text('name', ''),
+            p.text('pos', ''),
+            p.text('min', ''),
+            p.text('pts', ''),
+            p.text('reb', ''),
+            p.text('ast', ''),
+            p.text('stl', ''),
+            p.text('blk', ''),
+            p.text('to', ''),
+            p.text('pf', '')
         ])
     
     # Prepare Box Score Away
@@ -298,17 +196,17 @@ def write_to_sheets(credentials, data):
     away_values = [['#', 'Name', 'POS', 'MIN', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TO', 'PF']]
     for p in away_players:
         away_values.append([
-            p.get('num', ''),
-            p.get('name', ''),
-            p.get('pos', ''),
-            p.get('min', ''),
-            p.get('pts', ''),
-            p.get('reb', ''),
-            p.get('ast', ''),
-            p.get('stl', ''),
-            p.get('blk', ''),
-            p.get('to', ''),
-            p.get('pf', '')
+            p.text('num', ''),
+            p.text('name', ''),
+            p.text('pos', ''),
+            p.text('min', ''),
+            p.text('pts', ''),
+            p.text('reb', ''),
+            p.text('ast', ''),
+            p.text('stl', ''),
+            p.text('blk', ''),
+            p.text('to', ''),
+            p.text('pf', '')
         ])
     
     # Prepare Leaders
@@ -324,13 +222,15 @@ def write_to_sheets(credentials, data):
                 p.get('team', '')
             ])
     
-    # Write to sheets
-    sheets = {
-        'Scoreboard': scoreboard_values,
-        'Home Box': home_values,
-        'Away Box': away_values,
-        'Leaders': leader_values
-    }
+    # Write to sheets - only those whose source page changed
+    sheets = {}
+    if 'scoreboard' in data:
+        sheets['Scoreboard'] = scoreboard_values
+    if 'boxscore' in data:
+        sheets['Home Box'] = home_values
+        sheets['Away Box'] = away_values
+    if 'leaders' in data:
+        sheets['Leaders'] = leader_values
     
     for sheet_name, values in sheets.items():
         body = {'values': values}
@@ -351,29 +251,40 @@ def main():
     
     print(f"Fetching game {GAME_ID} from {BASE_URL}")
     
-    # Fetch data
+    # Fetch data - pages unchanged since the last run are not parsed or pushed
+    data = {}
+    
     print("Fetching index...")
     html_index = fetch_page(f"{BASE_URL}/index.html")
-    scoreboard = parse_index(html_index)
-    print(f"Score: {scoreboard['home_score']} - {scoreboard['away_score']}")
-    print(f"Period: {scoreboard['period']}, Clock: {scoreboard['clock']}")
+    if html_index is None:
+        print("Index unchanged")
+    else:
+        scoreboard = parse_index(html_index)
+        data['scoreboard'] = scoreboard
+        print(f"Score: {scoreboard['home_score']} - {scoreboard['away_score']}")
+        print(f"Period: {scoreboard['period']}, Clock: {scoreboard['clock']}")
     
     print("Fetching boxscore...")
     html_box = fetch_page(f"{BASE_URL}/bs.html")
-    boxscore = parse_boxscore(html_box)
-    print(f"Players: {len(boxscore['home_players'])} home, {len(boxscore['away_players'])} away")
+    if html_box is None:
+        print("Boxscore unchanged")
+    else:
+        boxscore = parse_boxscore(html_box)
+        data['boxscore'] = boxscore
+        print(f"Players: {len(boxscore['home_players'])} home, {len(boxscore['away_players'])} away")
     
     print("Fetching leaders...")
     html_leaders = fetch_page(f"{BASE_URL}/lds.html")
-    leaders = parse_leaders(html_leaders)
-    print(f"Leaders: {list(leaders.keys())}")
+    if html_leaders is None:
+        print("Leaders unchanged")
+    else:
+        leaders = parse_leaders(html_leaders)
+        data['leaders'] = leaders
+        print(f"Leaders: {list(leaders.keys())}")
     
-    # Prepare data
-    data = {
-        'scoreboard': scoreboard,
-        'boxscore': boxscore,
-        'leaders': leaders
-    }
+    if not data:
+        print("Nothing changed since last run - skipping Sheets push")
+        return
     
     # Write to Google Sheets
     print("Writing to Google Sheets...")
@@ -393,11 +304,12 @@ def main():
         )
         
         write_to_sheets(credentials, data)
+        TRACKER.save()
         print("Sheets updated successfully!")
     else:
         print("No credentials found - running in test mode")
         print("Data fetched:")
-        print(json.dumps(data, indent=2))
+        print(json.dumps(data, indent=2, default=models.to_json))
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - Advanced Stats Engine
+- Box score PlayerLines -> NumPy arrays (players x COLUMNS), one per team
+- eFG%, TS%, usage per player; possessions, pace, offensive/defensive
+  rating and Dean Oliver's four factors per team
+- Every function works on any leading shape, so a whole archive of games
+  stacked as (games, players, COLUMNS) is one batch of array operations
+"""
+
+import numpy as np
+
+COLUMNS = ('min', 'pts', 'fgm', 'fga', '3pm', '3pa', 'ftm', 'fta', 'off', 'def', 'to')
+COL = {key: i for i, key in enumerate(COLUMNS)}
+FTA_WEIGHT = 0.44       # share of free throw attempts that end a possession
+GAME_SECONDS = 40 * 60  # FIBA regulation, for pace
+
+
+def player_matrix(lines, size=None):
+    """PlayerLines -> float array (size or len(lines), COLUMNS); minutes in seconds, missing = 0"""
+    out = np.zeros((size or len(lines), len(COLUMNS)))
+    for i, line in enumerate(lines[:len(out)]):
+        for j, key in enumerate(COLUMNS):
+            val = line[key]
+            if isinstance(val, (int, float)):
+                out[i, j] = val
+    return out
+
+
+def stack_games(games):
+    """[(home lines, away lines), ...] -> two (games, players, COLUMNS) arrays, zero-padded"""
+    size = max([len(side) for game in games for side in game] or [0])
+    home = np.stack([player_matrix(h, size) for h, _ in games]) if games else np.zeros((0, 0, len(COLUMNS)))
+    away = np.stack([player_matrix(a, size) for _, a in games]) if games else np.zeros((0, 0, len(COLUMNS)))
+    return home, away
+
+
+def _div(num, den):
+    """num / den, NaN where den is 0"""
+    num, den = np.broadcast_arrays(np.asarray(num, dtype=float), np.asarray(den, dtype=float))
+    out = np.full(num.shape, np.nan)
+    np.divide(num, den, out=out, where=den != 0)
+    return out
+
+
+def _c(arr, key):
+    return arr[..., COL[key]]
+
+
+def possessions(team, opp):
+    """Estimated possessions (FGA + 0.44 FTA - ORB + TO), averaged over both teams"""
+    def estimate(t):
+        return _c(t, 'fga') + FTA_WEIGHT * _c(t, 'fta') - _c(t, 'off') + _c(t, 'to')
+    return (estimate(team) + estimate(opp)) / 2
+
+
+def team_stats(home, away):
+    """Per-team advanced stats from the two player arrays - {'home': {...}, 'away': {...}}"""
+    ht, at = home.sum(axis=-2), away.sum(axis=-2)
+    poss = possessions(ht, at)
+    # Team minutes are five players' worth of game time
+    played = np.maximum(_c(ht, 'min'), _c(at, 'min')) / 5
+    out = {}
+    for side, t, o in (('home', ht, at), ('away', at, ht)):
+        out[side] = {
+            'poss': poss,
+            'pace': _div(poss * GAME_SECONDS, played),
+            'ortg': 100 * _div(_c(t, 'pts'), poss),
+            'drtg': 100 * _div(_c(o, 'pts'), poss),
+            'efg_pct': 100 * _div(_c(t, 'fgm') + 0.5 * _c(t, '3pm'), _c(t, 'fga')),
+            'ts_pct': 100 * _div(_c(t, 'pts'), 2 * (_c(t, 'fga') + FTA_WEIGHT * _c(t, 'fta'))),
+            'tov_pct': 100 * _div(_c(t, 'to'), _c(t, 'fga') + FTA_WEIGHT * _c(t, 'fta') + _c(t, 'to')),
+            'orb_pct': 100 * _div(_c(t, 'off'), _c(t, 'off') + _c(o, 'def')),
+            'ft_rate': _div(_c(t, 'ftm'), _c(t, 'fga')),
+        }
+    return out
+
+
+def player_stats(players):
+    """eFG%, TS% and usage% per player row of one team's array"""
+    team = players.sum(axis=-2)[..., None, :]
+    plays = _c(players, 'fga') + FTA_WEIGHT * _c(players, 'fta') + _c(players, 'to')
+    team_plays = _c(team, 'fga') + FTA_WEIGHT * _c(team, 'fta') + _c(team, 'to')
+    return {
+        'efg_pct': 100 * _div(_c(players, 'fgm') + 0.5 * _c(players, '3pm'), _c(players, 'fga')),
+        'ts_pct': 100 * _div(_c(players, 'pts'), 2 * (_c(players, 'fga') + FTA_WEIGHT * _c(players, 'fta'))),
+        # Share of the team's plays used while on the floor
+        'usg_pct': 100 * _div(plays * _c(team, 'min') / 5, _c(players, 'min') * team_plays),
+    }
+
+
+def game(data):
+    """Advanced stats for write_csv's data dict - team and per-player, as arrays"""
+    home = player_matrix(data.get('home_players', []))
+    away = player_matrix(data.get('away_players', []))
+    teams = team_stats(home, away)
+    return {'home': teams['home'], 'away': teams['away'],
+            'home_players': player_stats(home), 'away_players': player_stats(away)}
+
+
+def fmt(val, digits=1):
+    """Array scalar as text, '--' when it couldn't be computed"""
+    val = float(val)
+    return "--" if np.isnan(val) else f"{val:.{digits}f}"
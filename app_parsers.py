@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - Desktop App Page Parsers
+- Raw HTML in, plain dicts (players as models.PlayerLine) out, no app state
+- Module-level so parse_pool can run them in worker processes
+"""
+
+import re
+import html_backend
+import span_index
+import stat_schema
+import models
+from models import PlayerLine
+
+def parse_csv_boxscore(html):
+    """PlayerLines of the person-container / bench rows, for the Game N.csv export"""
+    home_players = []
+    away_players = []
+
+    if html:
+        spans = span_index.of(html, span_index.box_regions)
+        for team_num, players, containers in [(1, home_players, ('team-0-person-container', 'bench')),
+                                              (2, away_players, ('team-1-person-container', 'bench'))]:
+            for row in spans.team_rows(team_num, containers):
+                player = PlayerLine.from_fields(stat_schema.row_player(row))
+                if player.name:
+                    players.append(player)
+
+    return {'home_players': home_players, 'away_players': away_players}
+
+def parse_index(html):
+    soup = html_backend.soup(html)
+    data = {'teams': {'home': None, 'away': None}, 'score': {'home': 0, 'away': 0}, 'period': None, 'clock': None}
+
+    home_img = soup.find('img', class_='logo home-logo')
+    away_img = soup.find('img', class_='logo away-logo')
+
+    if home_img and home_img.get('alt'):
+        data['teams']['home'] = home_img.get('alt')
+    if away_img and away_img.get('alt'):
+        data['teams']['away'] = away_img.get('alt')
+
+    for elem in soup.find_all('span', class_='pbpsc'):
+        m = re.search(r'(\d+)\s*-\s*(\d+)', elem.get_text())
+        if m:
+            data['score']['home'] = int(m.group(1))
+            data['score']['away'] = int(m.group(2))
+
+    for elem in soup.find_all('span', class_='pbp-period'):
+        m = re.search(r'P(\d+)', elem.get_text())
+        if m:
+            data['period'] = int(m.group(1))
+
+    for elem in soup.find_all('div', class_='pbp-time'):
+        m = re.search(r'(\d{1,2}:\d{2})', elem.get_text())
+        if m:
+            data['clock'] = m.group(1)
+
+    return data
+
+def parse_boxscore(html):
+    """models.boxscore of bs.html, with the app result's (empty) totals slots"""
+    data = models.boxscore(span_index.of(html, span_index.box_regions))
+    data.update({'home_totals': {}, 'away_totals': {}})
+    return data
+
+def parse_periods(html):
+    soup = html_backend.soup(html)
+    data = {'quarters': [], 'totals': {'home': 0, 'away': 0}}
+
+    for elem in soup.find_all('span', class_='pbpsc'):
+        m = re.search(r'(\d+)\s*-\s*(\d+)', elem.get_text())
+        if m:
+            data['totals']['home'] = int(m.group(1))
+            data['totals']['away'] = int(m.group(2))
+
+    return data
+
+def parse_leaders(html):
+    soup = html_backend.soup(html)
+    data = {'leaders': []}
+
+    for row in soup.find_all('tr'):
+        cells = [c.get_text(strip=True) for c in row.find_all(['td', 'th'])]
+        if len(cells) >= 3:
+            data['leaders'].append({'rank': cells[0], 'player': cells[1], 'value': cells[2]})
+
+    return data
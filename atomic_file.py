@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - Atomic Output Files
+- Game N.csv/.txt/.xml and live JSON are rendered into memory first
+- Output identical to what the file already holds isn't written at all,
+  so dead balls and timeouts cost no disk I/O
+- Changed output goes to a temp file in the same folder and is renamed over
+  the old one - readers (graphics machine, Excel) see the old file or the
+  new one, never half of it
+"""
+
+import io
+import os
+import stat
+import time
+import hashlib
+import tempfile
+import threading
+
+# Windows refuses the rename while a reader has the file open - retry briefly
+REPLACE_RETRIES = 10
+REPLACE_DELAY = 0.05
+
+_digests = {}   # path -> SHA-1 of the text last written / found there
+_locks = {}     # path -> lock held while that one file is compared and replaced
+_lock = threading.Lock()   # guards _locks and the counters only
+written = 0
+unchanged = 0
+
+
+def _digest(text):
+    return hashlib.sha1(text.encode('utf-8', 'surrogatepass')).digest()
+
+
+def _on_disk(path, encoding, newline):
+    """Digest of the file's current text, None if there is none"""
+    try:
+        with open(path, 'r', encoding=encoding, newline=newline) as f:
+            return _digest(f.read())
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def replace(path, text, encoding='utf-8', newline=None):
+    """Write text to a temp file beside path, flush it to disk, rename it over path"""
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=folder)
+    try:
+        with os.fdopen(fd, 'w', encoding=encoding, newline=newline) as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except OSError:
+            mode = 0o644   # mkstemp's 0600 would lock other readers out
+        os.chmod(tmp, mode)
+        for attempt in range(REPLACE_RETRIES):
+            try:
+                os.replace(tmp, path)
+                return
+            except PermissionError:
+                if attempt == REPLACE_RETRIES - 1:
+                    raise
+                time.sleep(REPLACE_DELAY)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _path_lock(key):
+    with _lock:
+        if key not in _locks:
+            _locks[key] = threading.Lock()
+        return _locks[key]
+
+
+def write_if_changed(path, text, encoding='utf-8', newline=None):
+    """replace() unless path already holds text - True if it was written"""
+    global written, unchanged
+    key = os.path.abspath(path)
+    digest = _digest(text)
+    # Per file, so one slow fsync or a reader holding a file open stalls only that output
+    with _path_lock(key):
+        if key not in _digests:
+            # First write this run - compare against what a previous run left
+            _digests[key] = _on_disk(path, encoding, newline)
+        if _digests[key] == digest and os.path.exists(path):
+            with _lock:
+                unchanged += 1
+            return False
+        replace(path, text, encoding, newline)
+        _digests[key] = digest
+    with _lock:
+        written += 1
+    return True
+
+
+class OutputFile:
+    """with OutputFile(path) as f: f.write(...) - written once, atomically, only if changed"""
+
+    def __init__(self, path, encoding='utf-8', newline=None):
+        self.path = path
+        self.encoding = encoding
+        self.newline = newline
+        self.changed = False
+        self.buffer = None
+
+    def __enter__(self):
+        self.buffer = io.StringIO()
+        return self.buffer
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.changed = write_if_changed(self.path, self.buffer.getvalue(), self.encoding, self.newline)
+        self.buffer = None
+        return False
+
+
+def report():
+    """'12 written, 30 unchanged'"""
+    return f"{written} written, {unchanged} unchanged"
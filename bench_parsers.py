@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - Parser Benchmarks
+- Times every page parser of write_csv, the desktop app (app_parsers,
+  pbp_log), update_sheets and local_fetcher on recorded index/bs/lds/st/pbp/p
+  pages of a small, a mid-game and an overtime game
+- Reports ops/sec and peak memory (tracemalloc) per parser and page size
+- Parse caches are cleared before every call, so each op is a cold parse
+- --save FILE keeps the numbers as a baseline; --compare FILE exits 1 when
+  a parser got slower than the baseline by more than --threshold
+
+Usage:
+  python bench_parsers.py [--save base.json] [--compare base.json]
+  python bench_parsers.py record <game url> <small|mid|ot>
+  python bench_parsers.py generate [folder]
+
+Pages are read with local_fetcher.read_local_html from bench_fixtures/<size>/,
+which is committed so baselines compare like with like. `record` replaces a
+size's pages with a live game's; `generate` writes synthetic ones in each
+page's layout instead, all from one simulated game per size so the box,
+totals, leaders and pbp agree with each other.
+"""
+
+import os
+import re
+import io
+import sys
+import json
+import time
+import random
+import argparse
+import importlib.util
+import tracemalloc
+import contextlib
+
+import parse_cache
+import app_parsers
+import local_fetcher
+import write_csv
+from pbp_log import IncrementalPbp
+from local_fetcher import read_local_html
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_fixtures')
+PAGES = ('index', 'bs', 'lds', 'st', 'pbp', 'p')
+# Play-by-play rows, last period and players dressed per team of each fixture size
+SIZES = {
+    'small': (20, 1, 8),     # a few minutes in, short bench
+    'mid': (250, 2, 10),     # half time
+    'ot': (600, 5, 12),      # overtime, full roster
+}
+MIN_TIME = 0.2   # seconds of calls per timing round
+ROUNDS = 3
+
+
+def load_update_sheets():
+    """The Actions script isn't a package module - import it from its path"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.github', 'workflows', 'update_sheets.py')
+    spec = importlib.util.spec_from_file_location('update_sheets', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def pbp_full(html):
+    """App pbp parse on a fresh log - the first poll of a game"""
+    return IncrementalPbp().parse(html)
+
+
+def pbp_repoll():
+    """App pbp parse of an unchanged page - every poll after the first"""
+    pbp = IncrementalPbp()
+    def parse(html):
+        if not pbp.rows:
+            pbp.parse(html)
+        return pbp.parse(html)
+    return parse
+
+
+def benchmarks():
+    """[(name, page, parser), ...] for every parser of the four scripts"""
+    update_sheets = load_update_sheets()
+    return [
+        ('write_csv.parse_index_page', 'index', write_csv.parse_index_page),
+        ('write_csv.parse_index_html', 'index', write_csv.parse_index_html),
+        ('write_csv.parse_index_players', 'index', write_csv.parse_index_players),
+        ('write_csv.parse_bs_html', 'bs', write_csv.parse_bs_html),
+        ('write_csv.parse_lds_html', 'lds', write_csv.parse_lds_html),
+        ('write_csv.parse_st_html', 'st', write_csv.parse_st_html),
+        ('app.parse_index', 'index', app_parsers.parse_index),
+        ('app.parse_boxscore', 'bs', app_parsers.parse_boxscore),
+        ('app.parse_csv_boxscore', 'bs', app_parsers.parse_csv_boxscore),
+        ('app.parse_leaders', 'lds', app_parsers.parse_leaders),
+        ('app.parse_periods', 'p', app_parsers.parse_periods),
+        ('app.parse_pbp', 'pbp', pbp_full),
+        ('app.parse_pbp (repoll)', 'pbp', pbp_repoll()),
+        ('update_sheets.parse_index', 'index', update_sheets.parse_index),
+        ('update_sheets.parse_boxscore', 'bs', update_sheets.parse_boxscore),
+        ('update_sheets.parse_leaders', 'lds', update_sheets.parse_leaders),
+        ('local_fetcher.parse_scoreboard', 'index', local_fetcher.parse_scoreboard),
+        ('local_fetcher.parse_boxscore', 'bs', local_fetcher.parse_boxscore),
+    ]
+
+
+# Synthetic pages - each live page's layout, filled from one seeded simulated game: the box lines,
+# team totals and leaders are added up from the same plays the pbp page lists, so they agree
+# with each other (made <= attempted, points = score, totals = sum of the players)
+PLAYER_STATS = {'sMinutes': 'min', 'sPoints': 'pts', 'sFieldGoalsMade': 'fgm', 'sFieldGoalsAttempted': 'fga',
+                'sFieldGoalsPercentage': 'fg_pct', 'sTwoPointersMade': '2pm', 'sTwoPointersAttempted': '2pa',
+                'sTwoPointersPercentage': '2p_pct', 'sThreePointersMade': '3pm', 'sThreePointersAttempted': '3pa',
+                'sThreePointersPercentage': '3p_pct', 'sFreeThrowsMade': 'ftm', 'sFreeThrowsAttempted': 'fta',
+                'sFreeThrowsPercentage': 'ft_pct', 'sReboundsOffensive': 'off', 'sReboundsDefensive': 'def',
+                'sReboundsTotal': 'reb', 'sAssists': 'ast', 'sTurnovers': 'to', 'sSteals': 'stl',
+                'sBlocks': 'blk', 'sBlocksReceived': 'blkr', 'sFoulsPersonal': 'pf', 'sFoulsOn': 'fld_on',
+                'sPlusMinusPoints': 'plus_minus', 'eff_1': 'eff'}
+TEAM_STATS = {'sFieldGoalsMade': 'fgm', 'sFieldGoalsAttempted': 'fga', 'sFieldGoalsPercentage': 'fg_pct',
+              'sTwoPointersMade': '2pm', 'sTwoPointersAttempted': '2pa', 'sTwoPointersPercentage': '2p_pct',
+              'sThreePointersMade': '3pm', 'sThreePointersAttempted': '3pa', 'sThreePointersPercentage': '3p_pct',
+              'sFreeThrowsMade': 'ftm', 'sFreeThrowsAttempted': 'fta', 'sFreeThrowsPercentage': 'ft_pct',
+              'sReboundsOffensive': 'off', 'sReboundsDefensive': 'def', 'sReboundsTotal': 'reb',
+              'sAssists': 'ast', 'sSteals': 'stl', 'sBlocks': 'blk', 'sTurnovers': 'to', 'sFoulsPersonal': 'pf',
+              'sPoints': 'pts', 'sPointsFromTurnovers': 'pts_turnovers', 'sPointsInThePaint': 'pts_paint',
+              'sPointsSecondChance': 'pts_second', 'sPointsFastBreak': 'pts_fast', 'sBenchPoints': 'bench_pts'}
+# pbp text -> (how often it happens, the counts it adds to the player's line); the weights
+# give a game's usual shooting - about 45% on twos, 33% on threes, 75% from the line
+ACTIONS = {
+    '2pt jumpshot made': (3, ('2pm', '2pa')), '2pt jumpshot missed': (5, ('2pa',)),
+    '2pt layup made': (4, ('2pm', '2pa', 'paint')), '2pt layup missed': (3, ('2pa',)),
+    '3pt jumpshot made': (2, ('3pm', '3pa')), '3pt jumpshot missed': (4, ('3pa',)),
+    'free throw 1 of 2 made': (3, ('ftm', 'fta')), 'free throw 1 of 2 missed': (1, ('fta',)),
+    'defensive rebound': (6, ('def',)), 'offensive rebound': (2, ('off',)), 'assist': (4, ('ast',)),
+    'personal foul': (4, ('pf',)), 'turnover; bad pass': (3, ('to',)), 'steal': (2, ('stl',)),
+    'block': (1, ('blk',)),
+}
+ACTION_WEIGHTS = [weight for weight, _ in ACTIONS.values()]
+COUNTS = ('2pm', '2pa', '3pm', '3pa', 'ftm', 'fta', 'off', 'def', 'ast', 'stl', 'blk', 'blkr',
+          'to', 'pf', 'fld_on', 'paint')
+
+
+def span(sid, val, by_class=False):
+    # Some live spans carry the value in their class (aj_12) instead of their text
+    if by_class:
+        return f'<span id="{sid}" class="aj_{val}"></span>'
+    return f'<span id="{sid}">{val}</span>'
+
+
+def pct(made, attempted):
+    return round(100 * made / attempted) if attempted else 0
+
+
+def game_seconds(periods):
+    """Seconds played by the end of periods - 10 minute quarters, 5 minute overtimes"""
+    return 600 * min(periods, 4) + 300 * max(periods - 4, 0)
+
+
+def simulate(r, events, periods, roster):
+    """One game's plays and the box score they add up to
+
+    Returns (pbp rows oldest first as (period, html), {team: [player line]}, {team: totals}).
+    """
+    lines = {team: [dict.fromkeys(COUNTS, 0) for _ in range(roster)] for team in (1, 2)}
+    # Starters are on the floor about three times as long as the bench
+    weights = [3 if pid < 5 else 1 for pid in range(roster)]
+    score = {1: 0, 2: 0}
+    rows = []
+    for e in range(events):
+        team = r.choice((1, 2))
+        other = 3 - team
+        pid = r.choices(range(roster), weights)[0]
+        action = r.choices(list(ACTIONS), ACTION_WEIGHTS)[0]
+        line = lines[team][pid]
+        for count in ACTIONS[action][1]:
+            line[count] += 1
+        if action == 'block':
+            lines[other][r.choices(range(roster), weights)[0]]['blkr'] += 1
+        elif action == 'personal foul':
+            lines[other][r.choices(range(roster), weights)[0]]['fld_on'] += 1
+        if 'made' in action:
+            score[team] += 3 if '3pt' in action else 1 if 'free throw' in action else 2
+        period = 1 + e * periods // max(events, 1)
+        left = 599 - (e * 600 * periods // max(events, 1)) % 600
+        rows.append((period, f'<div class="pbpa pbp-team{team}"><span class="pbp-period">P{period}</span>'
+                             f'<div class="pbp-time">{left // 60:02d}:{left % 60:02d}</div>'
+                             f'<span class="pbpsc">{score[1]} - {score[2]}</span>'
+                             f'<div class="pbp-action"><strong>{pid + 4}, P{team}. Player{pid + 1}</strong> {action}</div></div>'))
+
+    played = game_seconds(periods)
+    totals = {}
+    for team in (1, 2):
+        # Five players on the floor the whole time, shared out by weight
+        seconds = [5 * played * w // sum(weights) for w in weights]
+        seconds[0] += 5 * played - sum(seconds)
+        margin = score[team] - score[3 - team]
+        for pid, line in enumerate(lines[team]):
+            line['fgm'] = line['2pm'] + line['3pm']
+            line['fga'] = line['2pa'] + line['3pa']
+            line['pts'] = 2 * line['2pm'] + 3 * line['3pm'] + line['ftm']
+            line['reb'] = line['off'] + line['def']
+            line['fg_pct'] = pct(line['fgm'], line['fga'])
+            line['2p_pct'] = pct(line['2pm'], line['2pa'])
+            line['3p_pct'] = pct(line['3pm'], line['3pa'])
+            line['ft_pct'] = pct(line['ftm'], line['fta'])
+            line['min'] = f"{seconds[pid] // 60:02d}:{seconds[pid] % 60:02d}"
+            line['plus_minus'] = round(margin * seconds[pid] / played)
+            line['eff'] = (line['pts'] + line['reb'] + line['ast'] + line['stl'] + line['blk']
+                           - (line['fga'] - line['fgm']) - (line['fta'] - line['ftm']) - line['to'])
+        tot = {key: sum(line[key] for line in lines[team])
+               for key in COUNTS + ('fgm', 'fga', 'pts', 'reb')}
+        tot['fg_pct'] = pct(tot['fgm'], tot['fga'])
+        tot['2p_pct'] = pct(tot['2pm'], tot['2pa'])
+        tot['3p_pct'] = pct(tot['3pm'], tot['3pa'])
+        tot['ft_pct'] = pct(tot['ftm'], tot['fta'])
+        tot['pts_paint'] = 2 * tot['paint']
+        tot['bench_pts'] = sum(line['pts'] for line in lines[team][5:])
+        # Not in the pbp text - any share of the points will do
+        for key in ('pts_turnovers', 'pts_second', 'pts_fast'):
+            tot[key] = r.randint(0, tot['pts'] // 5)
+        totals[team] = tot
+    return rows, lines, totals
+
+
+def header(score, periods):
+    """Scoreboard and team logos - at the top of every page"""
+    return ['<html><head><title>NEBL</title></head><body><div class="header">',
+            span('aj_1_shortName', 'HOM'), span('aj_1_score', score[1]),
+            span('aj_2_shortName', 'AWY'), span('aj_2_score', score[2], by_class=True),
+            span('aj_period', periods), span('aj_clock', '03:00'), '</div>',
+            '<img class="logo home-logo" alt="Home Club"><img class="logo away-logo" alt="Away Club">']
+
+
+def box_tables(r, lines, totals, full=True):
+    """Both teams' player rows and totals - index.html has no steals/blocks/turnovers columns"""
+    stats = {s: k for s, k in PLAYER_STATS.items() if full or s not in ('sSteals', 'sBlocks', 'sTurnovers')}
+    out = []
+    for team in (1, 2):
+        out.append(f'<table><tbody class="team-{team - 1}-person-container">')
+        # Two empty roster slots after the players dressed, as the live page leaves them
+        for pid in range(1, len(lines[team]) + 3):
+            line = lines[team][pid - 1] if pid <= len(lines[team]) else None
+            cls = 'player-row' + (' p_starter' if pid <= 5 else '') + ('' if line else ' row-not-used')
+            out.append(f'<tr id="aj_{team}_{pid}_row" class="{cls}">')
+            out.append('<td>' + span(f'aj_{team}_{pid}_shirtNumber', pid + 3, by_class=(pid % 4 == 0)) + '</td>')
+            out.append('<td><a href="#">' + span(f'aj_{team}_{pid}_name', f'P{team}. Player{pid}' if line else '') + '</a></td>')
+            out.append('<td>' + span(f'aj_{team}_{pid}_playingPosition', 'G' if line else '') + '</td>')
+            for stat, key in stats.items():
+                out.append('<td>' + span(f'aj_{team}_{pid}_{stat}', line[key] if line else '',
+                                         by_class=bool(line) and r.random() < 0.2) + '</td>')
+            out.append('</tr>')
+        out.append('</tbody><tbody class="team-totals"><tr>')
+        out.extend(team_totals(totals[team], team))
+        out.append('</tr></tbody></table>')
+    return out
+
+
+def team_totals(totals, team):
+    return ['<td>' + span(f'aj_{team}_tot_{stat}', totals[key]) + '</td>' for stat, key in TEAM_STATS.items()]
+
+
+def leaders(lines, team, key):
+    """(pid, value) of the top five of a team in one stat"""
+    ranked = sorted(range(len(lines[team])), key=lambda pid: -lines[team][pid][key])
+    return [(pid + 1, lines[team][pid][key]) for pid in ranked[:5]]
+
+
+def leader_spans(lines, stats=('sPoints', 'sReboundsTotal', 'sAssists', 'sSteals')):
+    out = []
+    for team in (1, 2):
+        for stat in stats:
+            for rank, (pid, val) in enumerate(leaders(lines, team, PLAYER_STATS[stat]), 1):
+                out.append(f'<div><span class="id_aj_{team}_{stat}_{rank}_name">P{team}. Player{pid}</span>'
+                           f'<span class="id_aj_{team}_{stat}_{rank}_shirtNumber">{pid + 3}</span>'
+                           f'<span class="id_aj_{team}_{stat}_{rank}_tot">{val}</span></div>')
+    return out
+
+
+def leaders_table(lines):
+    out = ['<table class="leaders">']
+    for rank, (pid, val) in enumerate(leaders(lines, 1, 'pts'), 1):
+        out.append(f'<tr><td>{rank}</td><td>P1. Player{pid}</td><td>{val}</td></tr>')
+    out.append('</table>')
+    return out
+
+
+def synthetic_pages(events, periods, roster, seed=1):
+    """{page: html} in the layout of each live page for one simulated game"""
+    r = random.Random(seed)
+    rows, lines, totals = simulate(r, events, periods, roster)
+    score = {team: totals[team]['pts'] for team in (1, 2)}
+    # Score after each period - what p.html lists
+    ends = {period: row for period, row in rows}
+    # The live pbp lists the newest play first
+    newest_first = [row for _, row in reversed(rows)]
+    pages = {
+        'index': box_tables(r, lines, totals, full=False) + ['<div id="pbp">'] + newest_first[:10] + ['</div>'],
+        'bs': box_tables(r, lines, totals) + leader_spans(lines, ('sPoints', 'sReboundsTotal', 'sAssists')),
+        'lds': leader_spans(lines) + leaders_table(lines),
+        'st': (['<table class="team-stats"><tr>'] + team_totals(totals[1], 1) + ['</tr><tr>']
+               + team_totals(totals[2], 2) + ['</tr></table>']),
+        'pbp': ['<div id="pbp">'] + newest_first + ['</div>'],
+        'p': ['<div id="periods">'] + [ends[period] for period in sorted(ends)] + ['</div>'],
+    }
+    return {page: ''.join(header(score, periods) + body + ['</body></html>']) for page, body in pages.items()}
+
+
+def has_fixtures(folder=FIXTURES):
+    return any(os.path.exists(os.path.join(folder, size, f'{page}.html')) for size in SIZES for page in PAGES)
+
+
+def generate(folder=FIXTURES):
+    """Write synthetic pages for every size - stand-ins until `record` has real ones"""
+    for size, (events, periods, roster) in SIZES.items():
+        path = os.path.join(folder, size)
+        os.makedirs(path, exist_ok=True)
+        for page, html in synthetic_pages(events, periods, roster).items():
+            with open(os.path.join(path, f'{page}.html'), 'w', encoding='utf-8', newline='\n') as f:
+                f.write(html)
+        print(f"Generated synthetic {size} pages in {path}")
+
+
+def record(game_url, size, folder=FIXTURES):
+    """Save a live game's pages as the fixtures of one size"""
+    match = re.search(r'/u/BBF/(\d+)', game_url)
+    game_id = match.group(1) if match else game_url.strip()
+    base_url = f"https://fibalivestats.dcd.shared.geniussports.com/u/BBF/{game_id}"
+    htmls = write_csv.fetch_all({page: f"{base_url}/{page}.html" for page in PAGES})
+    path = os.path.join(folder, size)
+    os.makedirs(path, exist_ok=True)
+    for page, html in htmls.items():
+        if not html:
+            print(f"  {page}.html: nothing fetched, kept the old file")
+            continue
+        with open(os.path.join(path, f'{page}.html'), 'w', encoding='utf-8') as f:
+            f.write(html)
+        print(f"  {page}.html: {len(html)} bytes")
+
+
+def cold(parser, html):
+    parse_cache.RESULTS.clear()
+    parse_cache.INDEXES.clear()
+    return parser(html)
+
+
+def ops_per_sec(parser, html, min_time=MIN_TIME, rounds=ROUNDS):
+    """Best of rounds, each calling parser until min_time has passed"""
+    best = 0.0
+    for _ in range(rounds):
+        calls = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time or calls < 3:
+            cold(parser, html)
+            calls += 1
+            elapsed = time.perf_counter() - start
+        best = max(best, calls / elapsed)
+    return best
+
+
+def peak_memory(parser, html):
+    """Peak bytes allocated during one cold parse"""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        cold(parser, html)
+        return tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+
+def run(folder=FIXTURES, min_time=MIN_TIME, only=None):
+    """{size: {benchmark: {'ops', 'peak_kb', 'page_kb'}}}"""
+    results = {}
+    benches = [b for b in benchmarks() if not only or re.search(only, b[0])]
+    for size in SIZES:
+        path = os.path.join(folder, size)
+        pages = {page: read_local_html(path, f'{page}.html') for page in PAGES}
+        results[size] = {}
+        print(f"\n{size} ({len(pages['bs']) // 1024} KB bs.html)")
+        print(f"  {'parser':<36}{'ops/sec':>10}{'peak KB':>10}")
+        for name, page, parser in benches:
+            html = pages[page]
+            if not html:
+                print(f"  {name:<36}{'no ' + page + '.html':>20}")
+                continue
+            # write_csv.parse_bs_html prints its player counts - keep them out of the table
+            with contextlib.redirect_stdout(io.StringIO()):
+                ops = ops_per_sec(parser, html, min_time)
+                peak = peak_memory(parser, html)
+            results[size][name] = {'ops': round(ops, 1), 'peak_kb': round(peak / 1024, 1),
+                                   'page_kb': round(len(html) / 1024, 1)}
+            print(f"  {name:<36}{ops:>10.1f}{peak / 1024:>10.0f}")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Benchmarks slower than baseline by more than threshold - [(size, name, old ops, new ops)]"""
+    slower = []
+    for size, benches in results.items():
+        for name, res in benches.items():
+            old = baseline.get(size, {}).get(name)
+            if old and res['ops'] < old['ops'] * (1 - threshold):
+                slower.append((size, name, old['ops'], res['ops']))
+    return slower
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'record':
+        if len(sys.argv) != 4 or sys.argv[3] not in SIZES:
+            print(f"Usage: python bench_parsers.py record <game url> <{'|'.join(SIZES)}>")
+            sys.exit(2)
+        record(sys.argv[2], sys.argv[3])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == 'generate':
+        generate(sys.argv[2] if len(sys.argv) > 2 else FIXTURES)
+        return
+
+    ap = argparse.ArgumentParser(description="Time the page parsers on recorded fixtures")
+    ap.add_argument('--fixtures', default=FIXTURES, help="folder with small/mid/ot page folders")
+    ap.add_argument('--only', help="regex of benchmark names to run")
+    ap.add_argument('--min-time', type=float, default=MIN_TIME, help="seconds per timing round")
+    ap.add_argument('--save', help="write results as a baseline JSON")
+    ap.add_argument('--compare', help="baseline JSON to check for regressions")
+    ap.add_argument('--threshold', type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    args = ap.parse_args()
+
+    if not has_fixtures(args.fixtures):
+        print(f"No fixtures in {args.fixtures} - `record` a game, or `generate` synthetic pages")
+        sys.exit(2)
+    results = run(args.fixtures, args.min_time, args.only)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        slower = compare(results, baseline, args.threshold)
+        if slower:
+            print(f"\n✗ {len(slower)} regression(s) over {args.threshold:.0%}:")
+            for size, name, old, new in slower:
+                print(f"  {size:<6}{name:<36}{old:>10.1f} -> {new:.1f} ops/sec")
+            sys.exit(1)
+        print(f"\n✓ No parser slower than {args.compare} by more than {args.threshold:.0%}")
+
+
+if __name__ == '__main__':
+    main()
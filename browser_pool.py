@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - Shared Chromium Pool
+- One headless browser launched once per process
+- Tabs reused across poll cycles
+- Broken tabs/browsers recycled on failure
+- Safe to call from any thread (Tk watch thread, main loop, etc.)
+- Light profile (default) skips images/fonts/CSS/media, trackers and
+  service workers; set NEBL_BROWSER_PROFILE=full to load pages the way a
+  browser would
+- capture_json (feed discovery) always loads its page in the full profile,
+  so the light filter can never hide the request it is looking for
+"""
+
+import os
+import time
+import asyncio
+import atexit
+import threading
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+VIEWPORT = {"width": 1920, "height": 1080}
+
+# The stats are rendered by page JS from first-party data, so the light
+# profile keeps scripts and XHR but drops everything only a human looks at.
+# It also blocks service workers: their requests would get past the route filter.
+PROFILES = {
+    'full': {'viewport': VIEWPORT, 'block_types': (), 'filter_hosts': False, 'service_workers': 'allow'},
+    'light': {
+        'viewport': {"width": 800, "height": 600},
+        'block_types': ('image', 'imageset', 'font', 'stylesheet', 'media', 'texttrack', 'manifest'),
+        'filter_hosts': True,
+        'service_workers': 'block',
+    },
+}
+FIRST_PARTY = ('geniussports.com', 'localhost', '127.0.0.1')
+# Third-party requests still allowed in light mode (a page script may come from a CDN)
+THIRD_PARTY_TYPES = ('document', 'script', 'xhr', 'fetch')
+TRACKER_HOSTS = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+    'facebook.net', 'facebook.com', 'hotjar.com', 'scorecardresearch.com', 'twitter.com',
+)
+
+# Readiness: the page is done as soon as its aj_ containers are populated by
+# the Genius Sports scripts - a span counts once it has text or an aj_<value> class
+_FILLED = "(el => !!el && (el.textContent.trim() !== '' || [...el.classList].some(c => c.startsWith('aj_'))))"
+_ANY_FILLED = f"(sel => [...document.querySelectorAll(sel)].some({_FILLED}))"
+READY_CHECKS = {
+    'index.html': f"{_FILLED}(document.getElementById('aj_1_score')) && {_ANY_FILLED}('.team-0-person-container [id$=\"_name\"]')",
+    'bs.html': f"{_FILLED}(document.getElementById('aj_1_score')) && {_ANY_FILLED}('.team-0-person-container [id$=\"_name\"]')",
+    'lds.html': f"{_ANY_FILLED}('[class*=\"_sPoints_1_name\"]')",
+    'pbp.html': "document.querySelector('.pbpa') !== null",
+}
+READY_DEFAULT = f"{_ANY_FILLED}('span[id^=\"aj_\"]')"
+READY_TIMEOUT = 15000
+READY_POLL_MS = 100   # wait_for_function only takes "raf" or an interval
+
+
+def ready_check(url):
+    """JS predicate that says url's page has rendered its data"""
+    return READY_CHECKS.get(url.split('?')[0].rsplit('/', 1)[-1], READY_DEFAULT)
+
+
+class BrowserPool:
+    """Long-lived Chromium running on its own asyncio loop thread"""
+
+    def __init__(self, tabs=5, headless=True, user_agent=USER_AGENT, profile=None):
+        self.tabs = tabs
+        self.headless = headless
+        self.user_agent = user_agent
+        self.profile = profile or os.environ.get('NEBL_BROWSER_PROFILE', 'light')
+        if self.profile not in PROFILES:
+            raise ValueError(f"Unknown browser profile {self.profile!r} (use {' or '.join(PROFILES)})")
+        self.settings = PROFILES[self.profile]
+
+        # Requests let through / aborted by the route filter
+        self.requests = 0
+        self.blocked = 0
+
+        self._pw = None
+        self._browser = None
+        self._context = None
+        self._idle = []
+        self._slots = None
+        self._launch_lock = None
+
+        # Last readiness latency per page file, in ms (None = timed out)
+        self.ready_ms = {}
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="nebl-browser", daemon=True)
+        self._thread.start()
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the browser loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    def fetch(self, url, ready=None, timeout=60000, ready_timeout=READY_TIMEOUT):
+        """Load url in a pooled tab and return the HTML as soon as its data is rendered"""
+        return self.run(self._fetch(url, ready, timeout, ready_timeout))
+
+    def fetch_many(self, urls, retries=1, **opts):
+        """Load a {name: url} dict in parallel tabs and return {name: html}
+
+        The cycle costs as long as the slowest page. Pages that still fail
+        after retries come back as an empty string.
+        """
+        return self.run(self._fetch_many(urls, retries, opts))
+
+    def capture_json(self, url, match, timeout=30000, profile='full'):
+        """Open url and return (response url, payload) of the first JSON response whose URL contains match"""
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown browser profile {profile!r} (use {' or '.join(PROFILES)})")
+        return self.run(self._capture_json(url, match, timeout, profile))
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+        try:
+            self.run(self._shutdown(), timeout=15)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    async def _ensure_browser(self):
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+            self._slots = asyncio.Semaphore(self.tabs)
+        async with self._launch_lock:
+            if self._browser and self._browser.is_connected():
+                return
+            await self._drop_browser()
+            if not self._pw:
+                self._pw = await async_playwright().start()
+            self._browser = await self._pw.chromium.launch(headless=self.headless)
+            self._context = await self._browser.new_context(
+                user_agent=self.user_agent,
+                viewport=self.settings['viewport'],
+                service_workers=self.settings['service_workers'],
+            )
+            # Routed in both profiles so their request counts can be compared
+            await self._context.route("**/*", self._route)
+
+    def allowed(self, url, resource_type, settings=None):
+        """Route filter decision for one request, under settings (the pool's profile by default)"""
+        settings = settings or self.settings
+        if resource_type in settings['block_types']:
+            return False
+        if not settings['filter_hosts']:
+            return True
+        host = url.split('://', 1)[-1].split('/', 1)[0].split(':', 1)[0].lower()
+        if any(host == h or host.endswith('.' + h) for h in TRACKER_HOSTS):
+            return False
+        if any(host == h or host.endswith('.' + h) for h in FIRST_PARTY):
+            return True
+        return resource_type in THIRD_PARTY_TYPES
+
+    async def _route(self, route, settings=None):
+        request = route.request
+        if self.allowed(request.url, request.resource_type, settings):
+            self.requests += 1
+            await route.continue_()
+        else:
+            self.blocked += 1
+            await route.abort()
+
+    async def new_page(self):
+        """Dedicated tab outside the pool, for pages kept open (caller closes it)"""
+        await self._ensure_browser()
+        return await self._context.new_page()
+
+    async def _drop_browser(self):
+        self._idle = []
+        browser, self._browser, self._context = self._browser, None, None
+        if browser:
+            try:
+                await browser.close()
+            except Exception:
+                pass
+
+    async def _acquire(self):
+        await self._ensure_browser()
+        await self._slots.acquire()
+        while self._idle:
+            page = self._idle.pop()
+            if not page.is_closed():
+                return page
+        try:
+            return await self._context.new_page()
+        except Exception:
+            self._slots.release()
+            raise
+
+    async def _release(self, page, ok):
+        if ok and self._browser and self._browser.is_connected():
+            self._idle.append(page)
+        else:
+            # Recycle: throw away the tab, and the whole browser if it died
+            try:
+                await page.close()
+            except Exception:
+                pass
+            if not (self._browser and self._browser.is_connected()):
+                await self._drop_browser()
+        self._slots.release()
+
+    def readiness_report(self):
+        return ", ".join(f"{name} {'timeout' if ms is None else f'{ms:.0f}ms'}"
+                         for name, ms in sorted(self.ready_ms.items()))
+
+    def traffic_report(self):
+        return f"{self.profile} profile: {self.requests} requests, {self.blocked} blocked"
+
+    async def _fetch(self, url, ready, timeout, ready_timeout):
+        page = await self._acquire()
+        ok = False
+        try:
+            started = time.perf_counter()
+            await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+            try:
+                await page.wait_for_function(ready or ready_check(url), timeout=ready_timeout, polling=READY_POLL_MS)
+                ready_ms = (time.perf_counter() - started) * 1000
+            except PlaywrightTimeoutError:
+                # Not populated (e.g. before tip-off) - take what rendered
+                ready_ms = None
+            self.ready_ms[url.split('?')[0].rsplit('/', 1)[-1]] = ready_ms
+            html = await page.content()
+            ok = True
+            return html
+        finally:
+            await self._release(page, ok)
+
+    async def _capture_json(self, url, match, timeout, profile):
+        page = await self._acquire()
+        ok = False
+        route = None
+        try:
+            if profile != self.profile:
+                # A page route is matched before the context's, so this tab alone loads as profile does
+                settings = PROFILES[profile]
+                route = lambda r: self._route(r, settings)
+                await page.route("**/*", route)
+                await page.set_viewport_size(settings['viewport'])
+            async with page.expect_response(lambda r: match in r.url and r.ok, timeout=timeout) as info:
+                await page.goto(url, wait_until="commit", timeout=timeout)
+            response = await info.value
+            payload = await response.json()
+            ok = True
+            return response.url, payload
+        finally:
+            if route:
+                # Back to the pool's profile before the tab is reused
+                try:
+                    await page.unroute("**/*", route)
+                    await page.set_viewport_size(self.settings['viewport'])
+                except Exception:
+                    ok = False
+            await self._release(page, ok)
+
+    async def _fetch_many(self, urls, retries, opts):
+        names = list(urls)
+        results = await asyncio.gather(*[self._fetch_retry(urls[n], retries, opts) for n in names])
+        return dict(zip(names, results))
+
+    async def _fetch_retry(self, url, retries, opts):
+        opts = {"ready": None, "timeout": 60000, "ready_timeout": READY_TIMEOUT, **opts}
+        for attempt in range(retries):
+            try:
+                return await self._fetch(url, **opts)
+            except Exception as e:
+                print(f"Fetch {url} attempt {attempt+1} failed: {e}")
+                if attempt < retries - 1:
+                    await asyncio.sleep(2)
+        return ""
+
+    async def _shutdown(self):
+        await self._drop_browser()
+        if self._pw:
+            await self._pw.stop()
+            self._pw = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Process-wide pool shared by the GUI, CSV writer and Sheets fetcher"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.close)
+        return _pool
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - Live JSON Feed
+- Polls the data.json the Genius Sports pages render their aj_* spans from
+- No browser, no DOM, no BeautifulSoup once the feed URL is known
+- Falls back to capturing the page's own data response to discover it
+- Can record payloads and serve them back as a local stand-in
+
+Usage:
+    python feed.py record <game id> <folder> [polls] [interval]
+    python feed.py serve <folder> [port]
+    set NEBL_FEED_BASE=http://127.0.0.1:8765   (point the fetchers at it)
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from span_data import to_int
+from page_tracker import PageTracker
+from http_fetch import get_fetcher
+
+FEED_BASE = os.environ.get('NEBL_FEED_BASE', 'https://fibalivestats.dcd.shared.geniussports.com').rstrip('/')
+PAGE_BASE = "https://fibalivestats.dcd.shared.geniussports.com/u/BBF"
+
+ACTION_EVENTS = {
+    'rebound': 'rebound', 'assist': 'assist', 'foul': 'foul',
+    'turnover': 'turnover', 'steal': 'steal', 'block': 'block',
+}
+SHOT_POINTS = {'freethrow': 1, '2pt': 2, '3pt': 3}
+
+
+def feed_url(game_id, base=None):
+    return f"{base or FEED_BASE}/data/{game_id}/data.json"
+
+
+def spans_from_feed(feed):
+    """Flatten the feed into the {span id: value} map the page would show
+
+    aj_<key>               top level (clock, period, ...)
+    aj_<tno>_<key>         team (score, shortName, tot_sPoints, p1_score, ...)
+    aj_<tno>_<pno>_<key>   player (name, shirtNumber, sPoints, starter, ...)
+    id_aj_<tno>_<stat>_<rank>_<key>   leaders (name, tot, shirtNumber)
+    """
+    spans = {}
+    for key, val in feed.items():
+        if not isinstance(val, (dict, list)):
+            spans[f'aj_{key}'] = val
+
+    for tno, team in (feed.get('tm') or {}).items():
+        for key, val in team.items():
+            if not isinstance(val, (dict, list)):
+                spans[f'aj_{tno}_{key}'] = val
+
+        for pno, player in (team.get('pl') or {}).items():
+            for key, val in player.items():
+                if not isinstance(val, (dict, list)):
+                    spans[f'aj_{tno}_{pno}_{key}'] = val
+
+        for stat, block in (team.get('lds') or {}).items():
+            rows = block.get('lds', []) if isinstance(block, dict) else block
+            for rank, row in enumerate(rows or [], 1):
+                for key in ('name', 'tot', 'shirtNumber'):
+                    if key in row:
+                        spans[f'id_aj_{tno}_{stat}_{rank}_{key}'] = row[key]
+
+    return spans
+
+
+def pbp_events(feed):
+    """Feed pbp (newest first) as the oldest-first event list parse_pbp returns"""
+    events = []
+    for action in reversed(feed.get('pbp') or []):
+        kind = str(action.get('actionType', '')).lower()
+        event_type = "unknown"
+        pts = None
+        if kind in SHOT_POINTS and action.get('success'):
+            event_type = "score"
+            pts = SHOT_POINTS[kind]
+        elif kind in ACTION_EVENTS:
+            event_type = ACTION_EVENTS[kind]
+
+        clock = None
+        m = re.match(r'(\d{1,2}:\d{2})', str(action.get('gt') or action.get('clock') or ''))
+        if m:
+            clock = m.group(1)
+
+        tno = str(action.get('tno', ''))
+        events.append({
+            'period': action.get('period'), 'clock': clock,
+            'team': 'home' if tno == '1' else 'away' if tno == '2' else None,
+            'player': action.get('player') or None,
+            'event': event_type, 'points': pts,
+            'home_score': to_int(action.get('s1')), 'away_score': to_int(action.get('s2'))
+        })
+    return events
+
+
+class FeedClient:
+    """Polls one game's feed over the shared keep-alive client"""
+
+    def __init__(self, game_id, base=None):
+        self.game_id = game_id
+        self.page_url = f"{PAGE_BASE}/{game_id}/index.html"
+        self.url = feed_url(game_id, base)
+        self.discovered = False
+        self.tracker = PageTracker()
+        # Shared keep-alive client (HTTP/2 + brotli when available)
+        self.client = get_fetcher().client
+
+    def poll(self):
+        """Latest feed payload as a dict, or None if unchanged since the last poll"""
+        try:
+            headers = {'Accept': 'application/json', **self.tracker.headers(self.url)}
+            response = self.client.get(self.url, headers=headers, timeout=15)
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+            if not self.tracker.changed(self.url, response.content, response.headers):
+                return None
+            return response.json()
+        except Exception as e:
+            if self.discovered:
+                raise
+            # The known URL didn't work - let the page show us where its data lives
+            print(f"Feed {self.url} failed ({e}), discovering from page...")
+            from browser_pool import get_pool
+            self.url, payload = get_pool().capture_json(self.page_url, 'data.json', profile='full')
+            self.discovered = True
+            print(f"Feed discovered: {self.url}")
+            return payload
+
+
+def record(game_id, folder, polls=0, interval=1.0):
+    """Save successive payloads as feed_0001.json, feed_0002.json, ..."""
+    os.makedirs(folder, exist_ok=True)
+    client = FeedClient(game_id)
+    n = 0
+    while not polls or n < polls:
+        try:
+            payload = client.poll()
+            if payload is None:
+                time.sleep(interval)
+                continue
+            n += 1
+            path = os.path.join(folder, f"feed_{n:04d}.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f)
+            print(f"Recorded {path}")
+        except KeyboardInterrupt:
+            break
+        except Exception as e:
+            print(f"Error: {e}")
+        time.sleep(interval)
+
+
+def make_server(folder, port=8765):
+    """Stand-in feed: each GET /data/<id>/data.json returns the next recording, then holds the last"""
+    files = sorted(f for f in os.listdir(folder) if f.endswith('.json'))
+    if not files:
+        raise FileNotFoundError(f"No recorded .json payloads in {folder}")
+    state = {'next': 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if not re.match(r'^/data/[^/]+/data\.json', self.path):
+                self.send_error(404)
+                return
+            with lock:
+                name = files[min(state['next'], len(files) - 1)]
+                state['next'] += 1
+            with open(os.path.join(folder, name), 'rb') as f:
+                body = f.read()
+            etag = '"%s"' % hashlib.sha1(body).hexdigest()
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return ThreadingHTTPServer(('127.0.0.1', port), Handler)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in ('record', 'serve'):
+        print(__doc__)
+        sys.exit(1)
+
+    if sys.argv[1] == 'record':
+        record(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else 'feed_recording',
+               int(sys.argv[4]) if len(sys.argv) > 4 else 0,
+               float(sys.argv[5]) if len(sys.argv) > 5 else 1.0)
+    else:
+        port = int(sys.argv[3]) if len(sys.argv) > 3 else 8765
+        server = make_server(sys.argv[2], port)
+        print(f"Serving recorded feed from {sys.argv[2]} on http://127.0.0.1:{port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("Stopped.")
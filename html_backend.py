@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - HTML Parser Backends
+- selectolax (lexbor) > lxml > html.parser, whichever is installed
+- NEBL_HTML_BACKEND=selectolax|lxml|html.parser to force one
+- walk(): one start/text/end pass for span_index.SpanIndex
+- soup(): BeautifulSoup on the lxml tree builder when available, for the
+  parsers that still need the soup API (pbp, periods, ...)
+"""
+
+import os
+from bs4 import BeautifulSoup, Tag, NavigableString, CData
+
+TEXT_TYPES = (NavigableString, CData)
+
+
+def _available():
+    found = []
+    try:
+        from selectolax.lexbor import LexborHTMLParser  # noqa: F401
+        found.append('selectolax')
+    except ImportError:
+        pass
+    try:
+        from lxml import etree  # noqa: F401
+        found.append('lxml')
+    except ImportError:
+        pass
+    found.append('html.parser')
+    return found
+
+
+AVAILABLE = _available()
+
+
+def pick(name=None):
+    """Requested backend if installed, else the fastest one that is"""
+    name = name or os.environ.get('NEBL_HTML_BACKEND', '')
+    if name and name not in AVAILABLE:
+        print(f"HTML backend {name} not installed, using {AVAILABLE[0]}")
+    return name if name in AVAILABLE else AVAILABLE[0]
+
+
+BACKEND = pick()
+
+
+def soup(html, backend=None):
+    """BeautifulSoup for html, built by lxml unless only html.parser is wanted/available"""
+    backend = backend or BACKEND
+    builder = 'lxml' if backend != 'html.parser' and 'lxml' in AVAILABLE else 'html.parser'
+    return BeautifulSoup(html, builder)
+
+
+def walk(html, start, text, end, backend=None):
+    """Stream html as start(tag, id, classes) / text(str) / end(tag) calls
+
+    html may also be an already-parsed BeautifulSoup tree.
+    """
+    if isinstance(html, Tag):
+        _walk_soup(html, start, text, end)
+        return
+    backend = backend or BACKEND
+    if not html:
+        return
+    if backend == 'selectolax':
+        _walk_selectolax(html, start, text, end)
+    elif backend == 'lxml':
+        _walk_lxml(html, start, text, end)
+    else:
+        _walk_soup(BeautifulSoup(html, 'html.parser'), start, text, end)
+
+
+def _walk_soup(tag, start, text, end):
+    for node in tag.children:
+        if isinstance(node, Tag):
+            start(node.name, node.get('id'), node.get('class') or [])
+            _walk_soup(node, start, text, end)
+            end(node.name)
+        elif type(node) in TEXT_TYPES:
+            text(str(node))
+
+
+def _walk_lxml(html, start, text, end):
+    from lxml import etree
+    root = etree.fromstring(html, etree.HTMLParser())
+    if root is None:
+        return
+    for event, el in etree.iterwalk(root, events=('start', 'end', 'comment', 'pi')):
+        if event in ('comment', 'pi'):
+            # Only the text after it is page text
+            if el.tail:
+                text(el.tail)
+        elif event == 'start':
+            start(el.tag, el.get('id'), (el.get('class') or '').split())
+            if el.text:
+                text(el.text)
+        else:
+            end(el.tag)
+            if el.tail:
+                text(el.tail)
+
+
+def _walk_selectolax(html, start, text, end):
+    from selectolax.lexbor import LexborHTMLParser
+    root = LexborHTMLParser(html).root
+    if root is None:
+        return
+
+    def visit(node):
+        for child in node.iter(include_text=True):
+            tag = child.tag
+            if tag == '-text':
+                text(child.text_content or '')
+            elif tag.startswith('-'):
+                continue
+            else:
+                attrs = child.attributes
+                start(tag, attrs.get('id'), (attrs.get('class') or '').split())
+                visit(child)
+                end(tag)
+
+    start(root.tag, root.attributes.get('id'), (root.attributes.get('class') or '').split())
+    visit(root)
+    end(root.tag)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - HTTP-first Fetch Layer
+- One pooled keep-alive client per process (httpx + HTTP/2 when installed, else requests)
+- gzip/deflate always, brotli when the brotli package is installed
+- Learns per page type whether the plain HTML already carries the data;
+  only pages that need JS go to the browser pool
+- Conditional requests and change detection through a PageTracker
+"""
+
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+RECHECK_AFTER = 600   # seconds before a browser-only page type gets another plain HTTP try
+
+# Plain HTML is good enough when the spans the parsers read are already filled in
+_FILLED = r'>\s*[^<\s]'
+STATIC_CHECKS = {
+    'index.html': [rf'id="aj_1_score"[^>]*{_FILLED}', rf'id="aj_1_\d+_name"[^>]*{_FILLED}'],
+    'bs.html': [rf'id="aj_1_score"[^>]*{_FILLED}', rf'id="aj_1_\d+_name"[^>]*{_FILLED}'],
+    'lds.html': [rf'id_aj_1_sPoints_1_name[^>]*{_FILLED}'],
+    'pbp.html': [r'class="[^"]*\bpbpa\b'],
+}
+STATIC_DEFAULT = [rf'id="aj_[^"]*"[^>]*{_FILLED}']
+
+
+def _encodings():
+    try:
+        import brotli  # noqa: F401
+        return "gzip, deflate, br"
+    except ImportError:
+        return "gzip, deflate"
+
+
+HEADERS = {
+    'User-Agent': USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': _encodings(),
+}
+
+
+def make_client():
+    """httpx.Client (HTTP/2 if h2 is installed) or a pooled requests.Session"""
+    try:
+        import httpx
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+        return httpx.Client(
+            http2=http2, headers=HEADERS, timeout=30, follow_redirects=True,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    except ImportError:
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+
+def page_type(url):
+    return url.split('?')[0].rsplit('/', 1)[-1]
+
+
+def is_static_enough(url, html):
+    """Does the plain HTML already hold the data the parsers need?"""
+    checks = STATIC_CHECKS.get(page_type(url), STATIC_DEFAULT)
+    return bool(html) and all(re.search(c, html) for c in checks)
+
+
+class Fetcher:
+    """Fetches pages over HTTP where that works, through the browser where it doesn't
+
+    With a tracker, results are html (changed), None (unchanged since the
+    last fetch) or '' (failed).
+    """
+
+    def __init__(self, client=None, use_browser=True):
+        self.client = client or make_client()
+        self.use_browser = use_browser
+        self.mode = {}        # page type -> 'http' | 'browser'
+        self.checked_at = {}  # page type -> when plain HTTP was last tried
+        self.latency_ms = {}  # page type -> last fetch time
+        self._lock = threading.Lock()
+        self._threads = ThreadPoolExecutor(max_workers=8, thread_name_prefix="nebl-http")
+
+    def fetch(self, url, tracker=None, retries=1, **browser_opts):
+        return self.fetch_many({url: url}, tracker, retries, **browser_opts)[url]
+
+    def fetch_many(self, urls, tracker=None, retries=1, **browser_opts):
+        """Fetch a {name: url} dict concurrently and return {name: html}
+
+        HTTP requests and the browser batch run side by side, and a page
+        plain HTTP couldn't serve goes to the browser as soon as that is
+        known - the cycle costs as long as its slowest page.
+        """
+        results = {}
+        plain = {self._threads.submit(self._http, urls[n], tracker, retries): n
+                 for n in urls if self._try_http(urls[n])}
+        browser = {n: urls[n] for n in urls if n not in plain.values()}
+        pending = []
+        if browser:
+            pending.append(self._threads.submit(self._browser, browser, tracker, retries, browser_opts))
+        for future in as_completed(plain):
+            name = plain[future]
+            results[name] = future.result()
+            if results[name] is False:
+                pending.append(self._threads.submit(self._browser, {name: urls[name]}, tracker, retries, browser_opts))
+        for future in pending:
+            results.update(future.result())
+        return {n: ("" if results[n] is False else results[n]) for n in urls}
+
+    def report(self):
+        """'index http 85ms, bs browser 910ms' plus browser readiness if it was used"""
+        with self._lock:
+            parts = [f"{ptype} {self.mode.get(ptype, '?')} {ms:.0f}ms" for ptype, ms in sorted(self.latency_ms.items())]
+        text = ", ".join(parts)
+        if 'browser' in self.mode.values():
+            from browser_pool import get_pool
+            pool = get_pool()
+            text += f" | Ready: {pool.readiness_report()} ({pool.traffic_report()})"
+        return text
+
+    def _try_http(self, url):
+        ptype = page_type(url)
+        with self._lock:
+            if self.mode.get(ptype) != 'browser' or not self.use_browser:
+                return True
+            return time.monotonic() - self.checked_at.get(ptype, 0) >= RECHECK_AFTER
+
+    def _set_mode(self, url, mode, started):
+        ptype = page_type(url)
+        with self._lock:
+            if mode == 'browser' and self.mode.get(ptype) != 'browser':
+                print(f"{ptype}: plain HTTP not enough, using the browser")
+            self.mode[ptype] = mode
+            self.latency_ms[ptype] = (time.perf_counter() - started) * 1000
+
+    def _http(self, url, tracker, retries):
+        """html / None (unchanged) / '' (failed), or False when the page needs the browser"""
+        started = time.perf_counter()
+        with self._lock:
+            self.checked_at[page_type(url)] = time.monotonic()
+        for attempt in range(retries):
+            try:
+                headers = tracker.headers(url) if tracker else {}
+                response = self.client.get(url, headers=headers)
+                if response.status_code == 304:
+                    self._set_mode(url, 'http', started)
+                    return None
+                if response.status_code != 200:
+                    raise IOError(f"HTTP {response.status_code}")
+                html = response.text
+                if not is_static_enough(url, html) and self.use_browser:
+                    self._set_mode(url, 'browser', started)
+                    return False
+                self._set_mode(url, 'http', started)
+                if tracker and not tracker.changed(url, html, response.headers):
+                    return None
+                return html
+            except Exception as e:
+                print(f"Fetch {url} attempt {attempt+1} failed: {e}")
+                if attempt < retries - 1:
+                    time.sleep(2)
+        # Let the browser have a go
+        return False if self.use_browser else ""
+
+    def _browser(self, urls, tracker, retries, opts):
+        started = time.perf_counter()
+        try:
+            from browser_pool import get_pool
+            htmls = get_pool().fetch_many(urls, retries=retries, **opts)
+        except Exception as e:
+            print(f"Browser fetch failed: {e}")
+            return {n: "" for n in urls}
+        results = {}
+        for name, url in urls.items():
+            self._set_mode(url, 'browser', started)
+            html = htmls.get(name, "")
+            results[name] = None if (html and tracker and not tracker.changed(url, html)) else html
+        return results
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher():
+    """Process-wide fetcher shared by the GUI, CSV writer, feed and Sheets job"""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = Fetcher()
+        return _fetcher
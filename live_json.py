@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - Live JSON Output
+- data/live_full.json written compact (orjson when installed), with the
+  seq of the delta it matches; NEBL_JSON_PRETTY=1 keeps the indented form
+- LiveDelta numbers every changed document and turns it into a JSON Patch
+  (RFC 6902) against the previous one: {"seq", "base", "fetched_at", "patch"}
+- pbp only grows at the end, so new events are "add .../events/-" ops
+  instead of the whole list again
+- data/live_delta.jsonl gets one record per line; a consumer applies the
+  patches in seq order and re-reads the full file when its seq != base
+"""
+
+import os
+import json
+import threading
+from collections import deque
+from models import to_json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+PRETTY = os.environ.get('NEBL_JSON_PRETTY') == '1'
+DELTA_FILE = "data/live_delta.jsonl"
+
+
+def dumps(obj, pretty=PRETTY):
+    """JSON text of obj, model objects included"""
+    if orjson:
+        return orjson.dumps(obj, default=to_json, option=orjson.OPT_INDENT_2 if pretty else 0).decode('utf-8')
+    if pretty:
+        return json.dumps(obj, indent=2, default=to_json)
+    return json.dumps(obj, separators=(',', ':'), default=to_json)
+
+
+def plain(obj):
+    """obj as plain dicts/lists (PlayerLines via to_dict) - what the patches are taken against"""
+    if isinstance(obj, dict):
+        return {k: plain(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [plain(v) for v in obj]
+    if isinstance(obj, (str, int, float, bool)) or obj is None:
+        return obj
+    return plain(to_json(obj))
+
+
+def pointer(path, key):
+    """JSON Pointer (RFC 6901) of key under path"""
+    return f"{path}/{str(key).replace('~', '~0').replace('/', '~1')}"
+
+
+def diff(old, new, path=""):
+    """JSON Patch ops turning old into new"""
+    if type(old) is not type(new):
+        return [{'op': 'replace', 'path': path, 'value': new}]
+    if isinstance(new, dict):
+        ops = [{'op': 'remove', 'path': pointer(path, k)} for k in old if k not in new]
+        for k, v in new.items():
+            if k not in old:
+                ops.append({'op': 'add', 'path': pointer(path, k), 'value': v})
+            elif old[k] != v:
+                ops.extend(diff(old[k], v, pointer(path, k)))
+        return ops
+    if isinstance(new, list):
+        if len(new) >= len(old) and new[:len(old)] == old:
+            # Grown at the end (pbp) - just the new items
+            return [{'op': 'add', 'path': f"{path}/-", 'value': v} for v in new[len(old):]]
+        if len(new) == len(old):
+            # Same rows, some changed (player lines)
+            ops = []
+            for i, (a, b) in enumerate(zip(old, new)):
+                if a != b:
+                    ops.extend(diff(a, b, pointer(path, i)))
+            return ops
+        return [{'op': 'replace', 'path': path, 'value': new}]
+    return [] if old == new else [{'op': 'replace', 'path': path, 'value': new}]
+
+
+class LiveDelta:
+    """Sequence-numbered patches between successive documents, last `keep` kept for replay"""
+
+    def __init__(self, path=None, keep=600):
+        self.path = path
+        self.seq = 0
+        self.doc = None
+        self.recent = deque(maxlen=keep)
+        self._lock = threading.Lock()
+        if path:
+            # A new run starts a new sequence - old records would not apply
+            folder = os.path.dirname(path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            open(path, 'w').close()
+
+    def update(self, doc):
+        """Patch record for doc, None if nothing changed; the first one carries the full document"""
+        doc = plain(doc)
+        with self._lock:
+            if self.doc is None:
+                record = {'seq': self.seq + 1, 'base': None, 'full': doc}
+            else:
+                patch = diff(self.doc, doc)
+                if not patch:
+                    return None
+                record = {'seq': self.seq + 1, 'base': self.seq, 'patch': patch}
+            if isinstance(doc, dict) and 'fetched_at' in doc:
+                record['fetched_at'] = doc['fetched_at']
+            self.seq += 1
+            self.doc = doc
+            self.recent.append(record)
+        if self.path:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(dumps(record, pretty=False) + '\n')
+        return record
+
+    def full(self):
+        """{'seq', 'full'} of the latest document, for a consumer starting (or falling) behind"""
+        with self._lock:
+            return {'seq': self.seq, 'full': self.doc}
+
+    def since(self, seq):
+        """Records after seq, or None when they're no longer kept (re-read full())"""
+        with self._lock:
+            if seq == self.seq:
+                return []
+            if seq > self.seq:
+                # From an earlier run's sequence
+                return None
+            records = [r for r in self.recent if r['seq'] > seq]
+            if not records or records[0]['seq'] != seq + 1:
+                return None
+            return records
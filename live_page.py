@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - Live Page
+- Opens the game page once and keeps it open (no reloads per cycle)
+- A MutationObserver in the page pushes changed aj_* span values to Python
+- Consumers get {span id: value} maps for span_data.py, no HTML parsing
+"""
+
+import time
+import threading
+from browser_pool import get_pool
+
+STALE_AFTER = 300   # seconds without any change before the page is reloaded
+LOST_EVENTS = ("crash", "close")   # page events that leave the stream dead
+
+# Runs in the page before its own scripts. Values follow write_csv.get_value:
+# text first, then a numeric aj_<value> class. Player rows report starter flags.
+OBSERVER_JS = """
+(() => {
+  const WATCHED = '[id^="aj_"], [class*="id_aj_"]';
+  const sent = {};
+  let pending = {};
+  let count = 0;
+
+  const valueOf = el => {
+    const text = el.textContent.trim();
+    if (text) return text;
+    for (const c of el.classList) {
+      if (c.startsWith('aj_') && c.length > 3 && /^\\d+$/.test(c.slice(3).replace(/[:-]/g, ''))) return c.slice(3);
+    }
+    return '';
+  };
+
+  const put = (key, val) => {
+    if (sent[key] !== val) {
+      sent[key] = val;
+      pending[key] = val;
+      count++;
+    }
+  };
+
+  const record = el => {
+    const row = /^aj_([12])_(\\d+)_row$/.exec(el.id || '');
+    if (row) {
+      put(`aj_${row[1]}_${row[2]}_starter`, el.classList.contains('p_starter') ? '1' : '0');
+      return;
+    }
+    if (el.id && el.id.startsWith('aj_')) put(el.id, valueOf(el));
+    for (const c of el.classList) {
+      if (c.startsWith('id_aj_')) put(c, valueOf(el));
+    }
+  };
+
+  const scan = root => {
+    if (root.matches && root.matches(WATCHED)) record(root);
+    if (root.querySelectorAll) root.querySelectorAll(WATCHED).forEach(record);
+  };
+
+  const flush = () => {
+    if (!count) return;
+    const out = pending;
+    pending = {};
+    count = 0;
+    window.neblSpans(out, Date.now());
+  };
+
+  const start = () => {
+    scan(document);
+    flush();
+    new MutationObserver(mutations => {
+      for (const m of mutations) {
+        const node = m.type === 'characterData' ? m.target.parentElement : m.target;
+        const el = node && node.closest ? node.closest(WATCHED) : null;
+        if (el) record(el);
+        if (m.type === 'childList') m.addedNodes.forEach(scan);
+      }
+      flush();
+    }).observe(document.documentElement, {
+      subtree: true, childList: true, characterData: true,
+      attributes: true, attributeFilter: ['class'],
+    });
+  };
+
+  if (document.readyState === 'loading') document.addEventListener('DOMContentLoaded', start);
+  else start();
+})();
+"""
+
+
+class LivePage:
+    """One game page held open in its own tab, streaming span changes"""
+
+    def __init__(self, url, pool=None):
+        self.url = url
+        self.pool = pool or get_pool()
+        self.spans = {}
+        self.latency_ms = None   # page mutation -> Python, last batch
+        self.updates = 0
+
+        self._changed = {}
+        self._cond = threading.Condition()
+        self._page = None
+        self._dead = True
+        self._last_change = time.monotonic()
+
+    def start(self):
+        self.pool.run(self._open())
+        return self
+
+    def wait(self, timeout=None, batch=0.1):
+        """Block until spans changed (True) or timeout (False)
+
+        After the first change waits `batch` seconds more so a burst of
+        mutations (a made basket touches score, player and team spans)
+        arrives as one update.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._changed:
+                if self._dead or time.monotonic() - self._last_change > STALE_AFTER:
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(5 if remaining is None else min(remaining, 5))
+            else:
+                settle = time.monotonic() + batch
+                while time.monotonic() < settle:
+                    self._cond.wait(settle - time.monotonic())
+                return True
+
+        # Tab crashed, browser restarted or the page stopped updating
+        print(f"Live page {self.url} {'lost' if self._dead else 'stale'}, reopening...")
+        self._last_change = time.monotonic()
+        try:
+            self.pool.run(self._open())
+        except Exception as e:
+            print(f"Reopen failed: {e}")
+            time.sleep(min(timeout or 5, 5))
+        return False
+
+    def take(self):
+        """Spans changed since the last take() as {id: value}"""
+        with self._cond:
+            changed, self._changed = self._changed, {}
+            return changed
+
+    def current(self):
+        """Full span map as of now"""
+        with self._cond:
+            return dict(self.spans)
+
+    def close(self):
+        try:
+            self.pool.run(self._close(), timeout=10)
+        except Exception:
+            pass
+
+    def _on_spans(self, changes, sent_at):
+        with self._cond:
+            self.spans.update(changes)
+            self._changed.update(changes)
+            self.updates += 1
+            self.latency_ms = max(0, time.time() * 1000 - sent_at)
+            self._last_change = time.monotonic()
+            self._cond.notify_all()
+
+    def _on_close(self, *args):
+        with self._cond:
+            self._dead = True
+            self._cond.notify_all()
+
+    async def _open(self):
+        await self._close()
+        page = await self.pool.new_page()
+        await page.expose_function("neblSpans", self._on_spans)
+        await page.add_init_script(OBSERVER_JS)
+        for event in LOST_EVENTS:
+            page.on(event, self._on_close)
+        self._page = page
+        with self._cond:
+            # The new page reports every span again on load
+            self.spans = {}
+            self._dead = False
+        await page.goto(self.url, wait_until="domcontentloaded", timeout=60000)
+
+    async def _close(self):
+        page, self._page = self._page, None
+        if page:
+            # Detach before closing - a page we dropped must not mark its replacement dead
+            for event in LOST_EVENTS:
+                page.remove_listener(event, self._on_close)
+            try:
+                await page.close()
+            except Exception:
+                pass
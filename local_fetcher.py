@@ -5,9 +5,9 @@ Place your saved HTML files in a folder and run this script
 """
 
 import os
-import re
 import json
-from bs4 import BeautifulSoup
+import span_index
+import models
 
 try:
     from google.oauth2 import service_account
@@ -28,15 +28,15 @@ def parse_scoreboard(html):
     if not html:
         return {'home_team': 'Home', 'away_team': 'Away', 'home_score': 0, 'away_score': 0, 'period': '', 'clock': ''}
     
-    soup = BeautifulSoup(html, 'html.parser')
+    spans = span_index.of(html, span_index.box_regions)
     
     data = {
-        'home_team': soup.find('span', id='aj_1_shortName')?.text?.strip() or 'Home',
-        'away_team': soup.find('span', id='aj_2_shortName')?.text?.strip() or 'Away',
-        'home_score': soup.find('span', id='aj_1_score')?.text?.strip() or '0',
-        'away_score': soup.find('span', id='aj_2_score')?.text?.strip() or '0',
-        'period': soup.find('span', id='aj_period')?.text?.strip() or '',
-        'clock': soup.find('span', id='aj_clock')?.text?.strip() or ''
+        'home_team': spans.text('aj_1_shortName') or 'Home',
+        'away_team': spans.text('aj_2_shortName') or 'Away',
+        'home_score': spans.text('aj_1_score') or '0',
+        'away_score': spans.text('aj_2_score') or '0',
+        'period': spans.text('aj_period') or '',
+        'clock': spans.text('aj_clock') or ''
     }
     return data
 
@@ -44,49 +44,7 @@ def parse_boxscore(html):
     if not html:
         return {'home_players': [], 'away_players': []}
     
-    soup = BeautifulSoup(html, 'html.parser')
-    data = {'home_players': [], 'away_players': []}
-    
-    for team_num, key in [(1, 'home_players'), (2, 'away_players')]:
-        rows = soup.find_all('tr', id=re.compile(f'^aj_{team_num}_\\d+_row$'))
-        for row in rows:
-            classes = row.get('class', [])
-            if isinstance(classes, str):
-                classes = classes.split()
-            if 'row-not-used' in classes:
-                continue
-            
-            player = {}
-            
-            # Get player number
-            num_span = row.find('span', id=re.compile(f'^aj_{team_num}_\\d+_shirtNumber$'))
-            if num_span:
-                player['num'] = num_span.get_text(strip=True) or ''
-            
-            # Get player name
-            name_span = row.find('span', id=re.compile(f'^aj_{team_num}_\\d+_name$'))
-            if name_span:
-                player['name'] = name_span.get_text(strip=True) or ''
-            
-            # Get position
-            pos_span = row.find('span', id=re.compile(f'^aj_{team_num}_\\d+_playingPosition$'))
-            if pos_span:
-                player['pos'] = pos_span.get_text(strip=True) or ''
-            
-            # Get stats
-            for stat_key, stat_id in [
-                ('min', 'sMinutes'), ('pts', 'sPoints'), ('reb', 'sReboundsTotal'),
-                ('ast', 'sAssists'), ('stl', 'sSteals'), ('blk', 'sBlocks'),
-                ('to', 'sTurnovers'), ('pf', 'sFoulsPersonal')
-            ]:
-                span = row.find('span', id=re.compile(f'^aj_{team_num}_\\d+_{stat_id}$'))
-                if span:
-                    player[stat_key] = span.get_text(strip=True) or '0'
-            
-            if player.get('name'):
-                data[key].append(player)
-    
-    return data
+    return models.boxscore(span_index.of(html, span_index.box_regions))
 
 def write_to_sheets(credentials, data, spreadsheet_id):
     service = build('sheets', 'v4', credentials=credentials)
@@ -106,20 +64,20 @@ def write_to_sheets(credentials, data, spreadsheet_id):
     home_values = [['#', 'Name', 'POS', 'MIN', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TO', 'PF']]
     for p in home_players:
         home_values.append([
-            p.get('num', ''), p.get('name', ''), p.get('pos', ''),
-            p.get('min', ''), p.get('pts', ''), p.get('reb', ''),
-            p.get('ast', ''), p.get('stl', ''), p.get('blk', ''),
-            p.get('to', ''), p.get('pf', '')
+            p.text('num', ''), p.text('name', ''), p.text('pos', ''),
+            p.text('min', ''), p.text('pts', ''), p.text('reb', ''),
+            p.text('ast', ''), p.text('stl', ''), p.text('blk', ''),
+            p.text('to', ''), p.text('pf', '')
         ])
     
     away_players = data.get('boxscore', {}).get('away_players', [])
     away_values = [['#', 'Name', 'POS', 'MIN', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TO', 'PF']]
     for p in away_players:
         away_values.append([
-            p.get('num', ''), p.get('name', ''), p.get('pos', ''),
-            p.get('min', ''), p.get('pts', ''), p.get('reb', ''),
-            p.get('ast', ''), p.get('stl', ''), p.get('blk', ''),
-            p.get('to', ''), p.get('pf', '')
+            p.text('num', ''), p.text('name', ''), p.text('pos', ''),
+            p.text('min', ''), p.text('pts', ''), p.text('reb', ''),
+            p.text('ast', ''), p.text('stl', ''), p.text('blk', ''),
+            p.text('to', ''), p.text('pf', '')
         ])
     
     sheets = {
@@ -207,7 +165,7 @@ def main():
             print("Set it with: set GOOGLE_CREDENTIALS_JSON={'...json content...'}")
     else:
         print("\nData fetched:")
-        print(json.dumps(data, indent=2))
+        print(json.dumps(data, indent=2, default=models.to_json))
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - Player Line / Team Totals Model
+- Compact __slots__ objects, one value list per line in stat_schema order
+- Converted once at parse time: counts as int, minutes as seconds,
+  percentages as float, None where the page had nothing
+- text(key) renders the page's form back ('12', '23:41', '45.5', '--')
+  for the CSV/TXT/XML/Sheets writers and the Tk trees
+"""
+
+import stat_schema
+
+INT = 'int'
+CLOCK = 'clock'   # mm:ss -> seconds
+PCT = 'pct'
+
+LABELS = ('num', 'name', 'pos')
+PLAYER_KEYS = tuple(k for k in stat_schema.PLAYER_FIELDS if k not in LABELS)
+TEAM_KEYS = tuple(stat_schema.TEAM_FIELDS)
+
+
+def field_type(key):
+    if key == 'min':
+        return CLOCK
+    return PCT if key.endswith('_pct') else INT
+
+
+def convert(raw, kind):
+    """Page value -> int / seconds / float, None if empty; text that isn't a number stays text"""
+    if raw is None:
+        return None
+    text = str(raw).strip()
+    if not text:
+        return None
+    try:
+        if kind == CLOCK:
+            mins, secs = text.split(':', 1)
+            return int(mins) * 60 + int(secs)
+        if kind == PCT:
+            return float(text.rstrip('%'))
+        return int(text)
+    except ValueError:
+        return text
+
+
+def render(val, kind, missing="--"):
+    """The page's text form of a converted value"""
+    if val is None:
+        return missing
+    if isinstance(val, str):
+        return val
+    if kind == CLOCK:
+        return f"{val // 60:02d}:{val % 60:02d}"
+    if kind == PCT:
+        text = repr(val)
+        return text[:-2] if text.endswith('.0') else text
+    return str(val)
+
+
+PLAYER_TYPES = tuple(field_type(k) for k in PLAYER_KEYS)
+PLAYER_INDEX = {k: i for i, k in enumerate(PLAYER_KEYS)}
+TEAM_TYPES = tuple(field_type(k) for k in TEAM_KEYS)
+TEAM_INDEX = {k: i for i, k in enumerate(TEAM_KEYS)}
+
+
+class PlayerLine:
+    """One player's box score line"""
+    __slots__ = ('num', 'name', 'pos', 'is_starter', 'stats')
+
+    def __init__(self, num="", name="", pos="", is_starter=False, stats=None):
+        self.num = num
+        self.name = name
+        self.pos = pos
+        self.is_starter = is_starter
+        self.stats = stats if stats is not None else [None] * len(PLAYER_KEYS)
+
+    @classmethod
+    def from_fields(cls, fields):
+        """From stat_schema.row_player / map_player output"""
+        return cls(fields['num'] or "", fields['name'] or "", fields['pos'] or "", fields['is_starter'],
+                   [convert(fields[k], t) for k, t in zip(PLAYER_KEYS, PLAYER_TYPES)])
+
+    def __getitem__(self, key):
+        return self.stats[PLAYER_INDEX[key]]
+
+    def text(self, key, missing="--"):
+        if key in LABELS:
+            return getattr(self, key) or missing
+        i = PLAYER_INDEX[key]
+        return render(self.stats[i], PLAYER_TYPES[i], missing)
+
+    def blank(self, keys):
+        """Show keys as empty (columns the page doesn't have) rather than missing"""
+        for key in keys:
+            self.stats[PLAYER_INDEX[key]] = ""
+
+    def to_dict(self):
+        """num/name/pos/is_starter plus the stats the page had, as text (JSON dump)"""
+        data = {'num': self.num, 'name': self.name, 'pos': self.pos, 'is_starter': self.is_starter}
+        for key, kind, val in zip(PLAYER_KEYS, PLAYER_TYPES, self.stats):
+            if val is not None:
+                data[key] = render(val, kind)
+        return data
+
+
+class TeamTotals:
+    """A team's totals row"""
+    __slots__ = ('stats',)
+
+    def __init__(self, stats=None):
+        self.stats = stats if stats is not None else [None] * len(TEAM_KEYS)
+
+    @classmethod
+    def from_fields(cls, fields):
+        """From stat_schema.index_totals / map_totals output"""
+        return cls([convert(fields[k], t) for k, t in zip(TEAM_KEYS, TEAM_TYPES)])
+
+    def __getitem__(self, key):
+        return self.stats[TEAM_INDEX[key]]
+
+    def text(self, key, missing="--"):
+        i = TEAM_INDEX[key]
+        return render(self.stats[i], TEAM_TYPES[i], missing)
+
+    def to_dict(self):
+        return {key: render(val, kind) for key, kind, val in zip(TEAM_KEYS, TEAM_TYPES, self.stats)
+                if val is not None}
+
+
+def boxscore(spans):
+    """{'home_players', 'away_players'} of every used, named row of a span_index.SpanIndex"""
+    data = {'home_players': [], 'away_players': []}
+    for team_num, key in [(1, 'home_players'), (2, 'away_players')]:
+        for row in spans.team_rows(team_num):
+            player = PlayerLine.from_fields(stat_schema.row_player(row))
+            if player.name:
+                data[key].append(player)
+    return data
+
+
+def to_json(obj):
+    """json.dump default= for data holding model objects"""
+    if isinstance(obj, (PlayerLine, TeamTotals)):
+        return obj.to_dict()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
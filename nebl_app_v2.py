@@ -10,15 +10,61 @@ NEBL Live Stats - Full Featured Desktop App
 import tkinter as tk
 from tkinter import ttk
 import threading
-import json
 import os
 import time
 import re
 from datetime import datetime
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
+from http_fetch import get_fetcher
+from feed import FeedClient, spans_from_feed
+from live_page import LivePage
+from pbp_log import IncrementalPbp, PbpLog, log_path
+import span_data
+import parse_cache
+import app_parsers
+from atomic_file import OutputFile, write_if_changed
+from output_pipeline import OutputPipeline
+from snapshot_store import SnapshotStore
+import live_json
+from live_json import LiveDelta
+from parse_pool import get_pool as get_parse_pool
+from page_tracker import PageTracker
+from poll_scheduler import PollScheduler
+from snapshot import CycleSnapshot
+
+# Every page's parse, rewritten each changed cycle
+JSON_FILE = "data/live_full.json"
+
+# Box score tree columns
+TREE_KEYS = ('num', 'name', 'min', 'pts', 'reb', 'ast', 'stl', 'blk', 'to', 'pf')
+
+
+def game_csv_row(p):
+    """Game N.csv box score columns of a PlayerLine"""
+    t = lambda key: p.text(key, '')
+    return [
+        t('num'), t('name'), t('pos'), t('min'), t('pts'),
+        f"{t('fgm')}-{t('fga')}", t('fg_pct'), f"{t('2pm')}-{t('2pa')}", t('2p_pct'),
+        f"{t('3pm')}-{t('3pa')}", t('3p_pct'), f"{t('ftm')}-{t('fta')}", t('ft_pct'),
+        t('off'), t('def'), t('reb'), t('ast'), t('to'),
+        t('stl'), t('blk'), t('blkr'), t('pf'), t('fld_on'),
+        t('plus_minus'), t('eff')
+    ]
+
+
+def points(p):
+    return p['pts'] if isinstance(p['pts'], int) else 0
+
 
 class NEBLStatsApp:
+    # Page key -> parser method, fetched together every cycle
+    PARSERS = {
+        'index': 'parse_index',
+        'boxscore': 'parse_boxscore',
+        'playbyplay': 'parse_pbp',
+        'periods': 'parse_periods',
+        'leaders': 'parse_leaders',
+    }
+    
     def __init__(self, root):
         self.root = root
         self.root.title("NEBL Live Stats")
@@ -28,6 +74,10 @@ class NEBLStatsApp:
         self.is_watching = False
         self.watch_thread = None
         self.poll_interval = 0.5
+        self.pbp = IncrementalPbp()
+        self.pbp_cursor = None
+        self.outputs = None   # output_pipeline.OutputPipeline while watching
+        self.delta = LiveDelta()
         
         self.setup_ui()
         
@@ -56,6 +106,16 @@ class NEBLStatsApp:
         self.poll_entry.pack(side=tk.LEFT)
         self.poll_entry.insert(0, "1")
         
+        # JSON feed mode - skips the browser and HTML parsing entirely
+        self.use_feed = tk.BooleanVar(value=False)
+        tk.Checkbutton(input_frame, text="JSON feed", variable=self.use_feed, bg="#0d1b2a", fg="white",
+                       selectcolor="#1e3a5f", activebackground="#0d1b2a", font=("Arial", 10)).pack(side=tk.LEFT, padx=(10,0))
+        
+        # Live page mode - bs.html stays open and pushes span changes
+        self.use_live = tk.BooleanVar(value=False)
+        tk.Checkbutton(input_frame, text="Live page", variable=self.use_live, bg="#0d1b2a", fg="white",
+                       selectcolor="#1e3a5f", activebackground="#0d1b2a", font=("Arial", 10)).pack(side=tk.LEFT, padx=(10,0))
+        
         self.start_btn = tk.Button(input_frame, text="START WATCHING", command=self.start_watching,
                                   bg="#28a745", fg="white", font=("Arial", 12, "bold"), padx=20, pady=5)
         self.start_btn.pack(side=tk.LEFT, padx=10)
@@ -301,54 +361,81 @@ class NEBLStatsApp:
         pages = {
             'index': f"{base_url}/index.html",
             'boxscore': f"{base_url}/bs.html",
-            'boxscore_url': f"{base_url}/bs.html",
             'playbyplay': f"{base_url}/pbp.html",
             'periods': f"{base_url}/p.html",
             'leaders': f"{base_url}/lds.html"
         }
         
+        game_id = base_url.rstrip('/').rsplit('/', 1)[-1]
+        # Events carry over a restart from the game's log
+        self.pbp = IncrementalPbp(PbpLog(log_path(game_id)))
+        self.pbp_cursor = None
+        feed = FeedClient(game_id) if self.use_feed.get() else None
+        live = None
+        if not feed and self.use_live.get():
+            try:
+                live = LivePage(pages['boxscore']).start()
+            except Exception as e:
+                self.status.config(text=f"Live page failed, polling: {e}", fg="#ffc107")
+        scheduler = self.make_scheduler(feed, live)
+        tracker = PageTracker()
+        snapshot = None
+        self.delta = LiveDelta(live_json.DELTA_FILE)
+        # JSON dump and Game N.csv are written on their own workers, latest cycle wins
+        self.outputs = OutputPipeline({
+            'json': lambda frame: self.write_json(*frame),
+            'csv': lambda frame: self.write_game_csv(*frame),
+        })
+        # Every changed cycle is kept as deltas in data/snapshots.db - live_full.json only holds the latest
+        store = SnapshotStore()
+        
         while self.is_watching:
             try:
                 self.status.config(text="Fetching...", fg="#ffc107")
                 
-                result = {'pages': {}, 'fetched_at': datetime.now().isoformat()}
-                
-                # Fetch index
-                html = self.fetch_page(pages['index'])
-                if html:
-                    result['pages']['index'] = self.parse_index(html)
+                # Everything this cycle reads from one snapshot; untouched pages carry over
+                snapshot = CycleSnapshot(snapshot)
                 
-                # Fetch boxscore
-                html = self.fetch_page(pages['boxscore'])
-                if html:
-                    result['pages']['boxscore'] = self.parse_boxscore(html)
+                # Only the pages whose cadence is up this cycle
+                due = scheduler.due()
+                scheduler.mark(due)
                 
-                # Fetch pbp
-                html = self.fetch_page(pages['playbyplay'])
-                if html:
-                    result['pages']['playbyplay'] = self.parse_pbp(html)
+                if live:
+                    # Scoreboard, box score and leaders arrive from the open page
+                    if live.take():
+                        for (name, key), page in self.live_pages(live.current()).items():
+                            snapshot.store(name, key, page)
                 
-                # Fetch periods
-                html = self.fetch_page(pages['periods'])
-                if html:
-                    result['pages']['periods'] = self.parse_periods(html)
+                if feed:
+                    payload = feed.poll() if due else None
+                    if payload is not None:
+                        for (name, key), page in self.feed_pages(payload).items():
+                            snapshot.store(name, key, page)
+                elif due:
+                    # Fetch every due page at once - cycle costs the slowest page, not the sum
+                    htmls = self.fetch_pages({name: pages[name] for name in due}, tracker)
+                    for name in due:
+                        # Unchanged pages (None) keep last cycle's HTML and parse
+                        if htmls.get(name):
+                            snapshot.update(name, htmls[name])
                 
-                # Fetch leaders
-                html = self.fetch_page(pages['leaders'])
-                if html:
-                    result['pages']['leaders'] = self.parse_leaders(html)
+                result = self.snapshot_result(snapshot)
                 
-                # Save JSON
-                json_file = "data/live_full.json"
-                os.makedirs("data", exist_ok=True)
-                with open(json_file, "w") as f:
-                    json.dump(result, f, indent=2)
+                idx = result['pages'].get('index')
+                if idx:
+                    score = idx.get('score', {})
+                    scheduler.observe(idx.get('period'), idx.get('clock'), score.get('home'), score.get('away'))
                 
-                # Write to CSV
-                game_num = self.selected_game.get()
-                self.write_game_csv(result, game_num)
+                if not snapshot.changed:
+                    # Dead ball / timeout - skip JSON dump, CSV write and UI refresh
+                    self.status.config(text=f"Live! (no change, {scheduler.state})", fg="#28a745")
+                    self.wait_cycle(scheduler, live)
+                    continue
                 
-                self.json_label.config(text=json_file)
+                # JSON and CSV go to the output workers - the next fetch doesn't wait on the disk
+                self.outputs.publish((snapshot, result, self.selected_game.get()))
+                store.record_result(game_id, result)
+                self.json_label.config(text=JSON_FILE)
                 
                 # Update UI
                 self.root.after(0, lambda: self.update_ui(result))
@@ -358,7 +445,48 @@ class NEBLStatsApp:
             except Exception as e:
                 self.status.config(text=f"Error: {str(e)}", fg="#dc3545")
             
-            time.sleep(self.poll_interval)
+            self.wait_cycle(scheduler, live)
+        
+        if live:
+            live.close()
+        self.outputs.close()
+        store.close()
+    
+    def wait_cycle(self, scheduler, live):
+        """Sleep until the next page is due - or the live page reports a change"""
+        if live:
+            live.wait(scheduler.wait())
+        else:
+            time.sleep(scheduler.wait())
+    
+    def snapshot_result(self, snapshot):
+        """The pages dict the UI and JSON dump use, parsed once per snapshot"""
+        result = {'pages': {}, 'fetched_at': snapshot.fetched_at}
+        # Changed pages are parsed in parallel on worker processes, off this thread and the Tk one
+        jobs = {name: [(parser, getattr(self, parser))] for name, parser in self.PARSERS.items() if name != 'playbyplay'}
+        jobs['boxscore'].append(('parse_csv_boxscore', self.parse_csv_boxscore))
+        snapshot.parse_many(jobs, get_parse_pool())
+        for name, parser in self.PARSERS.items():
+            # pbp keeps its own log, so it sees every poll rather than cached results
+            page = snapshot.parse(name, getattr(self, parser), key=parser, cache=(name != 'playbyplay'))
+            if page is not None:
+                result['pages'][name] = page
+        return result
+    
+    def make_scheduler(self, feed, live=None):
+        """Per-page cadences - the Interval box sets the fast pages"""
+        base = self.poll_interval
+        if feed:
+            return PollScheduler({'feed': base})
+        if live:
+            # Only pbp and periods still need page loads
+            return PollScheduler({'playbyplay': base}, break_pages=('periods',))
+        return PollScheduler({
+            'index': base,
+            'playbyplay': base,
+            'boxscore': max(base, 3),
+            'leaders': 30,
+        }, break_pages=('periods',))
     
     def open_csv_files(self):
         import os
@@ -380,11 +508,16 @@ class NEBLStatsApp:
         else:
             self.status.config(text="Game CSV folder not found", fg="red")
     
-    def write_game_csv(self, result, game_num):
+    def write_json(self, snapshot, result, game_num):
+        """data/live_full.json (compact, with its seq) and the cycle's patch in data/live_delta.jsonl"""
+        if self.delta.update(result) is None:
+            return
+        full = self.delta.full()
+        write_if_changed(JSON_FILE, live_json.dumps({'seq': full['seq'], **full['full']}))
+    
+    def write_game_csv(self, snapshot, result, game_num):
         import csv
         import os
-        import re
-        from bs4 import BeautifulSoup
         
         base_dir = os.path.dirname(os.path.abspath(__file__))
         game_csv_dir = os.path.join(base_dir, "Game CSV")
@@ -395,120 +528,25 @@ class NEBLStatsApp:
         pages = result.get('pages', {})
         index_data = pages.get('index', {})
         
-        home = index_data.get('home', 'HOME')
-        away = index_data.get('away', 'AWAY')
-        h_score = index_data.get('h_score', '0')
-        a_score = index_data.get('a_score', '0')
-        period = index_data.get('period', '')
-        clock = index_data.get('clock', '')
-        
-        bs_html = self.fetch_page(pages.get('boxscore_url', ''))
-        lds_html = self.fetch_page(pages.get('leaders', ''))
-        
-        def get_stat_value(elem):
-            if not elem:
-                return ""
-            text = elem.get_text(strip=True)
-            if text:
-                return text
-            for c in elem.get('class', []):
-                if c.startswith('aj_') and len(c) > 2:
-                    val = c[3:]
-                    if val.replace(':', '').replace('-', '').isdigit():
-                        return val
-            return ""
+        home = index_data.get('teams', {}).get('home') or 'HOME'
+        away = index_data.get('teams', {}).get('away') or 'AWAY'
+        h_score = index_data.get('score', {}).get('home', '0')
+        a_score = index_data.get('score', {}).get('away', '0')
+        period = index_data.get('period') or ''
+        clock = index_data.get('clock') or ''
+        
+        # This cycle's box score - parsed once per bs.html, or stored from the feed / live page
+        box = snapshot.parse('boxscore', self.parse_csv_boxscore)
+        if box is None:
+            print(f"Game {game_num}.csv not written - no box score yet")
+            return
+        home_players = box.get('home_players', [])
+        away_players = box.get('away_players', [])
         
-        def get_player_stats(row, team_num):
-            name_elem = row.find('span', id=re.compile(rf'aj_{team_num}_\d+_name'))
-            if not name_elem or not name_elem.text.strip():
-                return None
-            player_id_match = re.search(rf'aj_{team_num}_(\d+)_', str(row))
-            if not player_id_match:
-                return None
-            pid = player_id_match.group(1)
-            
-            return {
-                'num': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_shirtNumber')),
-                'name': name_elem.text.strip(),
-                'pos': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_playingPosition')),
-                'mins': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sMinutes')),
-                'pts': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sPoints')),
-                'fg': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sFieldGoalsMade')) + '-' + get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sFieldGoalsAttempted')),
-                'fg_pct': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sFieldGoalsPercentage')),
-                'two_p': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sTwoPointersMade')) + '-' + get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sTwoPointersAttempted')),
-                'two_p_pct': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sTwoPointersPercentage')),
-                'three_p': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sThreePointersMade')) + '-' + get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sThreePointersAttempted')),
-                'three_p_pct': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sThreePointersPercentage')),
-                'ft': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sFreeThrowsMade')) + '-' + get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sFreeThrowsAttempted')),
-                'ft_pct': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sFreeThrowsPercentage')),
-                'off': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sReboundsOffensive')),
-                'def': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sReboundsDefensive')),
-                'reb': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sReboundsTotal')),
-                'ast': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sAssists')),
-                'to': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sTurnovers')),
-                'stl': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sSteals')),
-                'blk': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sBlocks')),
-                'blkr': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sBlocksReceived')),
-                'pf': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sFoulsPersonal')),
-                'fld_on': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sFoulsOn')),
-                'plus_minus': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_sPlusMinusPoints')),
-                'eff': get_stat_value(row.find('span', id=f'aj_{team_num}_{pid}_eff_1'))
-            }
-        
-        home_players = []
-        away_players = []
-        
-        if bs_html:
-            soup = BeautifulSoup(bs_html, 'html.parser')
-            for row in soup.select('tbody.team-0-person-container tr.player-row, tbody.bench tr.player-row'):
-                if 'row-not-used' in row.get('class', []): 
-                    continue
-                player = get_player_stats(row, 1)
-                if player:
-                    home_players.append(player)
-            
-            for row in soup.select('tbody.team-1-person-container tr.player-row, tbody.bench tr.player-row'):
-                if 'row-not-used' in row.get('class', []): 
-                    continue
-                player = get_player_stats(row, 2)
-                if player:
-                    away_players.append(player)
-        
-        home_leaders = sorted([p for p in home_players if p.get('pts', '')], key=lambda x: int(x['pts']) if x.get('pts', '').isdigit() else 0, reverse=True)[:5]
-        away_leaders = sorted([p for p in away_players if p.get('pts', '')], key=lambda x: int(x['pts']) if x.get('pts', '').isdigit() else 0, reverse=True)[:5]
-        
-        home_pts_leaders = []
-        away_pts_leaders = []
-        home_reb_leaders = []
-        away_reb_leaders = []
-        home_ast_leaders = []
-        away_ast_leaders = []
-        
-        if lds_html:
-            lds_soup = BeautifulSoup(lds_html, 'html.parser')
-            
-            def get_lds_leaders(prefix, stat):
-                leaders = []
-                for rank in range(1, 6):
-                    name_elem = lds_soup.find('span', {'class': f'id_{prefix}_{stat}_{rank}_name'})
-                    num_elem = lds_soup.find('span', {'class': f'id_{prefix}_{stat}_{rank}_shirtNumber'})
-                    tot_elem = lds_soup.find('span', {'class': f'id_{prefix}_{stat}_{rank}_tot'})
-                    if name_elem:
-                        leaders.append({
-                            'name': name_elem.get_text(strip=True),
-                            'num': num_elem.get_text(strip=True) if num_elem else "",
-                            'val': tot_elem.get_text(strip=True) if tot_elem else ""
-                        })
-                return leaders
-            
-            home_pts_leaders = get_lds_leaders('aj_1', 'sPoints')
-            away_pts_leaders = get_lds_leaders('aj_2', 'sPoints')
-            home_reb_leaders = get_lds_leaders('aj_1', 'sReboundsTotal')
-            away_reb_leaders = get_lds_leaders('aj_2', 'sReboundsTotal')
-            home_ast_leaders = get_lds_leaders('aj_1', 'sAssists')
-            away_ast_leaders = get_lds_leaders('aj_2', 'sAssists')
-        
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
+        home_leaders = sorted([p for p in home_players if p['pts'] is not None], key=points, reverse=True)[:5]
+        away_leaders = sorted([p for p in away_players if p['pts'] is not None], key=points, reverse=True)[:5]
+        
+        with OutputFile(filename, newline='') as f:
             writer = csv.writer(f)
             
             writer.writerow(['NEBL LIVE STATS - GAME ' + game_num])
@@ -524,45 +562,30 @@ class NEBLStatsApp:
             writer.writerow([home + ' - BOX SCORE'])
             writer.writerow(['No.', 'Player', 'POS', 'Mins', 'Pts', 'FG', 'FG%', '2P', '2P%', '3P', '3P%', 'FT', 'FT%', 'OFF', 'DEF', 'REB', 'AST', 'TO', 'STL', 'BLK', 'BLKR', 'PF', 'Fls on', '+/-', 'Index'])
             for p in home_players:
-                writer.writerow([
-                    p['num'], p['name'], p['pos'], p['mins'], p['pts'], 
-                    p['fg'], p['fg_pct'], p['two_p'], p['two_p_pct'], 
-                    p['three_p'], p['three_p_pct'], p['ft'], p['ft_pct'],
-                    p['off'], p['def'], p['reb'], p['ast'], p['to'],
-                    p['stl'], p['blk'], p['blkr'], p['pf'], p['fld_on'],
-                    p['plus_minus'], p['eff']
-                ])
+                writer.writerow(game_csv_row(p))
             writer.writerow([])
             
             writer.writerow([away + ' - BOX SCORE'])
             writer.writerow(['No.', 'Player', 'POS', 'Mins', 'Pts', 'FG', 'FG%', '2P', '2P%', '3P', '3P%', 'FT', 'FT%', 'OFF', 'DEF', 'REB', 'AST', 'TO', 'STL', 'BLK', 'BLKR', 'PF', 'Fls on', '+/-', 'Index'])
             for p in away_players:
-                writer.writerow([
-                    p['num'], p['name'], p['pos'], p['mins'], p['pts'], 
-                    p['fg'], p['fg_pct'], p['two_p'], p['two_p_pct'], 
-                    p['three_p'], p['three_p_pct'], p['ft'], p['ft_pct'],
-                    p['off'], p['def'], p['reb'], p['ast'], p['to'],
-                    p['stl'], p['blk'], p['blkr'], p['pf'], p['fld_on'],
-                    p['plus_minus'], p['eff']
-                ])
+                writer.writerow(game_csv_row(p))
             writer.writerow([])
             
             writer.writerow([home + ' LEADERS'])
             writer.writerow(['#', 'Name', 'PTS', 'REB', 'AST'])
             for p in home_leaders:
-                writer.writerow([p['num'], p['name'], p['pts'], p['reb'], p['ast']])
+                writer.writerow([p.text(key, '') for key in ('num', 'name', 'pts', 'reb', 'ast')])
             writer.writerow([])
             
             writer.writerow([away + ' LEADERS'])
             writer.writerow(['#', 'Name', 'PTS', 'REB', 'AST'])
             for p in away_leaders:
-                writer.writerow([p['num'], p['name'], p['pts'], p['reb'], p['ast']])
+                writer.writerow([p.text(key, '') for key in ('num', 'name', 'pts', 'reb', 'ast')])
             writer.writerow([])
             writer.writerow([away + ' LEADERS'])
             writer.writerow(['#', 'Name', 'PTS', 'REB', 'AST'])
             for p in away_leaders[:5]:
-                writer.writerow([p.get('num', ''), p.get('name', ''), p.get('pts', ''), 
-                               p.get('reb', ''), p.get('ast', '')])
+                writer.writerow([p.text(key, '') for key in ('num', 'name', 'pts', 'reb', 'ast')])
     
     def read_csv_data(self):
         import csv
@@ -585,205 +608,48 @@ class NEBLStatsApp:
         
     def fetch_page(self, url):
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                context = browser.new_context(user_agent='Mozilla/5.0')
-                page = context.new_page()
-                page.goto(url, wait_until="networkidle", timeout=60000)
-                page.wait_for_timeout(1000)
-                html = page.content()
-                browser.close()
-                return html
+            return get_fetcher().fetch(url, timeout=60000)
         except:
             return ""
     
-    def parse_index(self, html):
-        soup = BeautifulSoup(html, 'html.parser')
-        data = {'teams': {'home': None, 'away': None}, 'score': {'home': 0, 'away': 0}, 'period': None, 'clock': None}
-        
-        home_img = soup.find('img', class_='logo home-logo')
-        away_img = soup.find('img', class_='logo away-logo')
-        
-        if home_img and home_img.get('alt'):
-            data['teams']['home'] = home_img.get('alt')
-        if away_img and away_img.get('alt'):
-            data['teams']['away'] = away_img.get('alt')
-        
-        for elem in soup.find_all('span', class_='pbpsc'):
-            m = re.search(r'(\d+)\s*-\s*(\d+)', elem.get_text())
-            if m:
-                data['score']['home'] = int(m.group(1))
-                data['score']['away'] = int(m.group(2))
-        
-        for elem in soup.find_all('span', class_='pbp-period'):
-            m = re.search(r'P(\d+)', elem.get_text())
-            if m:
-                data['period'] = int(m.group(1))
-        
-        for elem in soup.find_all('div', class_='pbp-time'):
-            m = re.search(r'(\d{1,2}:\d{2})', elem.get_text())
-            if m:
-                data['clock'] = m.group(1)
-        
-        return data
-    
-    def parse_boxscore(self, html):
-        """Parse box score using ID-based extraction"""
-        soup = BeautifulSoup(html, 'html.parser')
-        data = {'home_players': [], 'away_players': [], 'home_totals': {}, 'away_totals': {}}
-        
-        for team_num, key in [(1, 'home_players'), (2, 'away_players')]:
-            rows = soup.find_all('tr', id=re.compile(f'^aj_{team_num}_\\d+_row$'))
-            for row in rows:
-                classes = row.get('class', [])
-                if isinstance(classes, str):
-                    classes = classes.split()
-                if 'row-not-used' in classes:
-                    continue
-                
-                player = {'num': '', 'name': '', 'pos': '', 'is_starter': False}
-                
-                num_span = row.find('span', id=re.compile(f'^aj_{team_num}_\\d+_shirtNumber$'))
-                if num_span:
-                    player['num'] = num_span.get_text(strip=True) or self._get_class_value(num_span)
-                
-                name_span = row.find('span', id=re.compile(f'^aj_{team_num}_\\d+_name$'))
-                if name_span:
-                    player['name'] = name_span.get_text(strip=True) or self._get_class_value(name_span)
-                
-                pos_span = row.find('span', id=re.compile(f'^aj_{team_num}_\\d+_playingPosition$'))
-                if pos_span:
-                    player['pos'] = pos_span.get_text(strip=True) or self._get_class_value(pos_span)
-                
-                if isinstance(classes, str):
-                    classes = classes.split()
-                if 'p_starter' in classes:
-                    player['is_starter'] = True
-                
-                stat_ids = {
-                    'min': f'aj_{team_num}_\\d+_sMinutes',
-                    'pts': f'aj_{team_num}_\\d+_sPoints',
-                    'fgm': f'aj_{team_num}_\\d+_sFieldGoalsMade',
-                    'fga': f'aj_{team_num}_\\d+_sFieldGoalsAttempted',
-                    'fg_pct': f'aj_{team_num}_\\d+_sFieldGoalsPercentage',
-                    '3pm': f'aj_{team_num}_\\d+_sThreePointersMade',
-                    '3pa': f'aj_{team_num}_\\d+_sThreePointersAttempted',
-                    '3p_pct': f'aj_{team_num}_\\d+_sThreePointersPercentage',
-                    'ftm': f'aj_{team_num}_\\d+_sFreeThrowsMade',
-                    'fta': f'aj_{team_num}_\\d+_sFreeThrowsAttempted',
-                    'ft_pct': f'aj_{team_num}_\\d+_sFreeThrowsPercentage',
-                    'reb': f'aj_{team_num}_\\d+_sReboundsTotal',
-                    'ast': f'aj_{team_num}_\\d+_sAssists',
-                    'stl': f'aj_{team_num}_\\d+_sSteals',
-                    'blk': f'aj_{team_num}_\\d+_sBlocks',
-                    'to': f'aj_{team_num}_\\d+_sTurnovers',
-                    'pf': f'aj_{team_num}_\\d+_sFoulsPersonal',
-                }
-                
-                for stat, pattern in stat_ids.items():
-                    span = row.find('span', id=re.compile(pattern))
-                    if span:
-                        player[stat] = span.get_text(strip=True) or self._get_class_value(span)
-                
-                if player.get('name'):
-                    data[key].append(player)
-        
-        return data
+    def fetch_pages(self, urls, tracker=None):
+        try:
+            return get_fetcher().fetch_many(urls, tracker, timeout=60000)
+        except:
+            return {}
     
-    def _get_class_value(self, span):
-        """Get value from span class attribute"""
-        if not span:
-            return ''
-        cls = span.get('class', [])
-        for c in cls:
-            if c.startswith('aj_'):
-                val = c[3:]
-                if val:
-                    return val
-        return ''
+    def feed_pages(self, payload):
+        """Snapshot results keyed (page, parser) like the HTML parsers', built from the JSON feed"""
+        spans = spans_from_feed(payload)
+        return {
+            ('index', 'parse_index'): span_data.app_index(spans),
+            ('boxscore', 'parse_boxscore'): span_data.app_boxscore(spans),
+            # Game N.csv reads this one - there is no bs.html to parse it from
+            ('boxscore', 'parse_csv_boxscore'): span_data.app_csv_boxscore(spans),
+            ('playbyplay', 'parse_pbp'): self.pbp.parse_feed(payload),
+            ('periods', 'parse_periods'): span_data.app_periods(spans),
+            ('leaders', 'parse_leaders'): span_data.app_leaders(spans),
+        }
     
-    def parse_pbp(self, html):
-        soup = BeautifulSoup(html, 'html.parser')
-        events = []
-        rows = soup.find_all('div', class_='pbpa')
-        
-        home_score = 0
-        away_score = 0
-        
-        for row in rows:
-            team = None
-            for cls in row.get('class', []):
-                if cls.startswith('pbp-team'):
-                    team = 'home' if cls == 'pbp-team1' else 'away' if cls == 'pbp-team2' else None
-                    break
-            
-            period = None
-            for elem in row.find_all('span', class_='pbp-period'):
-                m = re.search(r'P(\d+)', elem.get_text())
-                if m: period = int(m.group(1))
-            
-            clock = None
-            for elem in row.find_all('div', class_='pbp-time'):
-                m = re.search(r'(\d{1,2}:\d{2})', elem.get_text())
-                if m: clock = m.group(1)
-            
-            for elem in row.find_all('span', class_='pbpsc'):
-                m = re.search(r'(\d+)\s*-\s*(\d+)', elem.get_text())
-                if m:
-                    home_score = int(m.group(1))
-                    away_score = int(m.group(2))
-            
-            player = None
-            for elem in row.find_all('div', class_='pbp-action'):
-                m = re.search(r'<strong>\d+,\s*([^<]+)</strong>', str(elem))
-                if m: player = m.group(1).strip()
-            
-            event_type = "unknown"
-            pts = None
-            for elem in row.find_all('div', class_='pbp-action'):
-                text = elem.get_text().lower()
-                if 'made' in text:
-                    event_type = "score"
-                    if '3pt' in text: pts = 3
-                    elif '2pt' in text: pts = 2
-                    elif 'free throw' in text: pts = 1
-                elif 'rebound' in text: event_type = "rebound"
-                elif 'assist' in text: event_type = "assist"
-                elif 'foul' in text: event_type = "foul"
-                elif 'turnover' in text: event_type = "turnover"
-                elif 'steal' in text: event_type = "steal"
-                elif 'block' in text: event_type = "block"
-            
-            events.append({
-                'period': period, 'clock': clock, 'team': team, 'player': player,
-                'event': event_type, 'points': pts,
-                'home_score': home_score, 'away_score': away_score
-            })
-        
-        return {'events': events, 'total_events': len(events)}
+    def live_pages(self, spans):
+        """The results the open bs.html can supply from its span map, keyed (page, parser)"""
+        return {
+            ('index', 'parse_index'): span_data.app_index(spans),
+            ('boxscore', 'parse_boxscore'): span_data.app_boxscore(spans),
+            ('boxscore', 'parse_csv_boxscore'): span_data.app_csv_boxscore(spans),
+            ('leaders', 'parse_leaders'): span_data.app_leaders(spans),
+        }
     
-    def parse_periods(self, html):
-        soup = BeautifulSoup(html, 'html.parser')
-        data = {'quarters': [], 'totals': {'home': 0, 'away': 0}}
-        
-        for elem in soup.find_all('span', class_='pbpsc'):
-            m = re.search(r'(\d+)\s*-\s*(\d+)', elem.get_text())
-            if m:
-                data['totals']['home'] = int(m.group(1))
-                data['totals']['away'] = int(m.group(2))
-        
-        return data
+    # Plain functions of the HTML, so the parse pool can run them in another process
+    parse_index = staticmethod(app_parsers.parse_index)
+    parse_boxscore = staticmethod(app_parsers.parse_boxscore)
+    parse_csv_boxscore = staticmethod(app_parsers.parse_csv_boxscore)
+    parse_periods = staticmethod(app_parsers.parse_periods)
+    parse_leaders = staticmethod(app_parsers.parse_leaders)
     
-    def parse_leaders(self, html):
-        soup = BeautifulSoup(html, 'html.parser')
-        data = {'leaders': []}
-        
-        for row in soup.find_all('tr'):
-            cells = [c.get_text(strip=True) for c in row.find_all(['td', 'th'])]
-            if len(cells) >= 3:
-                data['leaders'].append({'rank': cells[0], 'player': cells[1], 'value': cells[2]})
-        
-        return data
+    def parse_pbp(self, html):
+        """Only the rows added since the last poll are parsed (pbp_log.IncrementalPbp)"""
+        return self.pbp.parse(html)
     
     def update_ui(self, data):
         pages = data.get('pages', {})
@@ -805,35 +671,32 @@ class NEBLStatsApp:
             for item in self.home_tree.get_children():
                 self.home_tree.delete(item)
             for p in bs.get('home_players', [])[:15]:
-                self.home_tree.insert("", tk.END, values=(
-                    p.get('num', ''), p.get('name', '')[:20], p.get('min', ''),
-                    p.get('pts', ''), p.get('reb', ''), p.get('ast', ''),
-                    p.get('stl', ''), p.get('blk', ''), p.get('to', ''), p.get('pf', '')
+                self.home_tree.insert("", tk.END, values=tuple(
+                    p.text(key, '')[:20] if key == 'name' else p.text(key, '') for key in TREE_KEYS
                 ))
             
             for item in self.away_tree.get_children():
                 self.away_tree.delete(item)
             for p in bs.get('away_players', [])[:15]:
-                self.away_tree.insert("", tk.END, values=(
-                    p.get('num', ''), p.get('name', '')[:20], p.get('min', ''),
-                    p.get('pts', ''), p.get('reb', ''), p.get('ast', ''),
-                    p.get('stl', ''), p.get('blk', ''), p.get('to', ''), p.get('pf', '')
+                self.away_tree.insert("", tk.END, values=tuple(
+                    p.text(key, '')[:20] if key == 'name' else p.text(key, '') for key in TREE_KEYS
                 ))
         
-        # PBP
+        # PBP - only events the tree hasn't shown yet
         if 'playbyplay' in pages:
-            pbp = pages['playbyplay']
+            events, restarted, self.pbp_cursor = self.pbp.log.since(self.pbp_cursor)
+            if restarted:
+                for item in self.pbp_tree.get_children():
+                    self.pbp_tree.delete(item)
             
-            for item in self.pbp_tree.get_children():
-                self.pbp_tree.delete(item)
-            
-            events = pbp.get('events', [])[-50:][::-1]
-            for e in events:
-                self.pbp_tree.insert("", tk.END, values=(
+            for e in events[-50:]:
+                self.pbp_tree.insert("", 0, values=(
                     e.get('period', '-'), e.get('clock', '-') or '-', e.get('team', '-') or '-',
                     (e.get('player') or '-')[:25], e.get('event', '-'), e.get('points', ''),
                     f"{e.get('home_score', 0)}-{e.get('away_score', 0)}"
                 ))
+            for item in self.pbp_tree.get_children()[50:]:
+                self.pbp_tree.delete(item)
         
         # Periods
         if 'periods' in pages:
@@ -877,7 +740,10 @@ class NEBLStatsApp:
                             stat, p.get('player', ''), p.get('value', '')
                         ))
         
-        self.last_update.config(text=f"Updated: {data.get('fetched_at', '')}")
+        fetch = get_fetcher().report()
+        self.last_update.config(text=f"Updated: {data.get('fetched_at', '')}" + (f"  |  {fetch}" if fetch else "")
+                                + f"  |  Parse cache: {parse_cache.RESULTS.report()}"
+                                + (f"  |  Outputs: {self.outputs.report()}" if self.outputs else ""))
 
     def write_to_sheets(self):
         """Write current data to Google Sheets"""
@@ -916,14 +782,12 @@ class NEBLStatsApp:
             # Home players
             home_vals = [['#', 'Name', 'POS', 'PTS', 'REB', 'AST']]
             for p in self.home_players:
-                home_vals.append([p.get('num',''), p.get('name',''), p.get('pos',''), 
-                                p.get('pts',''), p.get('reb',''), p.get('ast','')])
+                home_vals.append([p.text(key, '') for key in ('num', 'name', 'pos', 'pts', 'reb', 'ast')])
             
             # Away players
             away_vals = [['#', 'Name', 'POS', 'PTS', 'REB', 'AST']]
             for p in self.away_players:
-                away_vals.append([p.get('num',''), p.get('name',''), p.get('pos',''),
-                                p.get('pts',''), p.get('reb',''), p.get('ast','')])
+                away_vals.append([p.text(key, '') for key in ('num', 'name', 'pos', 'pts', 'reb', 'ast')])
             
             # Write to sheets
             for name, vals in [('Scoreboard', sb_values), ('Home', home_vals), ('Away', away_vals)]:
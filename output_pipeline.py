@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - Output Pipeline
+- The poll loop publishes each cycle's data once and moves on; every sink
+  (CSV, TXT, XML, JSON, ...) writes it on its own worker thread
+- One-slot queue per sink: a frame still waiting when a newer one arrives
+  is dropped (latest wins), so a slow disk or virus scan on one output
+  never delays the next fetch or the other outputs
+- Per-sink write latency and dropped-frame counts for the status lines
+- Sinks get the same frame object - they must only read it
+"""
+
+import time
+import threading
+
+
+class Sink:
+    """One output and its worker - write(frame) runs off the poll loop"""
+
+    def __init__(self, name, write):
+        self.name = name
+        self.write = write
+        self.pending = None        # (frame, published at) waiting to be written
+        self.busy = False
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_ms = 0.0         # publish -> written, queue wait included
+        self.max_ms = 0.0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"output-{name}", daemon=True)
+        self._thread.start()
+
+    def publish(self, frame):
+        with self._cond:
+            if self.pending is not None:
+                self.dropped += 1
+            self.pending = (frame, time.perf_counter())
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self.pending is None and not self._closed:
+                    self._cond.wait()
+                if self.pending is None:
+                    return
+                (frame, published), self.pending = self.pending, None
+                self.busy = True
+            try:
+                self.write(frame)
+                ms = (time.perf_counter() - published) * 1000
+                self.written += 1
+                self.last_ms = ms
+                self.max_ms = max(self.max_ms, ms)
+            except Exception as e:
+                self.errors += 1
+                print(f"Output {self.name} failed: {e}")
+            finally:
+                with self._cond:
+                    self.busy = False
+                    self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Wait until the latest frame is written - True if it was in time"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self.pending is not None or self.busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def close(self, timeout=5):
+        """Write what is pending, then stop the worker"""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def report(self):
+        """'csv 4ms (max 31ms), 2 dropped'"""
+        text = f"{self.name} {self.last_ms:.0f}ms (max {self.max_ms:.0f}ms)"
+        if self.dropped:
+            text += f", {self.dropped} dropped"
+        if self.errors:
+            text += f", {self.errors} failed"
+        return text
+
+
+class OutputPipeline:
+    """Fan each published frame out to every sink"""
+
+    def __init__(self, sinks=None):
+        self.sinks = {}
+        for name, write in (sinks or {}).items():
+            self.add(name, write)
+
+    def add(self, name, write):
+        self.sinks[name] = Sink(name, write)
+        return self.sinks[name]
+
+    def publish(self, frame):
+        for sink in self.sinks.values():
+            sink.publish(frame)
+
+    def flush(self, timeout=None):
+        return all([sink.flush(timeout) for sink in self.sinks.values()])
+
+    def close(self, timeout=5):
+        for sink in self.sinks.values():
+            sink.close(timeout)
+
+    def report(self):
+        return " | ".join(sink.report() for sink in self.sinks.values())
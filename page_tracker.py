@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - Page Change Tracker
+- ETag / Last-Modified validators per URL for conditional requests
+- Content hash per URL so unchanged pages skip parse, writes and pushes
+- Optional JSON state file so one-shot runs (GitHub Actions) remember the last run
+"""
+
+import os
+import json
+import hashlib
+import threading
+
+
+class PageTracker:
+    def __init__(self, state_file=None):
+        self.state_file = state_file
+        self.pages = {}
+        self._lock = threading.Lock()
+        if state_file and os.path.exists(state_file):
+            try:
+                with open(state_file, 'r', encoding='utf-8') as f:
+                    self.pages = json.load(f)
+            except Exception as e:
+                print(f"Ignoring page state {state_file}: {e}")
+
+    def headers(self, url):
+        """Conditional request headers for url"""
+        page = self.pages.get(url, {})
+        headers = {}
+        if page.get('etag'):
+            headers['If-None-Match'] = page['etag']
+        if page.get('last_modified'):
+            headers['If-Modified-Since'] = page['last_modified']
+        return headers
+
+    def changed(self, url, body, response_headers=None):
+        """Record body for url and say whether it differs from last time"""
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        digest = hashlib.sha1(body).hexdigest()
+        with self._lock:
+            page = self.pages.setdefault(url, {})
+            if response_headers is not None:
+                page['etag'] = response_headers.get('ETag', '')
+                page['last_modified'] = response_headers.get('Last-Modified', '')
+            if page.get('hash') == digest:
+                return False
+            page['hash'] = digest
+            return True
+
+    def forget(self, url):
+        """Force the next fetch of url to count as changed"""
+        with self._lock:
+            self.pages.pop(url, None)
+
+    def save(self):
+        if not self.state_file:
+            return
+        folder = os.path.dirname(self.state_file)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            json.dump(self.pages, f)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - Parse Result Cache
+- Results keyed by (parser, SHA-1 of the page content)
+- Bounded LRU, so a long game doesn't keep every old page's parse
+- Hit/miss/eviction counters for the status lines
+- One cache for parsed dicts, a smaller one for span indexes, so every
+  parser reading the same page shares one walk of it
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def content_key(html):
+    if isinstance(html, str):
+        html = html.encode('utf-8')
+    return hashlib.sha1(html or b'').hexdigest()
+
+
+def parser_name(parser):
+    return f"{getattr(parser, '__module__', '')}.{getattr(parser, '__qualname__', repr(parser))}"
+
+
+class ParseCache:
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, kind, html, parser):
+        """parser(html), or the stored result if this kind already parsed this content"""
+        found, result = self.lookup(kind, html)
+        if found:
+            return result
+        # Parse outside the lock - other pages don't wait on this one
+        result = parser(html)
+        self.store(kind, html, result)
+        return result
+
+    def lookup(self, kind, html):
+        """(True, result) if cached, else (False, None) - counts the hit/miss"""
+        key = (kind, content_key(html))
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True, self.entries[key]
+            self.misses += 1
+            return False, None
+
+    def store(self, kind, html, result):
+        key = (kind, content_key(html))
+        with self._lock:
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def parse(self, parser, html):
+        """get() keyed by the parser function itself"""
+        return self.get(parser_name(parser), html, parser)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def report(self):
+        """'12 hits, 4 misses (75%), 0 evicted'"""
+        with self._lock:
+            total = self.hits + self.misses
+            rate = f" ({self.hits * 100 // total}%)" if total else ""
+            return f"{self.hits} hits, {self.misses} misses{rate}, {self.evictions} evicted"
+
+
+RESULTS = ParseCache(64)   # parsed page dicts
+INDEXES = ParseCache(8)    # span_index.SpanIndex per page content
+
+
+def parse(parser, html):
+    return RESULTS.parse(parser, html)
+
+
+def report():
+    return f"results {RESULTS.report()} | indexes {INDEXES.report()}"
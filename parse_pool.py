@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - Parse Process Pool
+- Parses a cycle's pages in worker processes, one task per page, so the
+  GIL-bound parsing runs on other cores instead of next to the Tk mainloop
+  and the fetch threads
+- Parsers must be module-level functions: raw HTML in, plain dict out
+  (write_csv.parse_*, app_parsers.parse_*)
+- NEBL_PARSE_WORKERS=0 parses in-process; a broken pool falls back to that
+"""
+
+import os
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+WORKERS = int(os.environ.get('NEBL_PARSE_WORKERS', min(4, os.cpu_count() or 1)))
+
+
+def parse_page(html, parsers):
+    """Every parser's result for one page - runs in the worker, sharing its span index"""
+    return [parser(html) for parser in parsers]
+
+
+class ParsePool:
+    def __init__(self, workers=WORKERS):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None and self.workers > 0:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def parse_pages(self, jobs):
+        """{page: (html, [parser, ...])} -> {page: [result, ...]}, pages in parallel"""
+        executor = self._get_executor() if jobs else None
+        if executor is None:
+            return {page: parse_page(html, parsers) for page, (html, parsers) in jobs.items()}
+        try:
+            futures = {page: executor.submit(parse_page, html, parsers)
+                       for page, (html, parsers) in jobs.items()}
+            return {page: future.result() for page, future in futures.items()}
+        except (BrokenProcessPool, pickle.PicklingError) as e:
+            # Dead worker / unpicklable parser - parse here from now on
+            print(f"Parse pool failed ({e}), parsing in-process")
+            self.close()
+            self.workers = 0
+            return {page: parse_page(html, parsers) for page, (html, parsers) in jobs.items()}
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Process-wide parse pool shared by the GUI and CSV writer"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ParsePool()
+        return _pool
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - Incremental Play-by-Play
+- Remembers the pbp rows already parsed; each poll parses only the new ones
+  (pbp.html is newest first, so those are the rows above the known ones)
+- Append-only event log, in memory and as JSONL on disk (data/pbp_<game>.jsonl)
+- A corrected/reordered page truncates the log with a {"reset": n} record
+  instead of rewriting it, so the file stays append-only
+- Consumers keep a cursor into the log and only handle events past it
+- The log is oldest first, whichever way the source lists its plays
+"""
+
+import os
+import re
+import json
+import threading
+import html_backend
+from feed import pbp_events
+
+ROW_START_RE = re.compile(r'<div\b[^>]*\bclass="[^"]*\bpbpa\b')
+DIV_RE = re.compile(r'<div\b|</div>')
+
+
+def parse_row(row, home_score=0, away_score=0):
+    """One div.pbpa -> event dict; rows without a score keep the running one"""
+    team = None
+    for cls in row.get('class', []):
+        if cls.startswith('pbp-team'):
+            team = 'home' if cls == 'pbp-team1' else 'away' if cls == 'pbp-team2' else None
+            break
+
+    period = None
+    for elem in row.find_all('span', class_='pbp-period'):
+        m = re.search(r'P(\d+)', elem.get_text())
+        if m: period = int(m.group(1))
+
+    clock = None
+    for elem in row.find_all('div', class_='pbp-time'):
+        m = re.search(r'(\d{1,2}:\d{2})', elem.get_text())
+        if m: clock = m.group(1)
+
+    for elem in row.find_all('span', class_='pbpsc'):
+        m = re.search(r'(\d+)\s*-\s*(\d+)', elem.get_text())
+        if m:
+            home_score = int(m.group(1))
+            away_score = int(m.group(2))
+
+    player = None
+    event_type = "unknown"
+    pts = None
+    for elem in row.find_all('div', class_='pbp-action'):
+        m = re.search(r'<strong>\d+,\s*([^<]+)</strong>', str(elem))
+        if m: player = m.group(1).strip()
+
+        text = elem.get_text().lower()
+        if 'made' in text:
+            event_type = "score"
+            if '3pt' in text: pts = 3
+            elif '2pt' in text: pts = 2
+            elif 'free throw' in text: pts = 1
+        elif 'rebound' in text: event_type = "rebound"
+        elif 'assist' in text: event_type = "assist"
+        elif 'foul' in text: event_type = "foul"
+        elif 'turnover' in text: event_type = "turnover"
+        elif 'steal' in text: event_type = "steal"
+        elif 'block' in text: event_type = "block"
+
+    return {
+        'period': period, 'clock': clock, 'team': team, 'player': player,
+        'event': event_type, 'points': pts,
+        'home_score': home_score, 'away_score': away_score
+    }
+
+
+def row_starts(html):
+    """Offsets of every div.pbpa in page order (a regex scan, no parse)"""
+    return [m.start() for m in ROW_START_RE.finditer(html)]
+
+
+def row_markup(html, start):
+    """Raw markup of the div opening at start, through its matching </div>"""
+    depth = 0
+    for m in DIV_RE.finditer(html, start):
+        depth += 1 if m.group() != '</div>' else -1
+        if depth == 0:
+            return html[start:m.end()]
+    return html[start:]
+
+
+def parse_rows(chunks, home_score=0, away_score=0):
+    """Events for raw row markup, parsed as one small document"""
+    if not chunks:
+        return []
+    soup = html_backend.soup(''.join(chunks))
+    events = []
+    for row in soup.find_all('div', class_='pbpa'):
+        event = parse_row(row, home_score, away_score)
+        home_score, away_score = event['home_score'], event['away_score']
+        events.append(event)
+    return events
+
+
+class PbpLog:
+    """Append-only pbp event list, mirrored to a JSONL file when given a path"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.events = []
+        self.version = 0   # bumped on every reset, so cursors know to start over
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            self._apply(json.loads(line))
+            except Exception as e:
+                print(f"Ignoring pbp log {path}: {e}")
+                self.events, self.version = [], 0
+
+    def _apply(self, record):
+        if 'reset' in record:
+            # A new list rather than a cut, so a list result() handed out never shrinks
+            self.events = self.events[:record['reset']]
+            self.version += 1
+        else:
+            self.events.append(record)
+
+    def _write(self, records):
+        if not self.path or not records:
+            return
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(r) + '\n' for r in records))
+
+    def append(self, events):
+        with self._lock:
+            self.events.extend(events)
+            self._write(events)
+
+    def truncate(self, count):
+        """Drop events from count on (a correction) - recorded, not rewritten"""
+        with self._lock:
+            record = {'reset': count}
+            self._apply(record)
+            self._write([record])
+
+    def sync(self, events):
+        """Bring the log in line with a full event list; returns how many were new"""
+        keep = 0
+        for old, new in zip(self.events, events):
+            if old != new:
+                break
+            keep += 1
+        if keep < len(self.events):
+            print(f"PBP: {len(self.events) - keep} events changed, log reset to {keep}")
+            self.truncate(keep)
+        self.append(events[keep:])
+        return len(events) - keep
+
+    def since(self, cursor=None):
+        """(events past cursor, restarted, new cursor) - restarted means drop what you have"""
+        with self._lock:
+            version, count = cursor or (None, 0)
+            restarted = version != self.version or count > len(self.events)
+            start = 0 if restarted else count
+            return self.events[start:], restarted, (self.version, len(self.events))
+
+    def result(self):
+        """The {'events', 'total_events'} dict the pbp parsers return
+
+        events is the log's own list, not a copy - it only grows, so
+        events[:total_events] is this result's cut for a caller that keeps it.
+        """
+        with self._lock:
+            return {'events': self.events, 'total_events': len(self.events),
+                    'version': self.version}
+
+
+class IncrementalPbp:
+    """pbp.html / feed pbp -> PbpLog, parsing only what is new since the last call"""
+
+    def __init__(self, log=None):
+        self.log = log or PbpLog()
+        self.newest = None  # raw markup of the top (newest) and bottom (oldest) rows already parsed
+        self.oldest = None
+        self.rows = 0
+        self.parsed = 0     # rows parsed on the last call
+
+    def parse(self, html):
+        starts = row_starts(html or '')
+        new = None
+        if self.rows and len(starts) >= self.rows:
+            # New plays go on top - the known newest row is pushed down by as many
+            top = len(starts) - self.rows
+            if (row_markup(html, starts[top]) == self.newest
+                    and row_markup(html, starts[-1]) == self.oldest):
+                new = [row_markup(html, s) for s in reversed(starts[:top])]
+
+        if new is not None:
+            last = self.log.events[-1] if self.log.events else {}
+            events = parse_rows(new, last.get('home_score', 0), last.get('away_score', 0))
+            self.log.append(events)
+            self.parsed = len(new)
+        else:
+            # First call, or the page changed below its new rows - parse it all once, oldest first
+            chunks = [row_markup(html, s) for s in reversed(starts)]
+            self.log.sync(parse_rows(chunks))
+            self.parsed = len(chunks)
+
+        if starts:
+            self.newest = row_markup(html, starts[0])
+            self.oldest = row_markup(html, starts[-1])
+        self.rows = len(starts)
+        return self.log.result()
+
+    def parse_feed(self, payload):
+        """Feed pbp is newest first - convert only the actions ahead of the ones logged"""
+        actions = payload.get('pbp') or []
+        known = len(self.log.events)
+        if known and len(actions) >= known:
+            newest_known = pbp_events({'pbp': [actions[len(actions) - known]]})
+            if newest_known == self.log.events[-1:]:
+                events = pbp_events({'pbp': actions[:len(actions) - known]})
+                self.log.append(events)
+                self.parsed = len(events)
+                return self.log.result()
+        self.log.sync(pbp_events(payload))
+        self.parsed = len(actions)
+        return self.log.result()
+
+
+def log_path(game_id, folder="data"):
+    return os.path.join(folder, f"pbp_{game_id}.jsonl")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - Adaptive Poll Scheduler
+- Separate cadence per page (scoreboard/pbp fast, leaders/stats slow)
+- Break pages (periods) fetched only when a period ends
+- Backs off when the game clock is frozen, at breaks/halftime and once final
+"""
+
+import re
+import time
+
+# Slowdown applied to every cadence per game state
+BACKOFF = {
+    'live': 1,
+    'break': 10,   # between periods / halftime
+    'final': 60,
+}
+FROZEN_AFTER = 3        # seconds the clock must stand still before backing off
+FROZEN_MAX = 5          # max slowdown while the clock is stopped
+BREAK_PAGE_MAX_AGE = 300
+
+
+def _period_num(period):
+    m = re.search(r'(\d+)', str(period or ''))
+    return int(m.group(1)) if m else 0
+
+
+def _clock_secs(clock):
+    m = re.search(r'(\d{1,2}):(\d{2})', str(clock or ''))
+    return int(m.group(1)) * 60 + int(m.group(2)) if m else None
+
+
+class PollScheduler:
+    def __init__(self, cadences, break_pages=(), min_wait=0.2):
+        """cadences: {page: seconds}; break_pages: fetched at period breaks only"""
+        self.cadences = dict(cadences)
+        self.break_pages = tuple(break_pages)
+        self.min_wait = min_wait
+        self.last_fetch = {}
+        self.state = 'live'
+        self.break_pending = True
+
+        self._clock = None
+        self._clock_changed_at = time.monotonic()
+
+    def slowdown(self, now=None):
+        now = time.monotonic() if now is None else now
+        factor = BACKOFF[self.state]
+        if self.state == 'live' and self._clock is not None:
+            frozen_for = now - self._clock_changed_at
+            if frozen_for >= FROZEN_AFTER:
+                # Dead ball, timeout, free throws: ease off gradually
+                factor = min(1 + frozen_for / 10, FROZEN_MAX)
+        return factor
+
+    def interval(self, page, now=None):
+        return self.cadences[page] * self.slowdown(now)
+
+    def due(self, now=None):
+        """Pages to fetch this cycle"""
+        now = time.monotonic() if now is None else now
+        pages = [page for page in self.cadences
+                 if page not in self.last_fetch or now - self.last_fetch[page] >= self.interval(page, now)]
+        for page in self.break_pages:
+            age = now - self.last_fetch.get(page, -BREAK_PAGE_MAX_AGE)
+            if self.break_pending or age >= BREAK_PAGE_MAX_AGE:
+                pages.append(page)
+        return pages
+
+    def mark(self, pages, now=None):
+        now = time.monotonic() if now is None else now
+        for page in pages:
+            self.last_fetch[page] = now
+            if page in self.break_pages:
+                self.break_pending = False
+
+    def observe(self, period, clock, home_score=None, away_score=None, now=None):
+        """Feed the latest scoreboard so cadences follow the game state"""
+        now = time.monotonic() if now is None else now
+        secs = _clock_secs(clock)
+        if secs != self._clock:
+            self._clock = secs
+            self._clock_changed_at = now
+
+        if secs == 0:
+            tied = str(home_score) == str(away_score)
+            state = 'final' if _period_num(period) >= 4 and not tied else 'break'
+        else:
+            state = 'live'
+
+        if state != self.state and state != 'live':
+            # Period just ended - refresh the break pages
+            self.break_pending = True
+        self.state = state
+
+    def wait(self, now=None):
+        """Seconds until the next page is due"""
+        now = time.monotonic() if now is None else now
+        waits = []
+        for page in self.cadences:
+            last = self.last_fetch.get(page)
+            waits.append(0 if last is None else last + self.interval(page, now) - now)
+        if self.break_pending and self.break_pages:
+            waits.append(0)
+        return max(min(waits) if waits else 1.0, self.min_wait)
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - Push Server
+- One upstream watcher per game however many dashboards are open: the
+  same fetch/parse loop as write_csv (pages, or --feed for the JSON feed)
+- Streams score/clock/box changes to every browser over Server-Sent Events
+  as numbered JSON Patches (live_json.LiveDelta)
+- Reconnects send Last-Event-ID; the stream resumes after it, or starts
+  over with the full document when that's no longer possible
+- A game's watcher stops IDLE_SECONDS after its last dashboard closes
+- Serves command-center.html at /, so the page and the stream share an origin;
+  the dashboard only streams when opened from here (no CORS, no URL to set),
+  and the Vercel copy of the page points people back to this server
+- Listens on 127.0.0.1 unless --host says otherwise (--host 0.0.0.0 for
+  dashboards on other machines)
+
+Usage:
+    python push_server.py [port] [--feed] [--host ADDR]
+    GET /events?game=<id>   text/event-stream: 'full' then 'patch' events
+    GET /state?game=<id>    the current document as JSON
+"""
+
+import os
+import re
+import sys
+import time
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import write_csv
+import span_data
+import live_json
+from live_json import LiveDelta
+from feed import FeedClient, spans_from_feed
+from page_tracker import PageTracker
+from poll_scheduler import PollScheduler
+from snapshot import CycleSnapshot
+
+PORT = int(os.environ.get('NEBL_PUSH_PORT', 8766))
+HOST = '127.0.0.1'
+IDLE_SECONDS = 60
+KEEPALIVE_SECONDS = 15   # comment line so proxies and dead sockets show up
+PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'command-center.html')
+# The page streams only when it carries the "on" marker, i.e. when served from here
+PAGE_MARKER = (b'<meta name="nebl-push" content="off">', b'<meta name="nebl-push" content="on">')
+# What the dashboards get - write_csv's data minus the raw statistics page
+DOC_KEYS = ('home', 'away', 'h_score', 'a_score', 'period', 'clock',
+            'home_players', 'away_players', 'home_totals', 'away_totals',
+            'home_pts_leaders', 'away_pts_leaders', 'home_reb_leaders',
+            'away_reb_leaders', 'home_ast_leaders', 'away_ast_leaders')
+
+
+def document(data):
+    return {key: data[key] for key in DOC_KEYS if key in data}
+
+
+class GameWatcher:
+    """Polls one game upstream and keeps the numbered deltas every stream reads"""
+
+    def __init__(self, game_id, use_feed=False):
+        self.game_id = game_id
+        self.use_feed = use_feed
+        self.delta = LiveDelta()
+        # Ids are epoch-seq, so a reconnect after a server restart doesn't resume a stale sequence
+        self.epoch = f"{int(time.time()):x}"
+        self.clients = 0
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"watch-{game_id}", daemon=True)
+        self._thread.start()
+
+    def event_id(self, seq):
+        return f"{self.epoch}-{seq}"
+
+    def resume_seq(self, last_id):
+        """seq to resume after from a Last-Event-ID, None to start over"""
+        m = re.match(r'^([0-9a-f]+)-(\d+)$', (last_id or '').strip())
+        if not m or m.group(1) != self.epoch:
+            return None
+        return int(m.group(2))
+
+    def publish(self, data):
+        if self.delta.update(document(data)) is not None:
+            with self._cond:
+                self._cond.notify_all()
+
+    def wait(self, seq, timeout):
+        """Block until there is something past seq - False on timeout"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.delta.seq > seq or self._stop.is_set(), timeout)
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    @property
+    def stopped(self):
+        return self._stop.is_set()
+
+    def _run(self):
+        print(f"Watching game {self.game_id} ({'feed' if self.use_feed else 'pages'})")
+        while not self._stop.is_set():
+            try:
+                if self.use_feed:
+                    self._watch_feed()
+                else:
+                    self._watch_pages()
+            except Exception as e:
+                print(f"Game {self.game_id}: {e}")
+                self._stop.wait(1)
+        print(f"Stopped watching game {self.game_id}")
+
+    def _watch_feed(self):
+        """write_csv.run_feed's loop"""
+        client = FeedClient(self.game_id)
+        scheduler = PollScheduler({'feed': write_csv.PAGE_CADENCES['index']})
+        while not self._stop.wait(scheduler.wait()):
+            scheduler.mark(['feed'])
+            payload = client.poll()
+            if payload is None:
+                continue
+            data = span_data.csv_data(spans_from_feed(payload))
+            scheduler.observe(data['period'], data['clock'], data['h_score'], data['a_score'])
+            self.publish(data)
+
+    def _watch_pages(self):
+        """write_csv's page loop - each page on its cadence, parsed only when it changed"""
+        base_url = f"https://fibalivestats.dcd.shared.geniussports.com/u/BBF/{self.game_id}"
+        urls = {name: f"{base_url}/{name}.html" for name in write_csv.PAGE_PARSERS}
+        scheduler = PollScheduler(write_csv.PAGE_CADENCES)
+        tracker = PageTracker()
+        snapshot = None
+        while not self._stop.is_set():
+            due = scheduler.due()
+            scheduler.mark(due)
+            htmls = write_csv.fetch_all({name: urls[name] for name in due}, tracker)
+            snapshot = CycleSnapshot(snapshot)
+            if write_csv.refresh_snapshot(snapshot, htmls) and snapshot.has('bs'):
+                data = write_csv.combine_snapshot(snapshot)
+                scheduler.observe(data.get('period'), data.get('clock'), data.get('h_score'), data.get('a_score'))
+                self.publish(data)
+            self._stop.wait(scheduler.wait())
+
+
+class Hub:
+    """Game id -> its watcher, started by the first dashboard and stopped after the last"""
+
+    def __init__(self, use_feed=False):
+        self.use_feed = use_feed
+        self.games = {}
+        self._lock = threading.Lock()
+
+    def join(self, game_id):
+        with self._lock:
+            watcher = self.games.get(game_id)
+            if watcher is None or watcher.stopped:
+                watcher = self.games[game_id] = GameWatcher(game_id, self.use_feed)
+            watcher.clients += 1
+            return watcher
+
+    def leave(self, watcher):
+        with self._lock:
+            watcher.clients -= 1
+            if watcher.clients == 0:
+                timer = threading.Timer(IDLE_SECONDS, self._reap, (watcher,))
+                timer.daemon = True
+                timer.start()
+
+    def _reap(self, watcher):
+        with self._lock:
+            if watcher.clients == 0 and self.games.get(watcher.game_id) is watcher:
+                watcher.stop()
+                del self.games[watcher.game_id]
+
+
+def make_server(port=PORT, use_feed=False, host=HOST):
+    hub = Hub(use_feed)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            game_id = (parse_qs(url.query).get('game') or [''])[0].strip()
+            if url.path in ('/', '/command-center.html'):
+                self.send_page()
+            elif url.path not in ('/events', '/state'):
+                self.send_error(404)
+            elif not game_id.isdigit():
+                self.send_error(400, "game=<numeric game id> required")
+            elif url.path == '/events':
+                self.stream(game_id)
+            else:
+                self.state(game_id)
+
+        def send_page(self):
+            with open(PAGE, 'rb') as f:
+                body = f.read().replace(*PAGE_MARKER)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def state(self, game_id):
+            watcher = hub.join(game_id)
+            try:
+                # A cold game gets a moment for its first fetch
+                watcher.wait(0, 10)
+                body = live_json.dumps(watcher.delta.full()).encode('utf-8')
+            finally:
+                hub.leave(watcher)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def stream(self, game_id):
+            watcher = hub.join(game_id)
+            try:
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('X-Accel-Buffering', 'no')
+                self.end_headers()
+                self.wfile.write(b"retry: 2000\n\n")
+                self.wfile.flush()
+
+                seq = watcher.resume_seq(self.headers.get('Last-Event-ID'))
+                while not watcher.stopped:
+                    records = None if seq is None else watcher.delta.since(seq)
+                    if records is None:
+                        full = watcher.delta.full()
+                        if full['full'] is not None:
+                            self.send_event('full', watcher.event_id(full['seq']), full)
+                            seq = full['seq']
+                    else:
+                        for record in records:
+                            self.send_event('patch', watcher.event_id(record['seq']), record)
+                            seq = record['seq']
+                    if not watcher.wait(seq or 0, KEEPALIVE_SECONDS):
+                        self.wfile.write(b": keepalive\n\n")
+                        self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+                pass   # dashboard closed
+            finally:
+                hub.leave(watcher)
+
+        def send_event(self, event, event_id, data):
+            self.wfile.write(f"event: {event}\nid: {event_id}\ndata: {live_json.dumps(data, pretty=False)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+
+        def log_message(self, fmt, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.hub = hub
+    return server
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    host = HOST
+    if '--host' in args:
+        i = args.index('--host')
+        if i + 1 >= len(args):
+            print("Usage: python push_server.py [port] [--feed] [--host ADDR]")
+            sys.exit(2)
+        host = args[i + 1]
+        del args[i:i + 2]
+    args = [a for a in args if a != '--feed']
+    port = int(args[0]) if args else PORT
+    server = make_server(port, use_feed='--feed' in sys.argv, host=host)
+    print(f"Push server on http://{host}:{port}/ - dashboards stream from /events?game=<id>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopped.")
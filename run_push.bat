@@ -0,0 +1,14 @@
+@echo off
+title NEBL Push Server
+echo ========================================
+echo      NEBL Live Stats Push Server
+echo ========================================
+echo.
+echo Dashboards: open http://^<this machine^>:8766/ on any screen
+echo Every screen shares one upstream watcher per game.
+echo.
+REM --host 0.0.0.0 lets the other screens on the network connect;
+REM leave it off to accept this machine only
+python push_server.py 8766 --host 0.0.0.0
+
+pause
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - Cycle Snapshot
+One poll cycle's raw HTML plus every parse of it, computed once and shared
+by the GUI, the CSV/TXT/XML writers and the JSON dump. Pages not fetched
+(or unchanged) this cycle are carried over from the previous snapshot
+together with their parse results. Parses go through parse_cache, so
+content seen in an earlier cycle (or by another parser key) isn't parsed again.
+"""
+
+from datetime import datetime
+import parse_cache
+
+
+class CycleSnapshot:
+    def __init__(self, previous=None):
+        self.fetched_at = datetime.now().isoformat()
+        self.html = dict(previous.html) if previous else {}
+        self.results = dict(previous.results) if previous else {}
+        self.changed = []
+
+    def update(self, page, html):
+        """New content for page - drops its stale parse results"""
+        self.html[page] = html
+        self.results = {k: v for k, v in self.results.items() if k[0] != page}
+        if page not in self.changed:
+            self.changed.append(page)
+
+    def store(self, page, key, value):
+        """Put an already-built result in (e.g. from the JSON feed)"""
+        self.results[(page, key)] = value
+        if page not in self.changed:
+            self.changed.append(page)
+
+    def has(self, page):
+        return page in self.html or any(k[0] == page for k in self.results)
+
+    def parse_many(self, jobs, pool=None):
+        """Run every parse the pages still need at once - on pool (parse_pool) if given
+
+        jobs: {page: [(key, parser), ...]}; results land where parse() finds them.
+        """
+        todo = {}
+        for page, parsers in jobs.items():
+            if page not in self.html:
+                continue
+            for key, parser in parsers:
+                key = (page, key or parser.__name__)
+                if key in self.results:
+                    continue
+                found, result = parse_cache.RESULTS.lookup(parse_cache.parser_name(parser), self.html[page])
+                if found:
+                    self.results[key] = result
+                else:
+                    todo.setdefault(page, []).append((key, parser))
+        if not todo:
+            return
+        jobs = {page: (self.html[page], [parser for _, parser in items]) for page, items in todo.items()}
+        if pool:
+            done = pool.parse_pages(jobs)
+        else:
+            done = {page: [parser(html) for parser in parsers] for page, (html, parsers) in jobs.items()}
+        for page, items in todo.items():
+            for (key, parser), result in zip(items, done[page]):
+                self.results[key] = result
+                parse_cache.RESULTS.store(parse_cache.parser_name(parser), self.html[page], result)
+    
+    def parse(self, page, parser, key=None, cache=True):
+        """parser(html) for page, run at most once per content
+
+        cache=False for parsers with state of their own (incremental pbp).
+        """
+        key = (page, key or parser.__name__)
+        if key not in self.results:
+            if page not in self.html:
+                return None
+            html = self.html[page]
+            self.results[key] = parse_cache.parse(parser, html) if cache else parser(html)
+        return self.results[key]
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - Snapshot History Store
+- Append-only SQLite (WAL) database of every game the app watched:
+  data/snapshots.db, indexed on (game_id, fetched_at)
+- Stored as deltas: a scoreboard row when it changed, a player line when
+  that player's line changed, each pbp event once ({"reset": n} when the
+  pbp log was corrected, as in pbp_log)
+- record() only queues the cycle; a writer thread works out the deltas and
+  commits everything queued in one transaction every BATCH_SECONDS
+- state_at() rebuilds a game as it stood at any fetched_at
+"""
+
+import os
+import json
+import time
+import queue
+import sqlite3
+import threading
+from models import PLAYER_KEYS, PlayerLine
+
+BATCH_SECONDS = 2.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scoreboard (
+    game_id TEXT NOT NULL, fetched_at TEXT NOT NULL,
+    home TEXT, away TEXT, home_score INTEGER, away_score INTEGER, period INTEGER, clock TEXT);
+CREATE INDEX IF NOT EXISTS scoreboard_game_time ON scoreboard (game_id, fetched_at);
+CREATE TABLE IF NOT EXISTS player_lines (
+    game_id TEXT NOT NULL, fetched_at TEXT NOT NULL,
+    side TEXT NOT NULL, name TEXT NOT NULL, line TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS player_lines_game_time ON player_lines (game_id, fetched_at);
+CREATE TABLE IF NOT EXISTS pbp (
+    game_id TEXT NOT NULL, fetched_at TEXT NOT NULL, record TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS pbp_game_time ON pbp (game_id, fetched_at);
+"""
+SCOREBOARD_COLS = ('home', 'away', 'home_score', 'away_score', 'period', 'clock')
+
+
+def dumps(obj):
+    return json.dumps(obj, separators=(',', ':'))
+
+
+def scoreboard_row(index):
+    """app_parsers.parse_index dict -> SCOREBOARD_COLS values"""
+    teams, score = index.get('teams', {}), index.get('score', {})
+    return (teams.get('home'), teams.get('away'), score.get('home'), score.get('away'),
+            index.get('period'), index.get('clock'))
+
+
+def line_record(p):
+    """A PlayerLine as a compact JSON list: num, pos, is_starter, then stats in models.PLAYER_KEYS order"""
+    return dumps([p.num, p.pos, p.is_starter] + list(p.stats))
+
+
+def line_player(name, line):
+    values = json.loads(line)
+    return PlayerLine(values[0], name, values[1], values[2], values[3:3 + len(PLAYER_KEYS)])
+
+
+class SnapshotStore:
+    def __init__(self, path="data/snapshots.db", batch_seconds=BATCH_SECONDS):
+        self.path = path
+        self.batch_seconds = batch_seconds
+        self.cycles = 0       # cycles recorded
+        self.rows = 0         # rows written
+        self.last = {}        # game_id -> {'scoreboard', 'lines', 'pbp'} as last recorded
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="snapshot-store", daemon=True)
+        self._thread.start()
+
+    def connect(self):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")   # WAL stays consistent; a crash loses at most the last batch
+        db.executescript(SCHEMA)
+        return db
+
+    def record(self, game_id, fetched_at, index=None, players=None, events=None, event_count=None):
+        """Queue one cycle - index: parse_index dict, players: {'home': [PlayerLine]}, events: full pbp list
+
+        event_count: how much of events is this cycle's, for a list that
+        keeps growing after the call (the pbp log's own)
+        """
+        self._queue.put((str(game_id), fetched_at, index, players, events, event_count))
+
+    def record_result(self, game_id, result):
+        """Queue the app's snapshot_result dict for a cycle"""
+        pages = result.get('pages', {})
+        box = pages.get('boxscore')
+        players = {'home': box.get('home_players', []), 'away': box.get('away_players', [])} if box else None
+        pbp = pages.get('playbyplay') or {}
+        self.record(game_id, result.get('fetched_at'), pages.get('index'), players,
+                    pbp.get('events'), pbp.get('total_events'))
+
+    def _run(self):
+        db = self.connect()
+        closing = False
+        while not closing:
+            item = self._queue.get()
+            batch = [item]
+            if item is not None:
+                # Gather what arrives in the batch window - one commit for all of it
+                deadline = time.monotonic() + self.batch_seconds
+                try:
+                    while batch[-1] is not None:
+                        batch.append(self._queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    pass
+            closing = batch[-1] is None
+            cycles = [c for c in batch if c is not None]
+            try:
+                rows = {'scoreboard': [], 'player_lines': [], 'pbp': []}
+                for cycle in cycles:
+                    self._deltas(db, cycle, rows)
+                with db:
+                    db.executemany(f"INSERT INTO scoreboard VALUES (?, ?, {', '.join('?' * len(SCOREBOARD_COLS))})",
+                                   rows['scoreboard'])
+                    db.executemany("INSERT INTO player_lines VALUES (?, ?, ?, ?, ?)", rows['player_lines'])
+                    db.executemany("INSERT INTO pbp VALUES (?, ?, ?)", rows['pbp'])
+                self.cycles += len(cycles)
+                self.rows += sum(len(r) for r in rows.values())
+            except Exception as e:
+                print(f"Snapshot store write failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        db.close()
+
+    def _deltas(self, db, cycle, rows):
+        """Rows for what changed since the last cycle recorded for this game"""
+        game_id, fetched_at, index, players, events, event_count = cycle
+        if game_id not in self.last:
+            # First cycle of this game this run - continue from what the file already has
+            state = self._state(db, game_id)
+            self.last[game_id] = state
+        last = self.last[game_id]
+
+        if index is not None:
+            board = scoreboard_row(index)
+            if board != last['scoreboard']:
+                rows['scoreboard'].append((game_id, fetched_at) + board)
+                last['scoreboard'] = board
+
+        for side, lines in (players or {}).items():
+            for p in lines:
+                line = line_record(p)
+                if last['lines'].get((side, p.name)) != line:
+                    rows['player_lines'].append((game_id, fetched_at, side, p.name, line))
+                    last['lines'][(side, p.name)] = line
+
+        if events is not None:
+            events = events[:event_count]
+            known = last['pbp']
+            keep = 0
+            for old, new in zip(known, events):
+                if old != new:
+                    break
+                keep += 1
+            if keep < len(known):
+                rows['pbp'].append((game_id, fetched_at, dumps({'reset': keep})))
+            rows['pbp'].extend((game_id, fetched_at, dumps(e)) for e in events[keep:])
+            last['pbp'] = list(events)
+
+    def _state(self, db, game_id, fetched_at=None):
+        """Latest scoreboard row, {(side, name): line JSON} and pbp of a game up to fetched_at (all if None)"""
+        where, args = "game_id = ?", (game_id,)
+        if fetched_at:
+            where, args = where + " AND fetched_at <= ?", args + (fetched_at,)
+        row = db.execute(f"SELECT {', '.join(SCOREBOARD_COLS)} FROM scoreboard WHERE {where} "
+                         "ORDER BY fetched_at DESC, rowid DESC LIMIT 1", args).fetchone()
+        lines = {}
+        for side, name, line in db.execute(f"SELECT side, name, line FROM player_lines WHERE {where} "
+                                           "ORDER BY fetched_at, rowid", args):
+            lines[(side, name)] = line
+        events = []
+        for (record,) in db.execute(f"SELECT record FROM pbp WHERE {where} ORDER BY fetched_at, rowid", args):
+            record = json.loads(record)
+            if 'reset' in record:
+                del events[record['reset']:]
+            else:
+                events.append(record)
+        return {'scoreboard': tuple(row) if row else None, 'lines': lines, 'pbp': events}
+
+    def flush(self):
+        """Block until everything recorded so far is committed"""
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def state_at(self, game_id, fetched_at=None):
+        """{'scoreboard': {...}, 'home_players': [PlayerLine], 'away_players', 'pbp': [events]} at fetched_at"""
+        db = sqlite3.connect(self.path)
+        try:
+            state = self._state(db, str(game_id), fetched_at)
+        finally:
+            db.close()
+        board = state['scoreboard']
+        return {
+            'scoreboard': dict(zip(SCOREBOARD_COLS, board)) if board else {},
+            'home_players': [line_player(name, line) for (side, name), line in state['lines'].items() if side == 'home'],
+            'away_players': [line_player(name, line) for (side, name), line in state['lines'].items() if side == 'away'],
+            'pbp': state['pbp'],
+        }
+
+    def report(self):
+        """'812 cycles, 2210 rows'"""
+        return f"{self.cycles} cycles, {self.rows} rows"
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - Build app data from an aj_* span map
+The Genius Sports pages bind each `aj_*` span id to a field of the live
+data (aj_1_score, aj_1_5_sPoints, aj_1_tot_sAssists, ...), and leaders to
+`id_aj_*` classes. Anything that produces a {span id: value} map - the JSON
+feed, a live page, the HTML - can be turned into the dicts write_csv.py and
+nebl_app_v2.py already use with the functions below (players and totals as
+models.PlayerLine / TeamTotals).
+"""
+
+import re
+import stat_schema
+from models import PlayerLine, TeamTotals
+
+PLAYER_NAME_RE = re.compile(r'^aj_([12])_(\d+)_name$')
+PLAYER_KEY_RE = re.compile(r'^aj_[12]_\d+_')
+
+LEADER_STATS = {
+    'sPoints': 'Points',
+    'sAssists': 'Assists',
+    'sReboundsTotal': 'Total Rebounds',
+    'sSteals': 'Steals',
+}
+
+
+def text(spans, key, default="--"):
+    val = spans.get(key)
+    if val is None or val == "":
+        return default
+    return str(val)
+
+
+def to_int(val):
+    try:
+        return int(val)
+    except (TypeError, ValueError):
+        return 0
+
+
+def player_ids(spans, team_num):
+    """Player numbers of a team, in page/feed order"""
+    pids = []
+    for key in spans:
+        m = PLAYER_NAME_RE.match(key)
+        if m and m.group(1) == str(team_num) and text(spans, key, ""):
+            pids.append(m.group(2))
+    return pids
+
+
+def leaders(spans, team_num, stat):
+    """Top 5 of a team for a stat as [{'name', 'val'}]"""
+    out = []
+    for rank in range(1, 6):
+        name = spans.get(f'id_aj_{team_num}_{stat}_{rank}_name')
+        if name is None:
+            continue
+        out.append({
+            'name': str(name),
+            'val': text(spans, f'id_aj_{team_num}_{stat}_{rank}_tot', ""),
+        })
+    return out
+
+
+# ---- write_csv.py shapes ----
+
+def csv_scoreboard(spans):
+    return {
+        'home': text(spans, 'aj_1_shortName', ""), 'away': text(spans, 'aj_2_shortName', ""),
+        'h_score': text(spans, 'aj_1_score', "0"), 'a_score': text(spans, 'aj_2_score', "0"),
+        'period': text(spans, 'aj_period', ""), 'clock': text(spans, 'aj_clock', ""),
+    }
+
+
+def csv_player(spans, team_num, pid):
+    return PlayerLine.from_fields(stat_schema.map_player(spans, team_num, pid))
+
+
+def csv_players(spans, team_num):
+    players, names = [], set()
+    for pid in player_ids(spans, team_num):
+        p = csv_player(spans, team_num, pid)
+        if p.name not in names:
+            players.append(p)
+            names.add(p.name)
+    return players
+
+
+def csv_team_totals(spans, team_num):
+    return TeamTotals.from_fields(stat_schema.map_totals(spans, team_num))
+
+
+def csv_team_stats(spans):
+    """Team-level spans only (what st.html shows)"""
+    return {k: str(v) for k, v in spans.items()
+            if k.startswith('aj_') and not PLAYER_KEY_RE.match(k) and v not in (None, "")}
+
+
+def csv_data(spans):
+    """Same dict write_csv.py builds from index/bs/lds/st"""
+    data = csv_scoreboard(spans)
+    data['home_players'] = csv_players(spans, 1)
+    data['away_players'] = csv_players(spans, 2)
+    data['home_totals'] = csv_team_totals(spans, 1)
+    data['away_totals'] = csv_team_totals(spans, 2)
+    for side, team_num in [('home', 1), ('away', 2)]:
+        data[f'{side}_pts_leaders'] = leaders(spans, team_num, 'sPoints')
+        data[f'{side}_reb_leaders'] = leaders(spans, team_num, 'sReboundsTotal')
+        data[f'{side}_ast_leaders'] = leaders(spans, team_num, 'sAssists')
+    data['team_stats'] = csv_team_stats(spans)
+    return data
+
+
+# ---- nebl_app_v2.py shapes ----
+
+def app_index(spans):
+    period = spans.get('aj_period')
+    return {
+        'teams': {
+            'home': text(spans, 'aj_1_name', text(spans, 'aj_1_shortName', None)),
+            'away': text(spans, 'aj_2_name', text(spans, 'aj_2_shortName', None)),
+        },
+        'score': {'home': to_int(spans.get('aj_1_score')), 'away': to_int(spans.get('aj_2_score'))},
+        'period': to_int(period) if period not in (None, "") else None,
+        'clock': text(spans, 'aj_clock', None),
+    }
+
+
+def app_boxscore(spans):
+    data = {'home_players': [], 'away_players': [], 'home_totals': {}, 'away_totals': {}}
+    for team_num, key in [(1, 'home_players'), (2, 'away_players')]:
+        for pid in player_ids(spans, team_num):
+            data[key].append(PlayerLine.from_fields(stat_schema.map_player(spans, team_num, pid)))
+    return data
+
+
+def app_csv_boxscore(spans):
+    """parse_csv_boxscore's shape - every named player line, for the Game N.csv export"""
+    box = app_boxscore(spans)
+    return {'home_players': box['home_players'], 'away_players': box['away_players']}
+
+
+def app_periods(spans):
+    data = {'quarters': [], 'totals': {'home': to_int(spans.get('aj_1_score')), 'away': to_int(spans.get('aj_2_score'))}}
+    n = 1
+    while f'aj_1_p{n}_score' in spans or f'aj_2_p{n}_score' in spans:
+        data['quarters'].append({
+            'home': to_int(spans.get(f'aj_1_p{n}_score')),
+            'away': to_int(spans.get(f'aj_2_p{n}_score')),
+        })
+        n += 1
+    return data
+
+
+def app_leaders(spans):
+    """Both teams merged per stat - the 'overall_leaders' format update_ui shows"""
+    overall = {}
+    for stat, label in LEADER_STATS.items():
+        rows = []
+        for team_num, team in [(1, 'home'), (2, 'away')]:
+            for p in leaders(spans, team_num, stat):
+                rows.append({'player': p['name'], 'value': p['val'], 'team': team})
+        rows.sort(key=lambda r: to_int(r['value']), reverse=True)
+        overall[label] = rows[:5]
+    return {'overall_leaders': overall}
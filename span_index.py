@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - Single-pass Span Index
+Walks a Genius Sports page once (with the fastest parser backend
+installed, see html_backend.py) and indexes every span by id and by its
+id_aj_* classes, plus the player rows with their own spans. The parsers
+then answer each scoreboard/player/totals/leaders lookup from dicts
+instead of searching the whole tree per field.
+
+Box score / index pages can be indexed from just the regions the parsers
+read (player tbodies and rows, scoreboard, totals and leader spans): the
+raw HTML is sliced to those fragments first, so no tree is built for the
+rest of the page.
+"""
+
+import re
+import html_backend
+import parse_cache
+from stat_schema import class_value
+
+ROW_ID_RE = re.compile(r'^aj_([12])_(\d+)_row$')
+
+# Where a box score region starts: player tbody, player row outside one,
+# scoreboard / totals span, leader span
+BOX_REGION_RE = re.compile(
+    r'<(tbody)\b[^>]*\bclass="[^"]*(?:person-container|\bbench\b)'
+    r'|<(tr)\b[^>]*\bid="aj_[12]_\d+_row"'
+    r'|<(span)\b[^>]*\b(?:id="aj_(?:[12]_(?:shortName|score|tot_\w+)|period|clock)"|class="[^"]*\bid_aj_)')
+SPAN_TAG_RE = re.compile(r'<span\b|</span>')
+# Table parts only survive parsing inside a table
+WRAP = {'tbody': ('<table>', '</table>'), 'tr': ('<table><tbody>', '</tbody></table>'), 'span': ('', '')}
+
+
+def _region_end(html, start, tag):
+    if tag == 'span':
+        depth = 0
+        for m in SPAN_TAG_RE.finditer(html, start):
+            depth += 1 if m.group() == '<span' else -1
+            if depth == 0:
+                return m.end()
+        return len(html)
+    close = f'</{tag}>'
+    end = html.find(close, start)
+    return len(html) if end < 0 else end + len(close)
+
+
+def box_regions(html):
+    """Only the box score regions of html, in page order, as one small document"""
+    parts = []
+    pos = 0
+    while True:
+        m = BOX_REGION_RE.search(html, pos)
+        if not m:
+            break
+        tag = m.group(1) or m.group(2) or m.group(3)
+        pos = _region_end(html, m.start(), tag)
+        before, after = WRAP[tag]
+        parts.append(before + html[m.start():pos] + after)
+    return ''.join(parts)
+
+
+class Span:
+    """One indexed element: its stripped text (get_text(strip=True)) and classes"""
+
+    def __init__(self, classes):
+        self.classes = classes
+        self.parts = []
+
+    @property
+    def text(self):
+        return ''.join(self.parts)
+
+    def value(self, missing="--"):
+        """Text, else numeric aj_ class value, else missing (write_csv.get_value)"""
+        return self.text or class_value(self.classes) or missing
+
+
+class PlayerRow:
+    """A <tr id="aj_<team>_<pid>_row"> and the spans inside it"""
+
+    def __init__(self, row_id, classes, tbody_classes):
+        self.id = row_id
+        self.classes = classes
+        self.tbody_classes = tbody_classes
+        m = ROW_ID_RE.match(row_id)
+        self.team, self.pid = (m.group(1), m.group(2)) if m else (None, None)
+        self.ids = {}
+        self.spans = []
+
+    def get(self, span_id):
+        return self.ids.get(span_id)
+
+    def find(self, pattern):
+        """First span in the row whose id matches pattern (re.search, like soup.find)"""
+        for span_id, span in self.spans:
+            if pattern.search(span_id):
+                return span
+        return None
+
+    def value(self, span_id, missing="--"):
+        span = self.ids.get(span_id)
+        return span.value(missing) if span else missing
+
+
+class SpanIndex:
+    def __init__(self, html, backend=None, regions=None):
+        self.ids = {}       # span id -> first span with it
+        self.classes = {}   # id_aj_* class -> first span with it
+        self.all = []       # (id, span) for every span with an id, in page order
+        self.rows = []      # player rows in page order
+
+        self._open = []     # spans the walk is inside of
+        self._row = None
+        self._tbody = ()
+        self._stack = []    # what each open element changed, undone on end
+        if regions and isinstance(html, str):
+            html = regions(html)
+        html_backend.walk(html, self._start, self._text, self._end, backend)
+        del self._open, self._row, self._tbody, self._stack
+
+    def _start(self, name, span_id, classes):
+        if name == 'span':
+            span = Span(classes)
+            if span_id:
+                self.all.append((span_id, span))
+                self.ids.setdefault(span_id, span)
+                if self._row is not None:
+                    self._row.spans.append((span_id, span))
+                    self._row.ids.setdefault(span_id, span)
+            for c in classes:
+                if c.startswith('id_aj_'):
+                    self.classes.setdefault(c, span)
+            self._open.append(span)
+            self._stack.append('span')
+        elif name == 'tr' and span_id and ROW_ID_RE.match(span_id):
+            self._stack.append(('tr', self._row))
+            self._row = PlayerRow(span_id, classes, self._tbody)
+            self.rows.append(self._row)
+        elif name == 'tbody':
+            self._stack.append(('tbody', self._tbody))
+            self._tbody = self._tbody + tuple(classes)
+        else:
+            self._stack.append(None)
+
+    def _end(self, name):
+        undo = self._stack.pop()
+        if undo == 'span':
+            self._open.pop()
+        elif undo:
+            kind, previous = undo
+            if kind == 'tr':
+                self._row = previous
+            else:
+                self._tbody = previous
+
+    def _text(self, text):
+        if self._open:
+            text = text.strip()
+            if text:
+                for span in self._open:
+                    span.parts.append(text)
+
+    # ---- lookups ----
+
+    def text(self, span_id, missing=""):
+        span = self.ids.get(span_id)
+        return span.text if span else missing
+
+    def value(self, span_id, missing="--"):
+        """get_value() of the span, or missing if the page has no such span"""
+        span = self.ids.get(span_id)
+        return span.value() if span else missing
+
+    def class_span(self, cls):
+        return self.classes.get(cls)
+
+    def team_rows(self, team_num, containers=None):
+        """Used player rows of a team; with containers, only `tbody.<container> tr.player-row` ones"""
+        prefix = f'aj_{team_num}_'
+        return [r for r in self.rows
+                if r.id.startswith(prefix) and 'row-not-used' not in r.classes
+                and (containers is None or ('player-row' in r.classes
+                                            and any(c in r.tbody_classes for c in containers)))]
+
+    def spans(self):
+        """Flat {span id: value} map - same shape as the feed and live page give span_data"""
+        out = {}
+        for span_id, span in self.ids.items():
+            out[span_id] = span.text or class_value(span.classes) or ""
+        for cls, span in self.classes.items():
+            out.setdefault(cls, span.text or class_value(span.classes) or "")
+        for row in self.rows:
+            prefix = f'aj_{row.team}_{row.pid}_'
+            out[prefix + 'starter'] = '1' if 'p_starter' in row.classes else '0'
+            if 'row-not-used' in row.classes:
+                out[prefix + 'name'] = ''
+        return out
+
+
+def of(page, regions=None):
+    """SpanIndex for html (only its regions, if given), or page itself if it is already one
+
+    Indexes are cached by content, so parsers reading the same page share one walk.
+    """
+    if isinstance(page, SpanIndex):
+        return page
+    if not isinstance(page, str):
+        return SpanIndex(page, regions=regions)
+    kind = f"spans:{regions.__name__}" if regions else "spans"
+    return parse_cache.INDEXES.get(kind, page, lambda html: SpanIndex(html, regions=regions))
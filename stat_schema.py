@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+NEBL Live Stats - Stat Extraction Schema
+One table of which field comes from which aj_* span and how an empty
+span's aj_<value> class is decoded. Compiled once at import into plans
+that every parser (write_csv, nebl_app_v2, update_sheets, local_fetcher,
+span_data) runs, so they all extract the same fields the same way.
+models.py turns the extracted fields into typed PlayerLine / TeamTotals.
+
+Player spans: aj_<team>_<pid>_<field>    Team totals: aj_<team>_tot_<field>
+"""
+
+NUMBER = 'number'   # class fallback only if numeric (12, 24:10, -3)
+LABEL = 'label'     # class fallback: any non-empty aj_ class value
+
+# key -> (span field, decode)
+PLAYER_FIELDS = {
+    'num': ('shirtNumber', LABEL),
+    'name': ('name', LABEL),
+    'pos': ('playingPosition', LABEL),
+    'min': ('sMinutes', NUMBER),
+    'pts': ('sPoints', NUMBER),
+    'fgm': ('sFieldGoalsMade', NUMBER),
+    'fga': ('sFieldGoalsAttempted', NUMBER),
+    'fg_pct': ('sFieldGoalsPercentage', NUMBER),
+    '2pm': ('sTwoPointersMade', NUMBER),
+    '2pa': ('sTwoPointersAttempted', NUMBER),
+    '2p_pct': ('sTwoPointersPercentage', NUMBER),
+    '3pm': ('sThreePointersMade', NUMBER),
+    '3pa': ('sThreePointersAttempted', NUMBER),
+    '3p_pct': ('sThreePointersPercentage', NUMBER),
+    'ftm': ('sFreeThrowsMade', NUMBER),
+    'fta': ('sFreeThrowsAttempted', NUMBER),
+    'ft_pct': ('sFreeThrowsPercentage', NUMBER),
+    'off': ('sReboundsOffensive', NUMBER),
+    'def': ('sReboundsDefensive', NUMBER),
+    'reb': ('sReboundsTotal', NUMBER),
+    'ast': ('sAssists', NUMBER),
+    'stl': ('sSteals', NUMBER),
+    'blk': ('sBlocks', NUMBER),
+    'blkr': ('sBlocksReceived', NUMBER),
+    'to': ('sTurnovers', NUMBER),
+    'pf': ('sFoulsPersonal', NUMBER),
+    'fld_on': ('sFoulsOn', NUMBER),
+    'plus_minus': ('sPlusMinusPoints', NUMBER),
+    'eff': ('eff_1', NUMBER),
+}
+
+# key -> span field (all numeric)
+TEAM_FIELDS = {
+    'fgm': 'sFieldGoalsMade', 'fga': 'sFieldGoalsAttempted', 'fg_pct': 'sFieldGoalsPercentage',
+    '2pm': 'sTwoPointersMade', '2pa': 'sTwoPointersAttempted', '2p_pct': 'sTwoPointersPercentage',
+    '3pm': 'sThreePointersMade', '3pa': 'sThreePointersAttempted', '3p_pct': 'sThreePointersPercentage',
+    'ftm': 'sFreeThrowsMade', 'fta': 'sFreeThrowsAttempted', 'ft_pct': 'sFreeThrowsPercentage',
+    'off': 'sReboundsOffensive', 'def': 'sReboundsDefensive', 'reb': 'sReboundsTotal',
+    'ast': 'sAssists', 'stl': 'sSteals', 'blk': 'sBlocks', 'to': 'sTurnovers',
+    'pf': 'sFoulsPersonal', 'pts': 'sPoints',
+    'pts_turnovers': 'sPointsFromTurnovers', 'pts_paint': 'sPointsInThePaint',
+    'pts_second': 'sPointsSecondChance', 'pts_fast': 'sPointsFastBreak', 'bench_pts': 'sBenchPoints',
+}
+
+# ---- compiled plans: (key, span id suffix, decode) ----
+
+PLAYER_PLAN = tuple((key, '_' + field, kind) for key, (field, kind) in PLAYER_FIELDS.items())
+TEAM_PLAN = tuple((key, '_tot_' + field, NUMBER) for key, field in TEAM_FIELDS.items())
+
+
+def class_value(classes, kind=NUMBER):
+    """Value an empty span keeps in an aj_<value> class"""
+    for c in classes:
+        if isinstance(c, str) and c.startswith('aj_') and len(c) > 3:
+            val = c[3:]
+            if kind == LABEL or val.replace(':', '').replace('-', '').isdigit():
+                return val
+    return None
+
+
+def decode(span, kind=NUMBER):
+    """span_index.Span -> text, else class value, else '' (None if there is no span)"""
+    if span is None:
+        return None
+    return span.text or class_value(span.classes, kind) or ""
+
+
+def run(plan, prefix, lookup):
+    """Run a plan against lookup(span id, decode) -> value or None"""
+    return {key: lookup(prefix + suffix, kind) for key, suffix, kind in plan}
+
+
+def row_player(row):
+    """All player fields of a span_index.PlayerRow (None = span not on the page)"""
+    ids = row.ids
+    player = run(PLAYER_PLAN, f'aj_{row.team}_{row.pid}', lambda sid, kind: decode(ids.get(sid), kind))
+    player['is_starter'] = 'p_starter' in row.classes
+    return player
+
+
+def index_totals(spans, team_num):
+    """Team totals from a span_index.SpanIndex"""
+    ids = spans.ids
+    return run(TEAM_PLAN, f'aj_{team_num}', lambda sid, kind: decode(ids.get(sid), kind))
+
+
+def _flat(spans):
+    def lookup(sid, kind):
+        val = spans.get(sid)
+        return None if val is None else str(val)
+    return lookup
+
+
+def map_player(spans, team_num, pid):
+    """All player fields from a flat {span id: value} map (feed / live page)"""
+    player = run(PLAYER_PLAN, f'aj_{team_num}_{pid}', _flat(spans))
+    player['is_starter'] = str(spans.get(f'aj_{team_num}_{pid}_starter', '')) in ('1', 'True', 'true')
+    return player
+
+
+def map_totals(spans, team_num):
+    return run(TEAM_PLAN, f'aj_{team_num}', _flat(spans))
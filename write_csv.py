@@ -3,51 +3,50 @@ import csv
 import sys
 import os
 import time
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
+from http_fetch import get_fetcher
+from feed import FeedClient, spans_from_feed
+import span_data
+import span_index
+import stat_schema
+from models import PlayerLine, TeamTotals
+try:
+    import advanced_stats
+except ImportError:
+    # NumPy not installed - Game N.csv skips the computed sections
+    advanced_stats = None
+import parse_cache
+import atomic_file
+from atomic_file import OutputFile
+from output_pipeline import OutputPipeline
+from parse_pool import get_pool as get_parse_pool
+from page_tracker import PageTracker
+from poll_scheduler import PollScheduler
+from snapshot import CycleSnapshot
+from live_page import LivePage
 
-if len(sys.argv) > 1:
-    GAME_URL = sys.argv[1]
+# --feed: read the live JSON feed instead of rendering pages
+FEED_MODE = '--feed' in sys.argv
+# --live: keep bs.html open and take span changes as they happen
+LIVE_MODE = '--live' in sys.argv
+ARGS = [a for a in sys.argv[1:] if a not in ('--feed', '--live')]
+
+if len(ARGS) > 0:
+    GAME_URL = ARGS[0]
 else:
     GAME_URL = ""
 
 GAME_NUM = "1"
 
 def fetch(url, retries=3):
-    for attempt in range(retries):
-        try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                context = browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                    viewport={"width": 1920, "height": 1080}
-                )
-                page = context.new_page()
-                
-                page.goto(url, wait_until="domcontentloaded", timeout=60000)
-                
-                try:
-                    page.wait_for_selector('#aj_1_score', timeout=30000)
-                except:
-                    pass
-                
-                try:
-                    page.wait_for_selector('.team-0-person-container', timeout=30000)
-                except:
-                    pass
-                
-                page.wait_for_timeout(3000)
-                
-                html = page.content()
-                browser.close()
-            return html
-        except Exception as e:
-            print(f"Attempt {attempt+1} failed: {e}")
-            if attempt < retries - 1:
-                time.sleep(2)
-            else:
-                raise
-    return ""
+    return get_fetcher().fetch(url, retries=retries, timeout=60000)
+
+def fetch_all(urls, tracker=None, retries=3):
+    """Fetch a {name: url} dict concurrently - one combined snapshot per cycle
+
+    Plain HTTP where the HTML has the data, the browser otherwise. With a
+    tracker, pages unchanged since the last fetch come back as None.
+    """
+    return get_fetcher().fetch_many(urls, tracker, retries=retries, timeout=60000)
 
 def get_value(elem):
     if not elem:
@@ -64,258 +63,105 @@ def get_value(elem):
     return "--"
 
 def parse_index_html(html):
-    soup = BeautifulSoup(html, 'html.parser')
-    
-    home = soup.find('span', id='aj_1_shortName')
-    away = soup.find('span', id='aj_2_shortName')
-    h_score = soup.find('span', id='aj_1_score')
-    a_score = soup.find('span', id='aj_2_score')
-    period = soup.find('span', id='aj_period')
-    clock = soup.find('span', id='aj_clock')
-    
-    home_team = home.get_text(strip=True) if home else ""
-    away_team = away.get_text(strip=True) if away else ""
-    home_score = get_value(h_score) if h_score else "0"
-    away_score = get_value(a_score) if a_score else "0"
-    game_period = get_value(period) if period else ""
-    game_clock = get_value(clock) if clock else ""
+    spans = span_index.of(html, span_index.box_regions)
     
     return {
-        'home': home_team, 'away': away_team,
-        'h_score': home_score, 'a_score': away_score,
-        'period': game_period, 'clock': game_clock,
+        'home': spans.text('aj_1_shortName'), 'away': spans.text('aj_2_shortName'),
+        'h_score': spans.value('aj_1_score', "0"), 'a_score': spans.value('aj_2_score', "0"),
+        'period': spans.value('aj_period', ""), 'clock': spans.value('aj_clock', ""),
     }
 
+def get_leaders(spans, prefix, stat):
+    leaders = []
+    for rank in range(1, 6):
+        name_elem = spans.class_span(f'id_{prefix}_{stat}_{rank}_name')
+        tot_elem = spans.class_span(f'id_{prefix}_{stat}_{rank}_tot')
+        if name_elem:
+            leaders.append({
+                'name': name_elem.text,
+                'val': tot_elem.value() if tot_elem else ""
+            })
+    return leaders
+
 def parse_lds_html(html):
-    soup = BeautifulSoup(html, 'html.parser')
-    
-    def get_leaders(prefix, stat):
-        leaders = []
-        for rank in range(1, 6):
-            name_elem = soup.find('span', class_=f'id_{prefix}_{stat}_{rank}_name')
-            tot_elem = soup.find('span', class_=f'id_{prefix}_{stat}_{rank}_tot')
-            if name_elem:
-                leaders.append({
-                    'name': name_elem.get_text(strip=True),
-                    'val': get_value(tot_elem) if tot_elem else ""
-                })
-        return leaders
+    spans = span_index.of(html)
     
     return {
-        'home_pts_leaders': get_leaders('aj_1', 'sPoints'),
-        'away_pts_leaders': get_leaders('aj_2', 'sPoints'),
-        'home_reb_leaders': get_leaders('aj_1', 'sReboundsTotal'),
-        'away_reb_leaders': get_leaders('aj_2', 'sReboundsTotal'),
-        'home_ast_leaders': get_leaders('aj_1', 'sAssists'),
-        'away_ast_leaders': get_leaders('aj_2', 'sAssists'),
+        'home_pts_leaders': get_leaders(spans, 'aj_1', 'sPoints'),
+        'away_pts_leaders': get_leaders(spans, 'aj_2', 'sPoints'),
+        'home_reb_leaders': get_leaders(spans, 'aj_1', 'sReboundsTotal'),
+        'away_reb_leaders': get_leaders(spans, 'aj_2', 'sReboundsTotal'),
+        'home_ast_leaders': get_leaders(spans, 'aj_1', 'sAssists'),
+        'away_ast_leaders': get_leaders(spans, 'aj_2', 'sAssists'),
     }
 
 def parse_st_html(html):
-    soup = BeautifulSoup(html, 'html.parser')
+    spans = span_index.of(html)
     all_data = {}
     
-    for span in soup.find_all('span'):
-        sid = span.get('id', '') or ''
+    for sid, span in spans.all:
         if sid.startswith('aj_') or sid.startswith('id_aj_'):
-            val = get_value(span)
-            if val:
-                all_data[sid] = val
+            all_data[sid] = span.value()
     
     return all_data
 
-def parse_index_players(html):
-    soup = BeautifulSoup(html, 'html.parser')
-    
-    home_players = []
-    away_players = []
-    home_names = set()
-    away_names = set()
-    
-    def get_player_data(row, team_num):
-        row_id = row.get('id', '')
-        pid_match = re.search(rf'aj_{team_num}_(\d+)_row', row_id)
-        if not pid_match:
-            return None
-        pid = pid_match.group(1)
-        
-        name_elem = row.find('span', id=f'aj_{team_num}_{pid}_name')
-        if not name_elem:
-            return None
-        
-        name = name_elem.get_text(strip=True)
-        if not name:
-            return None
-        
-        return {
-            'num': get_value(row.find('span', id=f'aj_{team_num}_{pid}_shirtNumber')),
-            'name': name,
-            'mins': get_value(row.find('span', id=f'aj_{team_num}_{pid}_sMinutes')),
-            'pts': get_value(row.find('span', id=f'aj_{team_num}_{pid}_sPoints')),
-            'reb': get_value(row.find('span', id=f'aj_{team_num}_{pid}_sReboundsTotal')),
-            'ast': get_value(row.find('span', id=f'aj_{team_num}_{pid}_sAssists')),
-            'stl': '',
-            'blk': '',
-            'to': '',
-            'pf': get_value(row.find('span', id=f'aj_{team_num}_{pid}_sFoulsPersonal')),
-        }
-    
-    for row in soup.select('tbody.team-0-person-container tr.player-row'):
-        if 'row-not-used' in (row.get('class') or []):
+def team_players(spans, container, team_num, full=True):
+    """PlayerLines of one team's rows, first row per name wins"""
+    players, names = [], set()
+    for row in spans.team_rows(team_num, (container,)):
+        player = PlayerLine.from_fields(stat_schema.row_player(row))
+        if not player.name or player.name in names:
             continue
-        p = get_player_data(row, 1)
-        if p and p['name'] not in home_names:
-            home_players.append(p)
-            home_names.add(p['name'])
-    
-    for row in soup.select('tbody.team-1-person-container tr.player-row'):
-        if 'row-not-used' in (row.get('class') or []):
-            continue
-        p = get_player_data(row, 2)
-        if p and p['name'] not in away_names:
-            away_players.append(p)
-            away_names.add(p['name'])
-    
-    return {'home': home_players, 'away': away_players}
+        if not full:
+            # index.html has no steals/blocks/turnovers columns
+            player.blank(('stl', 'blk', 'to'))
+        players.append(player)
+        names.add(player.name)
+    return players
+
+def parse_index_players(html):
+    spans = span_index.of(html, span_index.box_regions)
+    return {
+        'home': team_players(spans, 'team-0-person-container', 1, full=False),
+        'away': team_players(spans, 'team-1-person-container', 2, full=False),
+    }
 
 def parse_bs_html(html):
-    soup = BeautifulSoup(html, 'html.parser')
-    
-    home = soup.find('span', id='aj_1_shortName')
-    away = soup.find('span', id='aj_2_shortName')
-    h_score = soup.find('span', id='aj_1_score')
-    a_score = soup.find('span', id='aj_2_score')
-    period = soup.find('span', id='aj_period')
-    clock = soup.find('span', id='aj_clock')
+    spans = span_index.of(html, span_index.box_regions)
+    data = parse_index_html(spans)
     
-    home_team = home.get_text(strip=True) if home else ""
-    away_team = away.get_text(strip=True) if away else ""
-    home_score = get_value(h_score) if h_score else "0"
-    away_score = get_value(a_score) if a_score else "0"
-    game_period = get_value(period) if period else ""
-    game_clock = get_value(clock) if clock else ""
-    
-    def get_player_data(row, team_num):
-        row_id = row.get('id', '')
-        pid_match = re.search(rf'aj_{team_num}_(\d+)_row', row_id)
-        if not pid_match:
-            return None
-        pid = pid_match.group(1)
-        
-        name_elem = row.find('span', id=f'aj_{team_num}_{pid}_name')
-        if not name_elem:
-            return None
-        
-        name = name_elem.get_text(strip=True)
-        if not name:
-            return None
-        
-        return {
-            'num': get_value(row.find('span', id=f'aj_{team_num}_{pid}_shirtNumber')),
-            'name': name,
-            'mins': get_value(row.find('span', id=f'aj_{team_num}_{pid}_sMinutes')),
-            'pts': get_value(row.find('span', id=f'aj_{team_num}_{pid}_sPoints')),
-            'reb': get_value(row.find('span', id=f'aj_{team_num}_{pid}_sReboundsTotal')),
-            'ast': get_value(row.find('span', id=f'aj_{team_num}_{pid}_sAssists')),
-            'stl': get_value(row.find('span', id=f'aj_{team_num}_{pid}_sSteals')),
-            'blk': get_value(row.find('span', id=f'aj_{team_num}_{pid}_sBlocks')),
-            'to': get_value(row.find('span', id=f'aj_{team_num}_{pid}_sTurnovers')),
-            'pf': get_value(row.find('span', id=f'aj_{team_num}_{pid}_sFoulsPersonal')),
-            'eff': get_value(row.find('span', id=f'aj_{team_num}_{pid}_eff_1')),
-            'is_starter': 'p_starter' in (row.get('class') or [])
-        }
-    
-    home_players, away_players = [], []
-    home_names = set()
-    away_names = set()
-    
-    # Get all players from team-0-person-container
-    for row in soup.select('tbody.team-0-person-container tr.player-row'):
-        classes = row.get('class') or []
-        if 'row-not-used' in classes:
-            continue
-        p = get_player_data(row, 1)
-        if p and p['name'] not in home_names:
-            home_players.append(p)
-            home_names.add(p['name'])
-    
-    # Get all players from team-1-person-container
-    for row in soup.select('tbody.team-1-person-container tr.player-row'):
-        classes = row.get('class') or []
-        if 'row-not-used' in classes:
-            continue
-        p = get_player_data(row, 2)
-        if p and p['name'] not in away_names:
-            away_players.append(p)
-            away_names.add(p['name'])
+    home_players = team_players(spans, 'team-0-person-container', 1)
+    away_players = team_players(spans, 'team-1-person-container', 2)
     
     print(f"Debug - Home players: {len(home_players)}, Away players: {len(away_players)}")
     
-    def get_team_totals(team_num):
-        return {
-            'fg_m': get_value(soup.find('span', id=f'aj_{team_num}_tot_sFieldGoalsMade')),
-            'fg_a': get_value(soup.find('span', id=f'aj_{team_num}_tot_sFieldGoalsAttempted')),
-            'fg_pct': get_value(soup.find('span', id=f'aj_{team_num}_tot_sFieldGoalsPercentage')),
-            'two_p_m': get_value(soup.find('span', id=f'aj_{team_num}_tot_sTwoPointersMade')),
-            'two_p_a': get_value(soup.find('span', id=f'aj_{team_num}_tot_sTwoPointersAttempted')),
-            'two_p_pct': get_value(soup.find('span', id=f'aj_{team_num}_tot_sTwoPointersPercentage')),
-            'three_p_m': get_value(soup.find('span', id=f'aj_{team_num}_tot_sThreePointersMade')),
-            'three_p_a': get_value(soup.find('span', id=f'aj_{team_num}_tot_sThreePointersAttempted')),
-            'three_p_pct': get_value(soup.find('span', id=f'aj_{team_num}_tot_sThreePointersPercentage')),
-            'ft_m': get_value(soup.find('span', id=f'aj_{team_num}_tot_sFreeThrowsMade')),
-            'ft_a': get_value(soup.find('span', id=f'aj_{team_num}_tot_sFreeThrowsAttempted')),
-            'ft_pct': get_value(soup.find('span', id=f'aj_{team_num}_tot_sFreeThrowsPercentage')),
-            'reb': get_value(soup.find('span', id=f'aj_{team_num}_tot_sReboundsTotal')),
-            'ast': get_value(soup.find('span', id=f'aj_{team_num}_tot_sAssists')),
-            'stl': get_value(soup.find('span', id=f'aj_{team_num}_tot_sSteals')),
-            'blk': get_value(soup.find('span', id=f'aj_{team_num}_tot_sBlocks')),
-            'to': get_value(soup.find('span', id=f'aj_{team_num}_tot_sTurnovers')),
-            'pf': get_value(soup.find('span', id=f'aj_{team_num}_tot_sFoulsPersonal')),
-            'pts': get_value(soup.find('span', id=f'aj_{team_num}_tot_sPoints')),
-            'pts_turnovers': get_value(soup.find('span', id=f'aj_{team_num}_tot_sPointsFromTurnovers')),
-            'pts_paint': get_value(soup.find('span', id=f'aj_{team_num}_tot_sPointsInThePaint')),
-            'pts_second': get_value(soup.find('span', id=f'aj_{team_num}_tot_sPointsSecondChance')),
-            'pts_fast': get_value(soup.find('span', id=f'aj_{team_num}_tot_sPointsFastBreak')),
-            'bench_pts': get_value(soup.find('span', id=f'aj_{team_num}_tot_sBenchPoints')),
-        }
-    
-    home_totals = get_team_totals(1)
-    away_totals = get_team_totals(2)
-    
-    def get_leaders(prefix, stat):
-        leaders = []
-        for rank in range(1, 6):
-            name_elem = soup.find('span', class_=f'id_{prefix}_{stat}_{rank}_name')
-            tot_elem = soup.find('span', class_=f'id_{prefix}_{stat}_{rank}_tot')
-            if name_elem:
-                leaders.append({
-                    'name': name_elem.get_text(strip=True),
-                    'val': get_value(tot_elem) if tot_elem else ""
-                })
-        return leaders
-    
-    home_pts_leaders = get_leaders('aj_1', 'sPoints')
-    away_pts_leaders = get_leaders('aj_2', 'sPoints')
-    home_reb_leaders = get_leaders('aj_1', 'sReboundsTotal')
-    away_reb_leaders = get_leaders('aj_2', 'sReboundsTotal')
-    home_ast_leaders = get_leaders('aj_1', 'sAssists')
-    away_ast_leaders = get_leaders('aj_2', 'sAssists')
-    
-    return {
-        'home': home_team, 'away': away_team,
-        'h_score': home_score, 'a_score': away_score,
-        'period': game_period, 'clock': game_clock,
+    data.update({
         'home_players': home_players, 'away_players': away_players,
-        'home_totals': home_totals, 'away_totals': away_totals,
-        'home_pts_leaders': home_pts_leaders, 'away_pts_leaders': away_pts_leaders,
-        'home_reb_leaders': home_reb_leaders, 'away_reb_leaders': away_reb_leaders,
-        'home_ast_leaders': home_ast_leaders, 'away_ast_leaders': away_ast_leaders,
-    }
+        'home_totals': TeamTotals.from_fields(stat_schema.index_totals(spans, 1)),
+        'away_totals': TeamTotals.from_fields(stat_schema.index_totals(spans, 2)),
+    })
+    data.update(parse_lds_html(spans))
+    return data
+
+BOX_KEYS = ('num', 'name', 'min', 'pts', 'reb', 'ast', 'stl', 'blk', 'to', 'pf')
+TOTAL_KEYS = ('pts', 'reb', 'ast', 'stl', 'blk', 'to', 'pf', 'pts_paint', 'pts_second', 'bench_pts')
+
+def player_row(p):
+    """Box score columns of a PlayerLine as text"""
+    return [p.text(key) for key in BOX_KEYS]
+
+def totals(data, side):
+    return data.get(f'{side}_totals') or TeamTotals()
+
+def report_write(out):
+    print(f"Written {out.path}" if out.changed else f"Unchanged {out.path}")
 
 def write_csv(data, game_num):
     os.makedirs("Game CSV", exist_ok=True)
     filename = f"Game CSV/Game {game_num}.csv"
     
-    with open(filename, 'w', newline='', encoding='utf-8') as f:
+    out = OutputFile(filename, newline='')
+    with out as f:
         writer = csv.writer(f)
         
         writer.writerow(['NEBL LIVE STATS - GAME ' + game_num])
@@ -331,14 +177,14 @@ def write_csv(data, game_num):
         writer.writerow(['#', 'Name', 'MIN', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TO', 'PF'])
         
         for p in data['home_players']:
-            writer.writerow([p['num'], p['name'], p['mins'], p['pts'], p['reb'], p['ast'], p['stl'], p['blk'], p['to'], p['pf']])
+            writer.writerow(player_row(p))
         
         writer.writerow([])
         writer.writerow([data['away'], 'BOX SCORE'])
         writer.writerow(['#', 'Name', 'MIN', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TO', 'PF'])
         
         for p in data['away_players']:
-            writer.writerow([p['num'], p['name'], p['mins'], p['pts'], p['reb'], p['ast'], p['stl'], p['blk'], p['to'], p['pf']])
+            writer.writerow(player_row(p))
         
         writer.writerow([])
         writer.writerow(['SCOREBOARD'])
@@ -389,45 +235,74 @@ def write_csv(data, game_num):
         writer.writerow([])
         writer.writerow(['TEAM TOTALS'])
         writer.writerow(['Team', 'Points', 'REB', 'AST', 'STL', 'BLK', 'TO', 'PF', 'PIP*', '2CP*', 'BP*'])
-        writer.writerow([data['home'], data.get('home_totals', {}).get('pts', ''), data.get('home_totals', {}).get('reb', ''), data.get('home_totals', {}).get('ast', ''), data.get('home_totals', {}).get('stl', ''), data.get('home_totals', {}).get('blk', ''), data.get('home_totals', {}).get('to', ''), data.get('home_totals', {}).get('pf', ''), data.get('home_totals', {}).get('pts_paint', ''), data.get('home_totals', {}).get('pts_second', ''), data.get('home_totals', {}).get('bench_pts', '')])
-        writer.writerow([data['away'], data.get('away_totals', {}).get('pts', ''), data.get('away_totals', {}).get('reb', ''), data.get('away_totals', {}).get('ast', ''), data.get('away_totals', {}).get('stl', ''), data.get('away_totals', {}).get('blk', ''), data.get('away_totals', {}).get('to', ''), data.get('away_totals', {}).get('pf', ''), data.get('away_totals', {}).get('pts_paint', ''), data.get('away_totals', {}).get('pts_second', ''), data.get('away_totals', {}).get('bench_pts', '')])
+        writer.writerow([data['home']] + [totals(data, 'home').text(key) for key in TOTAL_KEYS])
+        writer.writerow([data['away']] + [totals(data, 'away').text(key) for key in TOTAL_KEYS])
         
         # Advanced stats from bs.html
         writer.writerow([])
         writer.writerow(['ADVANCED STATS'])
         writer.writerow(['Team', 'Player', 'FG', 'FG%', '3PT', '3PT%', 'FT', 'FT%', '+/-', 'EFF'])
         
-        for p in data.get('home_players', []):
-            writer.writerow([data['home'], p.get('name', ''), f"{p.get('fg_m', '')}/{p.get('fg_a', '')}", p.get('fg_pct', ''), f"{p.get('three_p_m', '')}/{p.get('three_p_a', '')}", p.get('three_p_pct', ''), f"{p.get('ft_m', '')}/{p.get('ft_a', '')}", p.get('ft_pct', ''), p.get('plus_minus', ''), p.get('eff', '')])
-        
-        for p in data.get('away_players', []):
-            writer.writerow([data['away'], p.get('name', ''), f"{p.get('fg_m', '')}/{p.get('fg_a', '')}", p.get('fg_pct', ''), f"{p.get('three_p_m', '')}/{p.get('three_p_a', '')}", p.get('three_p_pct', ''), f"{p.get('ft_m', '')}/{p.get('ft_a', '')}", p.get('ft_pct', ''), p.get('plus_minus', ''), p.get('eff', '')])
+        for side in ('home', 'away'):
+            for p in data.get(f'{side}_players', []):
+                writer.writerow([data[side], p.name, f"{p.text('fgm')}/{p.text('fga')}", p.text('fg_pct'), f"{p.text('3pm')}/{p.text('3pa')}", p.text('3p_pct'), f"{p.text('ftm')}/{p.text('fta')}", p.text('ft_pct'), p.text('plus_minus'), p.text('eff')])
         
         # Four Factors from st.html
         writer.writerow([])
         writer.writerow(['FOUR FACTORS'])
         writer.writerow(['Metric', data['home'], data['away']])
         
-        ht = data.get('home_totals', {})
-        at = data.get('away_totals', {})
+        ht = totals(data, 'home')
+        at = totals(data, 'away')
+        
+        writer.writerow(['Field Goal %', f"{ht.text('fg_pct')}%", f"{at.text('fg_pct')}%"])
+        writer.writerow(['2-Point %', f"{ht.text('2p_pct')}%", f"{at.text('2p_pct')}%"])
+        writer.writerow(['3-Point %', f"{ht.text('3p_pct')}%", f"{at.text('3p_pct')}%"])
+        writer.writerow(['Free Throw %', f"{ht.text('ft_pct')}%", f"{at.text('ft_pct')}%"])
+        writer.writerow(['Points in Paint', ht.text('pts_paint'), at.text('pts_paint')])
+        writer.writerow(['Points from TO', ht.text('pts_turnovers'), at.text('pts_turnovers')])
+        writer.writerow(['2nd Chance Points', ht.text('pts_second'), at.text('pts_second')])
+        writer.writerow(['Fast Break Points', ht.text('pts_fast'), at.text('pts_fast')])
+        writer.writerow(['Bench Points', ht.text('bench_pts'), at.text('bench_pts')])
         
-        writer.writerow(['Field Goal %', f"{ht.get('fg_pct', '')}%", f"{at.get('fg_pct', '')}%"])
-        writer.writerow(['2-Point %', f"{ht.get('two_p_pct', '')}%", f"{at.get('two_p_pct', '')}%"])
-        writer.writerow(['3-Point %', f"{ht.get('three_p_pct', '')}%", f"{at.get('three_p_pct', '')}%"])
-        writer.writerow(['Free Throw %', f"{ht.get('ft_pct', '')}%", f"{at.get('ft_pct', '')}%"])
-        writer.writerow(['Points in Paint', ht.get('pts_paint', ''), at.get('pts_paint', '')])
-        writer.writerow(['Points from TO', ht.get('pts_turnovers', ''), at.get('pts_turnovers', '')])
-        writer.writerow(['2nd Chance Points', ht.get('pts_second', ''), at.get('pts_second', '')])
-        writer.writerow(['Fast Break Points', ht.get('pts_fast', ''), at.get('pts_fast', '')])
-        writer.writerow(['Bench Points', ht.get('bench_pts', ''), at.get('bench_pts', '')])
+        if advanced_stats:
+            write_advanced(writer, data)
     
-    print(f"Written {filename}")
+    report_write(out)
+
+def write_advanced(writer, data):
+    """Computed (not scraped) four factors, ratings and player efficiency"""
+    adv = advanced_stats.game(data)
+    fmt = advanced_stats.fmt
+    h, a = adv['home'], adv['away']
+    
+    writer.writerow([])
+    writer.writerow(['TRUE FOUR FACTORS'])
+    writer.writerow(['Metric', data['home'], data['away']])
+    writer.writerow(['eFG%', fmt(h['efg_pct']), fmt(a['efg_pct'])])
+    writer.writerow(['TOV%', fmt(h['tov_pct']), fmt(a['tov_pct'])])
+    writer.writerow(['ORB%', fmt(h['orb_pct']), fmt(a['orb_pct'])])
+    writer.writerow(['FT Rate', fmt(h['ft_rate'], 3), fmt(a['ft_rate'], 3)])
+    writer.writerow(['TS%', fmt(h['ts_pct']), fmt(a['ts_pct'])])
+    writer.writerow(['Possessions', fmt(h['poss']), fmt(a['poss'])])
+    writer.writerow(['Pace', fmt(h['pace']), fmt(a['pace'])])
+    writer.writerow(['Off Rating', fmt(h['ortg']), fmt(a['ortg'])])
+    writer.writerow(['Def Rating', fmt(h['drtg']), fmt(a['drtg'])])
+    
+    writer.writerow([])
+    writer.writerow(['PLAYER EFFICIENCY'])
+    writer.writerow(['Team', 'Player', 'eFG%', 'TS%', 'USG%'])
+    for side in ('home', 'away'):
+        stats = adv[f'{side}_players']
+        for i, p in enumerate(data.get(f'{side}_players', [])):
+            writer.writerow([data[side], p.name, fmt(stats['efg_pct'][i]), fmt(stats['ts_pct'][i]), fmt(stats['usg_pct'][i])])
 
 def write_text(data, game_num):
     os.makedirs("Game CSV", exist_ok=True)
     filename = f"Game CSV/Game {game_num}.txt"
     
-    with open(filename, 'w', encoding='utf-8') as f:
+    out = OutputFile(filename)
+    with out as f:
         f.write(f"NEBL LIVE STATS - GAME {game_num}\n")
         f.write("=" * 50 + "\n\n")
         f.write(f"SCOREBOARD\n")
@@ -439,13 +314,13 @@ def write_text(data, game_num):
         f.write("-" * 30 + "\n")
         f.write(f"{'#':<4} {'Name':<20} {'MIN':<6} {'PTS':<5} {'REB':<5} {'AST':<5} {'STL':<5} {'BLK':<5} {'TO':<5} {'PF':<5}\n")
         for p in data['home_players']:
-            f.write(f"{p['num']:<4} {p['name']:<20} {p['mins']:<6} {p['pts']:<5} {p['reb']:<5} {p['ast']:<5} {p['stl']:<5} {p['blk']:<5} {p['to']:<5} {p['pf']:<5}\n")
+            f.write(("{:<4} {:<20} {:<6}" + " {:<5}" * 7 + "\n").format(*player_row(p)))
         
         f.write(f"\n{data['away']} - BOX SCORE\n")
         f.write("-" * 30 + "\n")
         f.write(f"{'#':<4} {'Name':<20} {'MIN':<6} {'PTS':<5} {'REB':<5} {'AST':<5} {'STL':<5} {'BLK':<5} {'TO':<5} {'PF':<5}\n")
         for p in data['away_players']:
-            f.write(f"{p['num']:<4} {p['name']:<20} {p['mins']:<6} {p['pts']:<5} {p['reb']:<5} {p['ast']:<5} {p['stl']:<5} {p['blk']:<5} {p['to']:<5} {p['pf']:<5}\n")
+            f.write(("{:<4} {:<20} {:<6}" + " {:<5}" * 7 + "\n").format(*player_row(p)))
         
         # Team Stats
         f.write(f"\nTEAM STATS\n")
@@ -456,16 +331,18 @@ def write_text(data, game_num):
         
         # Team Totals
         f.write(f"\nTEAM TOTALS\n")
-        f.write(f"{data['home']}: Pts={data.get('home_totals', {}).get('pts', '')} REB={data.get('home_totals', {}).get('reb', '')} AST={data.get('home_totals', {}).get('ast', '')} STL={data.get('home_totals', {}).get('stl', '')} BLK={data.get('home_totals', {}).get('blk', '')} TO={data.get('home_totals', {}).get('to', '')} PF={data.get('home_totals', {}).get('pf', '')} PIP={data.get('home_totals', {}).get('pts_paint', '')} 2CP={data.get('home_totals', {}).get('pts_second', '')} BP={data.get('home_totals', {}).get('bench_pts', '')}\n")
-        f.write(f"{data['away']}: Pts={data.get('away_totals', {}).get('pts', '')} REB={data.get('away_totals', {}).get('reb', '')} AST={data.get('away_totals', {}).get('ast', '')} STL={data.get('away_totals', {}).get('stl', '')} BLK={data.get('away_totals', {}).get('blk', '')} TO={data.get('away_totals', {}).get('to', '')} PF={data.get('away_totals', {}).get('pf', '')} PIP={data.get('away_totals', {}).get('pts_paint', '')} 2CP={data.get('away_totals', {}).get('pts_second', '')} BP={data.get('away_totals', {}).get('bench_pts', '')}\n")
+        for side in ('home', 'away'):
+            t = totals(data, side)
+            f.write(f"{data[side]}: Pts={t.text('pts')} REB={t.text('reb')} AST={t.text('ast')} STL={t.text('stl')} BLK={t.text('blk')} TO={t.text('to')} PF={t.text('pf')} PIP={t.text('pts_paint')} 2CP={t.text('pts_second')} BP={t.text('bench_pts')}\n")
     
-    print(f"Written {filename}")
+    report_write(out)
 
 def write_xml(data, game_num):
     os.makedirs("Game CSV", exist_ok=True)
     filename = f"Game CSV/Game {game_num}.xml"
     
-    with open(filename, 'w', encoding='utf-8') as f:
+    out = OutputFile(filename)
+    with out as f:
         f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
         f.write(f"<game number='{game_num}'>\n")
         
@@ -478,26 +355,137 @@ def write_xml(data, game_num):
         
         f.write(f"  <home_team name='{data['home']}'>\n")
         for p in data['home_players']:
-            f.write(f"    <player number='{p['num']}' name='{p['name']}' min='{p['mins']}' pts='{p['pts']}' reb='{p['reb']}' ast='{p['ast']}' stl='{p['stl']}' blk='{p['blk']}' to='{p['to']}' pf='{p['pf']}'/>\n")
+            f.write("    <player number='{}' name='{}' min='{}' pts='{}' reb='{}' ast='{}' stl='{}' blk='{}' to='{}' pf='{}'/>\n".format(*player_row(p)))
         f.write("  </home_team>\n")
         
         f.write(f"  <away_team name='{data['away']}'>\n")
         for p in data['away_players']:
-            f.write(f"    <player number='{p['num']}' name='{p['name']}' min='{p['mins']}' pts='{p['pts']}' reb='{p['reb']}' ast='{p['ast']}' stl='{p['stl']}' blk='{p['blk']}' to='{p['to']}' pf='{p['pf']}'/>\n")
+            f.write("    <player number='{}' name='{}' min='{}' pts='{}' reb='{}' ast='{}' stl='{}' blk='{}' to='{}' pf='{}'/>\n".format(*player_row(p)))
         f.write("  </away_team>\n")
         
         f.write("  <team_totals>\n")
-        f.write(f"    <team name='{data['home']}' pts='{data.get('home_totals', {}).get('pts', '')}' reb='{data.get('home_totals', {}).get('reb', '')}' ast='{data.get('home_totals', {}).get('ast', '')}' stl='{data.get('home_totals', {}).get('stl', '')}' blk='{data.get('home_totals', {}).get('blk', '')}' to='{data.get('home_totals', {}).get('to', '')}' pf='{data.get('home_totals', {}).get('pf', '')}' pip='{data.get('home_totals', {}).get('pts_paint', '')}' tcp='{data.get('home_totals', {}).get('pts_second', '')}' bp='{data.get('home_totals', {}).get('bench_pts', '')}'/>\n")
-        f.write(f"    <team name='{data['away']}' pts='{data.get('away_totals', {}).get('pts', '')}' reb='{data.get('away_totals', {}).get('reb', '')}' ast='{data.get('away_totals', {}).get('ast', '')}' stl='{data.get('away_totals', {}).get('stl', '')}' blk='{data.get('away_totals', {}).get('blk', '')}' to='{data.get('away_totals', {}).get('to', '')}' pf='{data.get('away_totals', {}).get('pf', '')}' pip='{data.get('away_totals', {}).get('pts_paint', '')}' tcp='{data.get('away_totals', {}).get('pts_second', '')}' bp='{data.get('away_totals', {}).get('bench_pts', '')}'/>\n")
+        for side in ('home', 'away'):
+            f.write("    <team name='{}' pts='{}' reb='{}' ast='{}' stl='{}' blk='{}' to='{}' pf='{}' pip='{}' tcp='{}' bp='{}'/>\n".format(
+                data[side], *[totals(data, side).text(key) for key in TOTAL_KEYS]))
         f.write("  </team_totals>\n")
         
         f.write("</game>\n")
     
-    print(f"Written {filename}")
+    report_write(out)
+
+def make_outputs(game_num):
+    """CSV, TXT and XML writers, each on its own worker off the poll loop"""
+    return OutputPipeline({
+        'csv': lambda data: write_csv(data, game_num),
+        'txt': lambda data: write_text(data, game_num),
+        'xml': lambda data: write_xml(data, game_num),
+    })
+
+# Seconds between fetches of each page while the clock is running
+PAGE_CADENCES = {
+    'index': 1,     # scoreboard
+    'bs': 5,
+    'lds': 30,
+    'st': 30,
+}
+
+def parse_index_page(html):
+    """Scoreboard and players from one walk of index.html"""
+    spans = span_index.of(html, span_index.box_regions)
+    return {'scoreboard': parse_index_html(spans), 'players': parse_index_players(spans)}
+
+PAGE_PARSERS = {
+    'index': parse_index_page,
+    'bs': parse_bs_html,
+    'lds': parse_lds_html,
+    'st': parse_st_html,
+}
+
+def refresh_snapshot(snapshot, htmls):
+    """Put only pages whose content changed into the snapshot - returns their names"""
+    for name, html in htmls.items():
+        if html or not snapshot.has(name):
+            snapshot.update(name, html or "")
+    return snapshot.changed
+
+def combine_snapshot(snapshot):
+    """Merge the snapshot's pages into the dict the writers take - each page parsed once"""
+    # Changed pages are parsed side by side on the parse pool's worker processes
+    snapshot.parse_many({name: [(name, parser)] for name, parser in PAGE_PARSERS.items()}, get_parse_pool())
+    bs_data = snapshot.parse('bs', PAGE_PARSERS['bs'], key='bs')
+    index_data = snapshot.parse('index', PAGE_PARSERS['index'], key='index')
+    data_index = index_data['scoreboard']
+    data_players = index_data['players']
+    data_lds = snapshot.parse('lds', PAGE_PARSERS['lds'], key='lds')
+    
+    data = dict(bs_data)
+    
+    # Use index players for box score (has all players), with bs.html's line where it has one
+    for side in ('home', 'away'):
+        bs_players = {p.name: p for p in bs_data.get(f'{side}_players', [])}
+        data[f'{side}_players'] = [bs_players.get(p.name, p) for p in data_players.get(side, [])]
+    
+    data['h_score'] = data_index.get('h_score', data.get('h_score'))
+    data['a_score'] = data_index.get('a_score', data.get('a_score'))
+    data['period'] = data_index.get('period', data.get('period'))
+    data['clock'] = data_index.get('clock', data.get('clock'))
+    for key in ('home_pts_leaders', 'away_pts_leaders', 'home_reb_leaders',
+                'away_reb_leaders', 'home_ast_leaders', 'away_ast_leaders'):
+        data[key] = data_lds.get(key, [])
+    data['team_stats'] = snapshot.parse('st', PAGE_PARSERS['st'], key='st')
+    return data
+
+def run_feed(game_id, game_num):
+    """Refresh loop fed by the JSON feed - no browser, no HTML parsing"""
+    client = FeedClient(game_id)
+    outputs = make_outputs(game_num)
+    scheduler = PollScheduler({'feed': PAGE_CADENCES['index']})
+    print(f"Polling feed: {client.url}")
+    while True:
+        try:
+            time.sleep(scheduler.wait())
+            scheduler.mark(['feed'])
+            payload = client.poll()
+            if payload is None:
+                # Dead ball / timeout - nothing to parse or write
+                continue
+            data = span_data.csv_data(spans_from_feed(payload))
+            scheduler.observe(data['period'], data['clock'], data['h_score'], data['a_score'])
+            outputs.publish(data)
+            print(f"Updated at {time.strftime('%H:%M:%S')} - Score: {data['home']} {data['h_score']} - {data['a_score']} {data['away']}")
+        except KeyboardInterrupt:
+            print("Stopped.")
+            outputs.close()
+            break
+        except Exception as e:
+            print(f"Error: {e}")
+            time.sleep(1)
+
+def run_live(base_url, game_num):
+    """Refresh loop fed by one open bs.html - writes as soon as a span changes"""
+    live = LivePage(f"{base_url}/bs.html").start()
+    outputs = make_outputs(game_num)
+    print(f"Watching live page: {live.url}")
+    while True:
+        try:
+            if not live.wait(timeout=60):
+                continue
+            changed = live.take()
+            data = span_data.csv_data(live.current())
+            outputs.publish(data)
+            print(f"Updated at {time.strftime('%H:%M:%S')} ({len(changed)} fields, {live.latency_ms:.0f}ms) - Score: {data['home']} {data['h_score']} - {data['a_score']} {data['away']}")
+        except KeyboardInterrupt:
+            print("Stopped.")
+            outputs.close()
+            live.close()
+            break
+        except Exception as e:
+            print(f"Error: {e}")
+            time.sleep(1)
 
 if __name__ == "__main__":
-    if len(sys.argv) > 2:
-        GAME_NUM = sys.argv[2]
+    if len(ARGS) > 1:
+        GAME_NUM = ARGS[1]
     
     if not GAME_URL:
         GAME_URL = input("Enter game URL: ").strip()
@@ -505,25 +493,26 @@ if __name__ == "__main__":
     match = re.search(r'/u/BBF/(\d+)', GAME_URL)
     game_id = match.group(1) if match else "unknown"
     
-    # Fetch from index.html for scoreboard
-    index_url = f"https://fibalivestats.dcd.shared.geniussports.com/u/BBF/{game_id}/index.html"
-    print(f"Fetching: {index_url}")
-    index_html = fetch(index_url)
-    
-    # Fetch from bs.html for full box score
-    bs_url = f"https://fibalivestats.dcd.shared.geniussports.com/u/BBF/{game_id}/bs.html"
-    print(f"Fetching: {bs_url}")
-    bs_html = fetch(bs_url)
+    if FEED_MODE:
+        run_feed(game_id, GAME_NUM)
+        sys.exit(0)
     
-    # Fetch from lds.html for leaders
-    lds_url = f"https://fibalivestats.dcd.shared.geniussports.com/u/BBF/{game_id}/lds.html"
-    print(f"Fetching: {lds_url}")
-    lds_html = fetch(lds_url)
+    base_url = f"https://fibalivestats.dcd.shared.geniussports.com/u/BBF/{game_id}"
+    if LIVE_MODE:
+        run_live(base_url, GAME_NUM)
+        sys.exit(0)
     
-    # Fetch from st.html for statistics
-    st_url = f"https://fibalivestats.dcd.shared.geniussports.com/u/BBF/{game_id}/st.html"
-    print(f"Fetching: {st_url}")
-    st_html = fetch(st_url)
+    urls = {
+        'index': f"{base_url}/index.html",   # scoreboard
+        'bs': f"{base_url}/bs.html",         # full box score
+        'lds': f"{base_url}/lds.html",       # leaders
+        'st': f"{base_url}/st.html",         # statistics
+    }
+    for url in urls.values():
+        print(f"Fetching: {url}")
+    tracker = PageTracker()
+    htmls = fetch_all(urls, tracker)
+    index_html, bs_html, lds_html, st_html = htmls['index'], htmls['bs'], htmls['lds'], htmls['st']
     
     # Debug: save HTMLs
     with open('last_fetch.html', 'w', encoding='utf-8') as f:
@@ -534,88 +523,50 @@ if __name__ == "__main__":
         print("Failed to fetch HTML")
         sys.exit(1)
     
-    data = parse_bs_html(bs_html)
-    data_index = parse_index_html(index_html)
-    data_players = parse_index_players(index_html)
-    data_st = parse_st_html(st_html)
-    data_lds = parse_lds_html(lds_html)
-    
-    # Combine data - use index players for box score (has all players)
-    data['home_players'] = data_players.get('home', data.get('home_players', []))
-    data['away_players'] = data_players.get('away', data.get('away_players', []))
-    data['h_score'] = data_index.get('h_score', data.get('h_score'))
-    data['a_score'] = data_index.get('a_score', data.get('a_score'))
-    data['period'] = data_index.get('period', data.get('period'))
-    data['clock'] = data_index.get('clock', data.get('clock'))
-    data['home_pts_leaders'] = data_lds.get('home_pts_leaders', [])
-    data['away_pts_leaders'] = data_lds.get('away_pts_leaders', [])
-    data['home_reb_leaders'] = data_lds.get('home_reb_leaders', [])
-    data['away_reb_leaders'] = data_lds.get('away_reb_leaders', [])
-    data['home_ast_leaders'] = data_lds.get('home_ast_leaders', [])
-    data['away_ast_leaders'] = data_lds.get('away_ast_leaders', [])
-    data['team_stats'] = data_st
+    # Only pages whose content changed get re-parsed; the rest carry over with their results
+    snapshot = CycleSnapshot()
+    refresh_snapshot(snapshot, htmls)
+    data = combine_snapshot(snapshot)
     
     print(f"Score: {data['home']} {data['h_score']} - {data['a_score']} {data['away']}")
     print(f"Home players: {len(data['home_players'])}, Away players: {len(data['away_players'])}")
     
-    # Write CSV and refresh every 10 seconds
+    # Refresh each page on its own cadence, slowing down when the clock stops
+    scheduler = PollScheduler(PAGE_CADENCES)
+    scheduler.mark(list(urls))
+    outputs = make_outputs(GAME_NUM)
+    # The tracker already holds these pages - a game that isn't moving would never be written otherwise
+    outputs.publish(data)
+    
     while True:
         try:
-            # Refetch data
-            index_html = fetch(index_url)
-            bs_html = fetch(bs_url)
-            lds_html = fetch(lds_url)
-            st_html = fetch(st_url)
-            
-            data = parse_bs_html(bs_html)
-            data_index = parse_index_html(index_html)
-            data_players = parse_index_players(index_html)
-            data_st = parse_st_html(st_html)
-            data_lds = parse_lds_html(lds_html)
+            scheduler.observe(data.get('period'), data.get('clock'), data.get('h_score'), data.get('a_score'))
+            time.sleep(scheduler.wait())
             
-            # Use index players for box score (has all players)
-            data['home_players'] = data_players.get('home', [])
-            data['away_players'] = data_players.get('away', [])
-            data['h_score'] = data_index.get('h_score', data.get('h_score'))
-            data['a_score'] = data_index.get('a_score', data.get('a_score'))
-            data['period'] = data_index.get('period', data.get('period'))
-            data['clock'] = data_index.get('clock', data.get('clock'))
-            data['home_pts_leaders'] = data_lds.get('home_pts_leaders', [])
-            data['away_pts_leaders'] = data_lds.get('away_pts_leaders', [])
-            data['home_reb_leaders'] = data_lds.get('home_reb_leaders', [])
-            data['away_reb_leaders'] = data_lds.get('away_reb_leaders', [])
-            data['home_ast_leaders'] = data_lds.get('home_ast_leaders', [])
-            data['away_ast_leaders'] = data_lds.get('away_ast_leaders', [])
-            data['team_stats'] = data_st
+            # Refetch only the pages that are due
+            due = scheduler.due()
+            scheduler.mark(due)
+            htmls = fetch_all({name: urls[name] for name in due}, tracker)
             
-            # Merge advanced stats from bs.html into players
-            bs_data = parse_bs_html(bs_html)
-            if 'home_totals' in bs_data:
-                data['home_totals'] = bs_data.get('home_totals', {})
-            if 'away_totals' in bs_data:
-                data['away_totals'] = bs_data.get('away_totals', {})
+            snapshot = CycleSnapshot(snapshot)
+            changed = refresh_snapshot(snapshot, htmls)
+            if not changed:
+                # Dead ball / timeout - skip parse and writes entirely
+                print(f"Unchanged at {time.strftime('%H:%M:%S')} ({scheduler.state})")
+                continue
             
-            # Merge player advanced stats
-            for hp in data.get('home_players', []):
-                for bsp in bs_data.get('home_players', []):
-                    if hp.get('name') == bsp.get('name'):
-                        hp.update(bsp)
-                        break
+            data = combine_snapshot(snapshot)
             
-            for ap in data.get('away_players', []):
-                for bsp in bs_data.get('away_players', []):
-                    if ap.get('name') == bsp.get('name'):
-                        ap.update(bsp)
-                        break
-            
-            write_csv(data, GAME_NUM)
-            write_text(data, GAME_NUM)
-            write_xml(data, GAME_NUM)
-            print(f"Updated at {time.strftime('%H:%M:%S')} - Score: {data['home']} {data['h_score']} - {data['a_score']} {data['away']}")
-            time.sleep(5)
+            outputs.publish(data)
+            print(f"Updated at {time.strftime('%H:%M:%S')} ({', '.join(changed)}) - Score: {data['home']} {data['h_score']} - {data['a_score']} {data['away']}")
+            print(f"  Fetch: {get_fetcher().report()}")
+            print(f"  Parse cache: {parse_cache.report()}")
+            print(f"  Outputs: {outputs.report()}")
+            print(f"  Files: {atomic_file.report()}")
         except KeyboardInterrupt:
             print("Stopped.")
+            outputs.close()
             break
         except Exception as e:
             print(f"Error: {e}")
-            time.sleep(5)
+            time.sleep(1)